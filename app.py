@@ -14,17 +14,21 @@ prefer_legacy_modules(
 import streamlit as st
 import pandas as pd
 import io
-from collections import Counter
-from openpyxl import load_workbook
+from collections import Counter, defaultdict
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import numpy as np
 from datetime import datetime, date
 import re
 import sqlite3
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 import html
-from io import StringIO
+import base64
+from io import BytesIO
+from PIL import Image
+from pptx import Presentation
 
 # Import our modular components
 from database import (
@@ -32,16 +36,17 @@ from database import (
     get_user_projects, create_project, save_cell_experiment, update_cell_experiment,
     get_experiment_by_name_and_file, get_project_experiments, check_experiment_exists,
     get_experiment_data, delete_cell_experiment, delete_project, rename_project,
-    rename_experiment, save_experiment, update_experiment, check_experiment_name_exists,
+    rename_experiment, save_experiment, update_experiment, update_experiment_metadata, cells_match_stored,
+    check_experiment_name_exists,
     get_experiment_by_name, get_all_project_experiments_data, TEST_USER_ID,
     update_project_type, get_project_by_id, duplicate_experiment,
     get_user_projects_with_counts, get_project_experiment_index, get_hydrated_experiment_payload,
     get_experiments_by_formulation_component, get_formulation_summary,
-    get_experiments_grouped_by_formulation
+    get_experiments_grouped_by_formulation, load_cell_dataframe, legacy_cell_source
 )
 from data_analysis import (
     calculate_cell_summary, calculate_experiment_average,
-    calculate_cycle_life_80, get_qdis_series
+    common_cycle_values
 )
 from display_components import (
     display_experiment_summaries_table, display_individual_cells_table,
@@ -53,7 +58,10 @@ from draggable_tabs import (
     render_tab_settings_section,
 )
 from file_processing import extract_date_from_filename
-from data_processing import load_and_preprocess_data, calculate_efficiency_based_on_project_type
+from data_processing import (
+    load_and_preprocess_data, parse_cell_file, build_processed_cell,
+    calculate_efficiency_based_on_project_type
+)
 from dialogs import confirm_delete_project, confirm_delete_experiment, show_delete_dialogs
 
 # Initialize database
@@ -64,9 +72,14 @@ from ui_components import (
     get_all_battery_materials, render_toggle_section, render_experiment_color_customization,
     render_comparison_plot_options, render_comparison_color_customization, render_comparison_name_customization,
     display_summary_stats, display_averages, render_cell_inputs, get_initial_areal_capacity,
-    render_formulation_table, get_substrate_options, coerce_float_input, coerce_int_input
+    render_formulation_table, get_substrate_options, coerce_float_input, coerce_int_input,
+    hash_dataframe
+)
+from plotting import (
+    plot_capacity_graph, plot_capacity_retention_graph, plot_comparison_capacity_graph, plot_combined_capacity_retention_graph,
+    plot_coulombic_efficiency_precision, plot_energy_efficiency
 )
-from plotting import plot_capacity_graph, plot_capacity_retention_graph, plot_comparison_capacity_graph, plot_combined_capacity_retention_graph
+from export import export_powerpoint, export_excel
 from llm_summary import generate_experiment_summary
 from preference_components import render_preferences_sidebar, render_formulation_editor_modal, get_default_values_for_experiment, render_default_indicator
 from formulation_analysis import (
@@ -122,7 +135,10 @@ EDITOR_STATE_PREFIXES = (
 EDITOR_STATE_SUFFIXES = (
     '_query', '_suggestions', '_selected', '_show_suggestions', '_input', '_clear'
 )
-EDITOR_STATE_KEYS = ('datasets', 'processed_data_cache', 'cache_key')
+EDITOR_STATE_KEYS = ('datasets', '_edit_ui_fp', '_edit_ui_components', 'main_group_assignment_editor')
+
+# Worker threads for summarising Master Table experiments
+MASTER_TABLE_WORKERS = 4
 
 
 @st.cache_data(show_spinner=False, ttl=60)
@@ -137,11 +153,69 @@ def load_sidebar_experiments(project_id):
 
 @st.cache_data(show_spinner=False, ttl=60)
 def load_sidebar_experiment_payload(experiment_id):
-    return get_hydrated_experiment_payload(experiment_id)
+    # Cells keep their parquet references; load_cell_dataframe reads the files directly
+    return get_hydrated_experiment_payload(experiment_id, inline_cells=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def parse_uploaded_cell(file_bytes, file_name, loading, active, testnum, project_type):
+    """Parse one uploaded cycler file, keyed on its content rather than its file name."""
+    file_obj = io.BytesIO(file_bytes)
+    file_obj.name = file_name
+    return parse_cell_file(file_obj, {'loading': loading, 'active': active, 'testnum': testnum}, project_type)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_dataframe})
+def compute_group_avg_curve(group_frames):
+    """Average Q Dis, Q Chg and efficiency across a group of cell DataFrames at their shared cycles."""
+    if not group_frames:
+        return None, None, None, None
+    dfs_trimmed = list(group_frames)
+    x_col = dfs_trimmed[0].columns[0]
+    common_cycles = common_cycle_values(dfs_trimmed, x_col)
+    if not common_cycles:
+        return None, None, None, None
+    # Stack each cell's rows for the shared cycles and average them in one groupby,
+    # keeping the first row per cycle as the previous per-cycle lookup did.
+    value_cols = ['Q Dis (mAh/g)', 'Q Chg (mAh/g)', 'Efficiency (-)']
+    stacked = pd.concat([
+        df.drop_duplicates(subset=x_col).set_index(x_col).loc[
+            common_cycles, [col for col in value_cols if col in df.columns]
+        ]
+        for df in dfs_trimmed
+    ])
+    avg = stacked.groupby(level=0).mean().reindex(common_cycles)
+
+    def _averaged(column, scale=1):
+        if column not in avg.columns:
+            return [None] * len(common_cycles)
+        return [None if pd.isnull(value) else value * scale for value in avg[column].tolist()]
+
+    avg_qdis = _averaged('Q Dis (mAh/g)')
+    avg_qchg = _averaged('Q Chg (mAh/g)')
+    avg_eff = _averaged('Efficiency (-)', scale=100)
+    return common_cycles, avg_qdis, avg_qchg, avg_eff
+
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_dataframe}, max_entries=8)
+def build_experiment_pptx(dfs, **export_options):
+    """Build the single-experiment slide deck; reruns with the same cells and options reuse the bytes."""
+    return export_powerpoint(dfs=dfs, **export_options)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_dataframe}, max_entries=8)
+def build_experiment_excel(dfs, show_averages, experiment_name):
+    """Build the experiment workbook; reruns with the same cells reuse the bytes."""
+    return export_excel(dfs, show_averages, experiment_name)
 
 
 def clear_navigation_caches():
-    st.cache_data.clear()
+    # Only the sidebar loaders; parsed uploads and figures are keyed on content and stay valid.
+    load_sidebar_projects.clear()
+    load_sidebar_experiments.clear()
+    load_sidebar_experiment_payload.clear()
+    st.session_state.pop('_edit_ui_fp', None)
 
 
 def clear_experiment_editor_state(clear_loaded_experiment=False):
@@ -166,6 +240,204 @@ def set_active_project(project_id, project_name, start_new_experiment=False):
         st.session_state['show_cell_inputs_prompt'] = True
 
 
+def editor_fingerprint(datasets):
+    """Cheap fingerprint of the fields the cell editor is built from."""
+    return hash(tuple(
+        (
+            getattr(d.get('file'), 'name', None) or d.get('file_label') or d.get('testnum'),
+            d.get('loading'),
+            d.get('active'),
+            d.get('formation_cycles'),
+            d.get('electrolyte'),
+        )
+        for d in datasets
+    ))
+
+
+def get_editor_project_components(project_id):
+    """Project component names for the edit expanders, rebuilt only when the datasets change.
+
+    Each formulation table asks for the project's components; without this every
+    expander re-scans all of the project's experiments on every rerun.
+    """
+    fingerprint = (project_id, editor_fingerprint(st.session_state.get('datasets', [])))
+    if fingerprint != st.session_state.get('_edit_ui_fp') or '_edit_ui_components' not in st.session_state:
+        st.session_state['_edit_ui_fp'] = fingerprint
+        st.session_state['_edit_ui_components'] = get_project_components(project_id)
+    return st.session_state['_edit_ui_components']
+
+
+@st.fragment
+def render_loaded_cell_editor(i, dataset, project_id, key_scope, cutoff_lower_default=2.5, cutoff_upper_default=4.2):
+    """Render the edit expander for one cell of a loaded experiment.
+
+    Runs as a fragment so typing into a cell's inputs only reruns this expander.
+    Edits are written back into st.session_state['datasets'][i]; actions that change
+    which cells are analysed (exclude, include, delete) trigger a full app rerun.
+    """
+    # The multi-cell editor uses the plain edit_ keys; the single-cell editor has its own.
+    widget_prefix = 'edit_' if key_scope == 'loaded' else 'edit_single_'
+
+    is_excluded = dataset.get('excluded', False)
+    cell_title = f'Cell {i+1}: {dataset["testnum"] or f"Cell {i+1}"}'
+    if is_excluded:
+        cell_title += " ⚠️ EXCLUDED"
+
+    with st.expander(cell_title, expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            loading = st.number_input(
+                f'Disc loading (mg) for Cell {i+1}', 
+                min_value=0.0, 
+                step=1.0, 
+                value=float(dataset['loading']),
+                key=f'edit_loading_{i}'
+            )
+            formation_cycles = st.number_input(
+                f'Formation Cycles for Cell {i+1}', 
+                min_value=0, 
+                step=1, 
+                value=int(dataset['formation_cycles']),
+                key=f'edit_formation_{i}'
+            )
+        with col2:
+            active_material = st.number_input(
+                f'% Active material for Cell {i+1}', 
+                min_value=0.0, 
+                max_value=100.0, 
+                step=1.0, 
+                value=float(dataset['active']),
+                key=f'edit_active_{i}'
+            )
+            test_number = st.text_input(
+                f'Test Number for Cell {i+1}', 
+                value=dataset['testnum'] or f'Cell {i+1}',
+                key=f'edit_testnum_{i}'
+            )
+
+        # Electrolyte, Substrate, and Separator selection
+        substrate_options = get_substrate_options()
+        substrate_index = {option: idx for idx, option in enumerate(substrate_options)}
+
+        col3, col4, col5 = st.columns(3)
+        with col3:
+            electrolyte = render_hybrid_electrolyte_input(
+                f'Electrolyte for Cell {i+1}', 
+                default_value=dataset['electrolyte'],
+                key=f'{widget_prefix}electrolyte_{i}'
+            )
+        with col4:
+            substrate = st.selectbox(
+                f'Substrate for Cell {i+1}', 
+                substrate_options,
+                index=substrate_index.get(dataset.get('substrate'), 0),
+                key=f'{widget_prefix}substrate_{i}'
+            )
+        with col5:
+            separator = render_hybrid_separator_input(
+                f'Separator for Cell {i+1}', 
+                default_value=dataset.get('separator', '25um PP'),
+                key=f'{widget_prefix}separator_{i}'
+            )
+
+        if dataset.get('cutoff_voltage_lower') is not None:
+            cutoff_lower_default = dataset['cutoff_voltage_lower']
+        if dataset.get('cutoff_voltage_upper') is not None:
+            cutoff_upper_default = dataset['cutoff_voltage_upper']
+
+        cutoff_col1, cutoff_col2 = st.columns(2)
+        with cutoff_col1:
+            cutoff_lower = st.number_input(
+                f'Lower Cutoff Voltage (V) for Cell {i+1}',
+                min_value=0.0,
+                max_value=10.0,
+                step=0.1,
+                value=float(cutoff_lower_default),
+                key=f'{widget_prefix}cutoff_lower_{i}',
+            )
+        with cutoff_col2:
+            cutoff_upper = st.number_input(
+                f'Upper Cutoff Voltage (V) for Cell {i+1}',
+                min_value=0.0,
+                max_value=10.0,
+                step=0.1,
+                value=float(cutoff_upper_default),
+                key=f'{widget_prefix}cutoff_upper_{i}',
+            )
+
+        # Formulation table
+        st.markdown("**Formulation:**")
+        # Initialize formulation data if needed
+        formulation_key = f'formulation_data_{widget_prefix}{i}_loaded'
+        if formulation_key not in st.session_state:
+            st.session_state[formulation_key] = dataset['formulation'] if dataset['formulation'] else [{'Component': '', 'Dry Mass Fraction (%)': 0.0}]
+        formulation = render_formulation_table(f'{widget_prefix}{i}_loaded', project_id, get_editor_project_components)
+
+        session_datasets = st.session_state.get('datasets', [])
+
+        # Add two buttons: Exclude and Remove
+        col_btn1, col_btn2 = st.columns(2)
+
+        with col_btn1:
+            if st.button("🚫 Exclude Cell", key=f'exclude_cell_{key_scope}_{i}', disabled=is_excluded):
+                if i < len(session_datasets):
+                    session_datasets[i]['excluded'] = True
+                st.rerun()
+
+        with col_btn2:
+            if st.button("Remove Cell", key=f'remove_cell_{key_scope}_{i}'):
+                st.session_state[f'confirm_remove_cell_{key_scope}_{i}'] = True
+
+        # Show excluded status
+        if is_excluded:
+            st.warning("This cell is excluded from analysis")
+            if st.button("✅ Include Cell", key=f'include_cell_{key_scope}_{i}'):
+                if i < len(session_datasets):
+                    session_datasets[i]['excluded'] = False
+                st.rerun()
+
+        if st.session_state.get(f'confirm_remove_cell_{key_scope}_{i}', False):
+            st.error("**PERMANENT DELETION** - This will permanently delete the cell data and cannot be undone!")
+            col_confirm1, col_confirm2 = st.columns(2)
+            with col_confirm1:
+                if st.button("Delete Permanently", key=f'confirm_yes_{key_scope}_{i}', type="primary"):
+                    # Actually remove the cell from the datasets
+                    if i < len(session_datasets):
+                        session_datasets.pop(i)
+                    st.session_state[f'confirm_remove_cell_{key_scope}_{i}'] = False
+                    st.rerun()
+            with col_confirm2:
+                if st.button("Cancel", key=f'confirm_no_{key_scope}_{i}'):
+                    st.session_state[f'confirm_remove_cell_{key_scope}_{i}'] = False
+
+    # Always preserve original file object, only update other fields
+    edited_dataset = {
+        'file': dataset['file'],  # Always preserve original file object
+        'loading': loading,
+        'active': active_material,
+        'testnum': test_number,
+        'formation_cycles': formation_cycles,
+        'cutoff_voltage_lower': cutoff_lower,
+        'cutoff_voltage_upper': cutoff_upper,
+        'electrolyte': electrolyte,
+        'substrate': substrate,
+        'separator': separator,
+        'formulation': formulation,
+        'excluded': is_excluded,
+        'cycler': dataset.get('cycler'),
+        'channel': dataset.get('channel'),
+        'cycler_channel': dataset.get('cycler_channel'),
+        'tracking_placeholder': dataset.get('tracking_placeholder', False),
+        'uploaded_file_source': dataset.get('uploaded_file_source', False),
+        'has_data': dataset.get('has_data', False),
+        'file_label': dataset.get('file_label')
+    }
+    # On a fragment-only rerun the caller's loop does not run, so persist here.
+    if i < len(session_datasets):
+        session_datasets[i].update(edited_dataset)
+    return edited_dataset
+
+
 def format_nav_date(value):
     if not value:
         return "No date"
@@ -1269,10 +1541,11 @@ with st.container():
 
                     # Recalculate gravimetric capacities if loading or active material changed
                     updated_data_json = original_cell.get('data_json')
-                    if (new_loading != original_loading or new_active != original_active) and updated_data_json:
+                    has_cell_data = bool(updated_data_json or original_cell.get('parquet_path'))
+                    if (new_loading != original_loading or new_active != original_active) and has_cell_data:
                         try:
-                            # Parse the original DataFrame
-                            original_df = pd.read_json(StringIO(updated_data_json))
+                            # Load the original DataFrame (parquet when the cell is stored as one)
+                            original_df = load_cell_dataframe(original_cell)
 
                             # Recalculate gravimetric capacities
                             updated_df = recalculate_gravimetric_capacities(original_df, new_loading, new_active)
@@ -1332,6 +1605,9 @@ with st.container():
                         'cycler_channel': dataset.get('cycler_channel', original_cell.get('cycler_channel')),
                         'tracking_placeholder': original_cell.get('tracking_placeholder', False)
                     })
+                    if updated_data_json is not original_cell.get('data_json'):
+                        # The stored parquet file holds the old data
+                        updated_cell.pop('parquet_path', None)
                     updated_cells_data.append(updated_cell)
 
                 # Get additional experiment data
@@ -1354,21 +1630,45 @@ with st.container():
                         cell_format_data['cathode_width'] = st.session_state.get('current_cathode_width', experiment_data.get('cathode_width', 50.0))
                         cell_format_data['num_stacked_cells'] = st.session_state.get('current_num_stacked_cells', experiment_data.get('num_stacked_cells', 1))
 
-                # Update the experiment with current data including exclude changes
-                update_experiment(
-                    experiment_id=experiment_id,
-                    project_id=project_id,
-                    experiment_name=loaded_experiment['experiment_name'],
-                    experiment_date=current_experiment_date,
-                    disc_diameter_mm=current_disc_diameter,
-                    group_assignments=current_group_assignments,
-                    group_names=current_group_names,
-                    cells_data=updated_cells_data,  # Use updated data with exclude changes
-                    solids_content=solids_content,
-                    pressed_thickness=pressed_thickness,
-                    experiment_notes=experiment_notes,
-                    cell_format_data=cell_format_data
+                # Only rewrite the stored cell payloads when something cell-level changed.
+                # Porosity depends on disc diameter and pressed thickness, so those also
+                # require the full update path.
+                metadata_only = (
+                    cells_match_stored(updated_cells_data, experiment_data.get('cells', [])) and
+                    current_disc_diameter == experiment_data.get('disc_diameter_mm') and
+                    pressed_thickness == experiment_data.get('pressed_thickness')
                 )
+
+                if metadata_only:
+                    update_experiment_metadata(
+                        experiment_id=experiment_id,
+                        project_id=project_id,
+                        experiment_date=current_experiment_date,
+                        disc_diameter_mm=current_disc_diameter,
+                        group_assignments=current_group_assignments,
+                        group_names=current_group_names,
+                        solids_content=solids_content,
+                        pressed_thickness=pressed_thickness,
+                        experiment_notes=experiment_notes,
+                        cell_format_data=cell_format_data
+                    )
+                else:
+                    # Update the experiment with current data including exclude changes;
+                    # the stored cells reference the parquet files just written
+                    updated_cells_data = update_experiment(
+                        experiment_id=experiment_id,
+                        project_id=project_id,
+                        experiment_name=loaded_experiment['experiment_name'],
+                        experiment_date=current_experiment_date,
+                        disc_diameter_mm=current_disc_diameter,
+                        group_assignments=current_group_assignments,
+                        group_names=current_group_names,
+                        cells_data=updated_cells_data,  # Use updated data with exclude changes
+                        solids_content=solids_content,
+                        pressed_thickness=pressed_thickness,
+                        experiment_notes=experiment_notes,
+                        cell_format_data=cell_format_data
+                    )
                 clear_navigation_caches()
 
                 # Update the loaded experiment in session state with all current changes
@@ -1387,12 +1687,6 @@ with st.container():
                 if cell_format_data:
                     st.session_state['loaded_experiment']['experiment_data'].update(cell_format_data)
 
-                # Clear any cached processed data to force recalculation
-                if 'processed_data_cache' in st.session_state:
-                    del st.session_state['processed_data_cache']
-                if 'cache_key' in st.session_state:
-                    del st.session_state['cache_key']
-
                 # Set flag to indicate calculations have been updated
                 st.session_state['calculations_updated'] = True
                 st.session_state['update_timestamp'] = datetime.now()
@@ -1400,7 +1694,10 @@ with st.container():
                 st.success("Changes saved!")
                 if recalculated_cells:
                     st.info(f"Recalculated specific capacity values for {len(recalculated_cells)} cell(s): {', '.join(recalculated_cells)}")
-                st.rerun()
+                # A metadata-only save leaves the cells untouched, and everything below the
+                # header reads the updated experiment from session state in this same run.
+                if not metadata_only:
+                    st.rerun()
 
 st.markdown('<div class="cellscope-app-shell-divider"></div>', unsafe_allow_html=True)
 # Show delete confirmation dialogs when triggered
@@ -2208,7 +2505,6 @@ with tab_dashboard:
     @st.cache_data(ttl=60, show_spinner=False)
     def load_dashboard_data(user_id: str, filter_params_json: str):
         """Load all dashboard data with caching."""
-        import json
         filters = json.loads(filter_params_json)
         
         # Fetch all data
@@ -2248,7 +2544,6 @@ with tab_dashboard:
     # Load data with spinner
     with st.spinner("Loading dashboard data..."):
         # Convert filter_params to JSON for caching
-        import json
         filter_json = json.dumps(filter_params, default=str)
         
         try:
@@ -2461,9 +2756,7 @@ with tab_inputs:
                 key.startswith('multi_file_upload_') or
                 key.startswith('assign_all_cells_') or
                 key.startswith('use_same_formulation_') or  # Added this
-                key == 'datasets' or
-                key == 'processed_data_cache' or
-                key == 'cache_key'):
+                key == 'datasets'):
                 keys_to_clear.append(key)
         
         # Remove the keys
@@ -2800,6 +3093,7 @@ with tab_inputs:
     if loaded_experiment and has_cells:
         # Pre-compute shared options outside cell loops
         substrate_options = get_substrate_options()
+        substrate_index = {option: idx for idx, option in enumerate(substrate_options)}
         
         # For loaded experiments, show the cell input fields for editing
         if len(datasets) > 1:
@@ -2836,11 +3130,8 @@ with tab_inputs:
                     )
                 
                 # Electrolyte, Substrate, and Separator selection
-                substrate_options = get_substrate_options()
-                
                 col3, col4, col5 = st.columns(3)
                 with col3:
-                    from ui_components import render_hybrid_electrolyte_input
                     electrolyte_0 = render_hybrid_electrolyte_input(
                         f'Electrolyte for Cell 1', 
                         default_value=datasets[0]["electrolyte"],
@@ -2850,11 +3141,10 @@ with tab_inputs:
                     substrate_0 = st.selectbox(
                         f'Substrate for Cell 1', 
                         substrate_options,
-                        index=substrate_options.index(datasets[0].get("substrate", "Copper")) if datasets[0].get("substrate") in substrate_options else 0,
+                        index=substrate_index.get(datasets[0].get("substrate"), 0),
                         key=f'edit_substrate_0'
                     )
                 with col5:
-                    from ui_components import render_hybrid_separator_input
                     separator_0 = render_hybrid_separator_input(
                         f'Separator for Cell 1', 
                         default_value=datasets[0].get("separator", "25um PP"),
@@ -2890,12 +3180,11 @@ with tab_inputs:
                 
                 # Formulation table
                 st.markdown("**Formulation:**")
-                from ui_components import render_formulation_table
                 # Initialize formulation data if needed
                 formulation_key = f'formulation_data_edit_0_loaded'
                 if formulation_key not in st.session_state:
                     st.session_state[formulation_key] = datasets[0]["formulation"] if datasets[0]["formulation"] else [{'Component': '', 'Dry Mass Fraction (%)': 0.0}]
-                formulation_0 = render_formulation_table(f'edit_0_loaded', project_id, get_project_components)
+                formulation_0 = render_formulation_table(f'edit_0_loaded', project_id, get_editor_project_components)
                 
                 # Add two buttons: Exclude and Remove
                 col_btn1, col_btn2 = st.columns(2)
@@ -2951,323 +3240,27 @@ with tab_inputs:
                         'formulation': formulation_0,
                         'excluded': dataset.get('excluded', False)  # Add this line
                     }
-                else:
+                elif assign_all:
                     is_excluded = dataset.get('excluded', False)
                     cell_title = f'Cell {i+1}: {dataset["testnum"] or f"Cell {i+1}"}'
                     if is_excluded:
                         cell_title += " ⚠️ EXCLUDED"
-                    
-                    with st.expander(cell_title, expanded=False):
-                        col1, col2 = st.columns(2)
-                        if assign_all:
-                            loading = loading_0
-                            formation_cycles = formation_cycles_0
-                            active_material = active_material_0
-                            electrolyte = electrolyte_0
-                            substrate = substrate_0
-                            separator = separator_0
-                            cutoff_lower = cutoff_lower_0
-                            cutoff_upper = cutoff_upper_0
-                            formulation = formulation_0
-                            # Test number should remain individual (not assigned to all)
-                            test_number = dataset['testnum'] or f'Cell {i+1}'
-                        else:
-                            with col1:
-                                loading = st.number_input(
-                                    f'Disc loading (mg) for Cell {i+1}', 
-                                    min_value=0.0, 
-                                    step=1.0, 
-                                    value=float(dataset['loading']),
-                                    key=f'edit_loading_{i}'
-                                )
-                                formation_cycles = st.number_input(
-                                    f'Formation Cycles for Cell {i+1}', 
-                                    min_value=0, 
-                                    step=1, 
-                                    value=int(dataset['formation_cycles']),
-                                    key=f'edit_formation_{i}'
-                                )
-                            with col2:
-                                active_material = st.number_input(
-                                    f'% Active material for Cell {i+1}', 
-                                    min_value=0.0, 
-                                    max_value=100.0, 
-                                    step=1.0, 
-                                    value=float(dataset['active']),
-                                    key=f'edit_active_{i}'
-                                )
-                                test_number = st.text_input(
-                                    f'Test Number for Cell {i+1}', 
-                                    value=dataset['testnum'] or f'Cell {i+1}',
-                                    key=f'edit_testnum_{i}'
-                                )
-                            
-                            # Electrolyte, Substrate, and Separator selection
-                            substrate_options = get_substrate_options()
-                            
-                            col3, col4, col5 = st.columns(3)
-                            with col3:
-                                electrolyte = render_hybrid_electrolyte_input(
-                                    f'Electrolyte for Cell {i+1}', 
-                                    default_value=dataset['electrolyte'],
-                                    key=f'edit_electrolyte_{i}'
-                                )
-                            with col4:
-                                substrate = st.selectbox(
-                                    f'Substrate for Cell {i+1}', 
-                                    substrate_options,
-                                    index=substrate_options.index(dataset.get('substrate', 'Copper')) if dataset.get('substrate') in substrate_options else 0,
-                                    key=f'edit_substrate_{i}'
-                                )
-                            with col5:
-                                separator = render_hybrid_separator_input(
-                                    f'Separator for Cell {i+1}', 
-                                    default_value=dataset.get('separator', '25um PP'),
-                                    key=f'edit_separator_{i}'
-                                )
-                            
-                            cutoff_lower_default = dataset.get('cutoff_voltage_lower')
-                            cutoff_upper_default = dataset.get('cutoff_voltage_upper')
-                            if cutoff_lower_default is None:
-                                cutoff_lower_default = cutoff_lower_0
-                            if cutoff_upper_default is None:
-                                cutoff_upper_default = cutoff_upper_0
-                            
-                            cutoff_col1, cutoff_col2 = st.columns(2)
-                            with cutoff_col1:
-                                cutoff_lower = st.number_input(
-                                    f'Lower Cutoff Voltage (V) for Cell {i+1}',
-                                    min_value=0.0,
-                                    max_value=10.0,
-                                    step=0.1,
-                                    value=float(cutoff_lower_default),
-                                    key=f'edit_cutoff_lower_{i}',
-                                )
-                            with cutoff_col2:
-                                cutoff_upper = st.number_input(
-                                    f'Upper Cutoff Voltage (V) for Cell {i+1}',
-                                    min_value=0.0,
-                                    max_value=10.0,
-                                    step=0.1,
-                                    value=float(cutoff_upper_default),
-                                    key=f'edit_cutoff_upper_{i}',
-                                )
-                            
-                            # Formulation table
-                            st.markdown("**Formulation:**")
-                            from ui_components import render_formulation_table
-                            # Initialize formulation data if needed
-                            formulation_key = f'formulation_data_edit_{i}_loaded'
-                            if formulation_key not in st.session_state:
-                                st.session_state[formulation_key] = dataset['formulation'] if dataset['formulation'] else [{'Component': '', 'Dry Mass Fraction (%)': 0.0}]
-                            formulation = render_formulation_table(f'edit_{i}_loaded', project_id, get_project_components)
-                            
-                            # Add two buttons: Exclude and Remove
-                            col_btn1, col_btn2 = st.columns(2)
-                            
-                            with col_btn1:
-                                exclude_button_disabled = dataset.get('excluded', False)
-                                if st.button("🚫 Exclude Cell", key=f'exclude_cell_loaded_{i}', disabled=exclude_button_disabled):
-                                    datasets[i]['excluded'] = True
-                                    st.session_state['datasets'] = datasets  # Save to session state
-                            
-                            with col_btn2:
-                                if st.button("Remove Cell", key=f'remove_cell_loaded_{i}'):
-                                    st.session_state[f'confirm_remove_cell_loaded_{i}'] = True
-
-                            # Show excluded status
-                            if dataset.get('excluded', False):
-                                st.warning("This cell is excluded from analysis")
-                                if st.button("✅ Include Cell", key=f'include_cell_loaded_{i}'):
-                                    datasets[i]['excluded'] = False
-                                    st.session_state['datasets'] = datasets  # Save to session state
-
-                            if st.session_state.get(f'confirm_remove_cell_loaded_{i}', False):
-                                st.error("**PERMANENT DELETION** - This will permanently delete the cell data and cannot be undone!")
-                                col_confirm1, col_confirm2 = st.columns(2)
-                                with col_confirm1:
-                                    if st.button("Delete Permanently", key=f'confirm_yes_loaded_{i}', type="primary"):
-                                        # Actually remove the cell from the datasets
-                                        datasets.pop(i)
-                                        st.session_state[f'confirm_remove_cell_loaded_{i}'] = False
-                                with col_confirm2:
-                                    if st.button("Cancel", key=f'confirm_no_loaded_{i}'):
-                                        st.session_state[f'confirm_remove_cell_loaded_{i}'] = False
-                        
-                        # Always preserve original file object, only update other fields
-                        edited_dataset = {
-                            'file': dataset['file'],  # Always preserve original file object
-                            'loading': loading,
-                            'active': active_material,
-                            'testnum': test_number,
-                            'formation_cycles': formation_cycles,
-                            'cutoff_voltage_lower': cutoff_lower,
-                            'cutoff_voltage_upper': cutoff_upper,
-                            'electrolyte': electrolyte,
-                            'substrate': substrate,
-                            'separator': separator,
-                            'formulation': formulation,
-                            'excluded': dataset.get('excluded', False),
-                            'cycler': dataset.get('cycler'),
-                            'channel': dataset.get('channel'),
-                            'cycler_channel': dataset.get('cycler_channel'),
-                            'tracking_placeholder': dataset.get('tracking_placeholder', False),
-                            'uploaded_file_source': dataset.get('uploaded_file_source', False),
-                            'has_data': dataset.get('has_data', False),
-                            'file_label': dataset.get('file_label')
-                        }
+                    st.expander(cell_title, expanded=False)
 
-                edited_datasets.append(edited_dataset)
-            datasets = edited_datasets
-            st.session_state['datasets'] = datasets
-        else:
-            # Only one cell
-            for i, dataset in enumerate(datasets):
-                # Don't skip excluded cells - still render them but with visual indication
-                
-                is_excluded = dataset.get('excluded', False)
-                cell_title = f'Cell {i+1}: {dataset["testnum"] or f"Cell {i+1}"}'
-                if is_excluded:
-                    cell_title += " ⚠️ EXCLUDED"
-                
-                with st.expander(cell_title, expanded=False):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        loading = st.number_input(
-                            f'Disc loading (mg) for Cell {i+1}', 
-                            min_value=0.0, 
-                            step=1.0, 
-                            value=float(dataset['loading']),
-                            key=f'edit_loading_{i}'
-                        )
-                        formation_cycles = st.number_input(
-                            f'Formation Cycles for Cell {i+1}', 
-                            min_value=0, 
-                            step=1, 
-                            value=int(dataset['formation_cycles']),
-                            key=f'edit_formation_{i}'
-                        )
-                    with col2:
-                        active_material = st.number_input(
-                            f'% Active material for Cell {i+1}', 
-                            min_value=0.0, 
-                            max_value=100.0, 
-                            step=1.0, 
-                            value=float(dataset['active']),
-                            key=f'edit_active_{i}'
-                        )
-                        test_number = st.text_input(
-                            f'Test Number for Cell {i+1}', 
-                            value=dataset['testnum'] or f'Cell {i+1}',
-                            key=f'edit_testnum_{i}'
-                        )
-                    
-                    # Electrolyte, Substrate, and Separator selection
-                    substrate_options = get_substrate_options()
-                    
-                    col3, col4, col5 = st.columns(3)
-                    with col3:
-                        electrolyte = render_hybrid_electrolyte_input(
-                            f'Electrolyte for Cell {i+1}', 
-                            default_value=dataset['electrolyte'],
-                            key=f'edit_single_electrolyte_{i}'
-                        )
-                    with col4:
-                        substrate = st.selectbox(
-                            f'Substrate for Cell {i+1}', 
-                            substrate_options,
-                            index=substrate_options.index(dataset.get('substrate', 'Copper')) if dataset.get('substrate') in substrate_options else 0,
-                            key=f'edit_single_substrate_{i}'
-                        )
-                    with col5:
-                        separator = render_hybrid_separator_input(
-                            f'Separator for Cell {i+1}', 
-                            default_value=dataset.get('separator', '25um PP'),
-                            key=f'edit_single_separator_{i}'
-                        )
-                    
-                    cutoff_lower_default = dataset.get('cutoff_voltage_lower')
-                    cutoff_upper_default = dataset.get('cutoff_voltage_upper')
-                    if cutoff_lower_default is None:
-                        cutoff_lower_default = 2.5
-                    if cutoff_upper_default is None:
-                        cutoff_upper_default = 4.2
-                    
-                    cutoff_col1, cutoff_col2 = st.columns(2)
-                    with cutoff_col1:
-                        cutoff_lower = st.number_input(
-                            f'Lower Cutoff Voltage (V) for Cell {i+1}',
-                            min_value=0.0,
-                            max_value=10.0,
-                            step=0.1,
-                            value=float(cutoff_lower_default),
-                            key=f'edit_single_cutoff_lower_{i}',
-                        )
-                    with cutoff_col2:
-                        cutoff_upper = st.number_input(
-                            f'Upper Cutoff Voltage (V) for Cell {i+1}',
-                            min_value=0.0,
-                            max_value=10.0,
-                            step=0.1,
-                            value=float(cutoff_upper_default),
-                            key=f'edit_single_cutoff_upper_{i}',
-                        )
-                    
-                    # Formulation table
-                    st.markdown("**Formulation:**")
-                    from ui_components import render_formulation_table
-                    # Initialize formulation data if needed
-                    formulation_key = f'formulation_data_edit_single_{i}_loaded'
-                    if formulation_key not in st.session_state:
-                        st.session_state[formulation_key] = dataset['formulation'] if dataset['formulation'] else [{'Component': '', 'Dry Mass Fraction (%)': 0.0}]
-                    formulation = render_formulation_table(f'edit_single_{i}_loaded', project_id, get_project_components)
-                    
-                    # Add two buttons: Exclude and Remove
-                    col_btn1, col_btn2 = st.columns(2)
-                    
-                    with col_btn1:
-                        exclude_button_disabled = dataset.get('excluded', False)
-                        if st.button("🚫 Exclude Cell", key=f'exclude_cell_single_{i}', disabled=exclude_button_disabled):
-                            datasets[i]['excluded'] = True
-                            st.session_state['datasets'] = datasets  # Save to session state
-                    
-                    with col_btn2:
-                        if st.button("Remove Cell", key=f'remove_cell_single_{i}'):
-                            st.session_state[f'confirm_remove_cell_single_{i}'] = True
-
-                    # Show excluded status
-                    if dataset.get('excluded', False):
-                        st.warning("This cell is excluded from analysis")
-                        if st.button("✅ Include Cell", key=f'include_cell_single_{i}'):
-                            datasets[i]['excluded'] = False
-                            st.session_state['datasets'] = datasets  # Save to session state
-
-                    if st.session_state.get(f'confirm_remove_cell_single_{i}', False):
-                        st.error("**PERMANENT DELETION** - This will permanently delete the cell data and cannot be undone!")
-                        col_confirm1, col_confirm2 = st.columns(2)
-                        with col_confirm1:
-                            if st.button("Delete Permanently", key=f'confirm_yes_single_{i}', type="primary"):
-                                # Actually remove the cell from the datasets  
-                                datasets.pop(i)
-                                st.session_state[f'confirm_remove_cell_single_{i}'] = False
-                        with col_confirm2:
-                            if st.button("Cancel", key=f'confirm_no_single_{i}'):
-                                st.session_state[f'confirm_remove_cell_single_{i}'] = False
-
-                    # Always preserve original file object, only update other fields
+                    # Test number should remain individual (not assigned to all)
                     edited_dataset = {
                         'file': dataset['file'],  # Always preserve original file object
-                        'loading': loading,
-                        'active': active_material,
-                        'testnum': test_number,
-                        'formation_cycles': formation_cycles,
-                        'cutoff_voltage_lower': cutoff_lower,
-                        'cutoff_voltage_upper': cutoff_upper,
-                        'electrolyte': electrolyte,
-                        'substrate': substrate,
-                        'separator': separator,
-                        'formulation': formulation,
-                        'excluded': dataset.get('excluded', False),
+                        'loading': loading_0,
+                        'active': active_material_0,
+                        'testnum': dataset['testnum'] or f'Cell {i+1}',
+                        'formation_cycles': formation_cycles_0,
+                        'cutoff_voltage_lower': cutoff_lower_0,
+                        'cutoff_voltage_upper': cutoff_upper_0,
+                        'electrolyte': electrolyte_0,
+                        'substrate': substrate_0,
+                        'separator': separator_0,
+                        'formulation': formulation_0,
+                        'excluded': is_excluded,
                         'cycler': dataset.get('cycler'),
                         'channel': dataset.get('channel'),
                         'cycler_channel': dataset.get('cycler_channel'),
@@ -3276,7 +3269,21 @@ with tab_inputs:
                         'has_data': dataset.get('has_data', False),
                         'file_label': dataset.get('file_label')
                     }
-                    dataset.update(edited_dataset)
+                else:
+                    edited_dataset = render_loaded_cell_editor(
+                        i, dataset, project_id, 'loaded',
+                        cutoff_lower_default=cutoff_lower_0,
+                        cutoff_upper_default=cutoff_upper_0,
+                    )
+
+                edited_datasets.append(edited_dataset)
+            datasets = edited_datasets
+            st.session_state['datasets'] = datasets
+        else:
+            # Only one cell
+            for i, dataset in enumerate(datasets):
+                # Don't skip excluded cells - still render them but with visual indication
+                render_loaded_cell_editor(i, dataset, project_id, 'single')
                     
         # --- Add Additional Cells ---
         st.markdown("---")
@@ -3437,6 +3444,8 @@ with tab_inputs:
         enable_grouping = st.checkbox('Assign Cells into Groups?', value=bool(current_group_assignments))
         
         if enable_grouping:
+            # group_names is edited in place below; keep the names the assignments were made with
+            previous_group_names = list(group_names)
             col1, col2, col3 = st.columns(3)
             with col1:
                 group_names[0] = st.text_input('Group A Name', value=group_names[0], key='main_group_name_a')
@@ -3446,19 +3455,38 @@ with tab_inputs:
                 group_names[2] = st.text_input('Group C Name', value=group_names[2], key='main_group_name_c')
             
             st.markdown("**Assign each cell to a group:**")
-            group_assignments = []
-            for i, cell in enumerate(datasets):
-                if cell.get('file') or loaded_experiment or is_new_experiment:
-                    cell_name = cell['testnum'] or f'Cell {i+1}'
-                    default_group = current_group_assignments[i] if (current_group_assignments and i < len(current_group_assignments)) else group_names[0]
-                    group = st.radio(
-                        f"Assign {cell_name} to group:",
-                        [group_names[0], group_names[1], group_names[2], "Exclude"],
-                        index=[group_names[0], group_names[1], group_names[2], "Exclude"].index(default_group) if default_group in [group_names[0], group_names[1], group_names[2], "Exclude"] else 0,
-                        key=f"main_group_assignment_{i}",
-                        horizontal=True
-                    )
-                    group_assignments.append(group)
+            group_options = [group_names[0], group_names[1], group_names[2], "Exclude"]
+            valid_groups = set(group_options)
+            assignable_cells = [
+                (i, cell) for i, cell in enumerate(datasets)
+                if cell.get('file') or loaded_experiment or is_new_experiment
+            ]
+            # Carry assignments over a group rename; the editor keeps its edited cells
+            # across reruns, so its state is reset to show the renamed defaults
+            renamed_groups = {old: new for old, new in zip(previous_group_names, group_names) if old != new}
+            if renamed_groups:
+                st.session_state.pop('main_group_assignment_editor', None)
+            default_groups = []
+            for i, cell in assignable_cells:
+                default_group = current_group_assignments[i] if (current_group_assignments and i < len(current_group_assignments)) else group_names[0]
+                default_group = renamed_groups.get(default_group, default_group)
+                default_groups.append(default_group if default_group in valid_groups else group_names[0])
+            # One table for all cells instead of a radio widget per cell
+            assignment_editor = st.data_editor(
+                pd.DataFrame({
+                    'Cell': [cell['testnum'] or f'Cell {i+1}' for i, cell in assignable_cells],
+                    'Group': default_groups,
+                }),
+                column_config={
+                    'Group': st.column_config.SelectboxColumn('Group', options=group_options, required=True),
+                },
+                use_container_width=True,
+                hide_index=True,
+                num_rows="fixed",
+                disabled=['Cell'],
+                key='main_group_assignment_editor',
+            )
+            group_assignments = assignment_editor['Group'].tolist()
             
             show_averages = st.checkbox("Show Group Averages", value=True)
     
@@ -3499,6 +3527,7 @@ with tab_inputs:
             # Update the loaded experiment with new values
             experiment_id = loaded_experiment['experiment_id']
             project_id = loaded_experiment['project_id']
+            previous_experiment_name = loaded_experiment['experiment_name']
             
             # Get project type for efficiency calculation
             project_type = "Full Cell"  # Default
@@ -3560,11 +3589,11 @@ with tab_inputs:
                     if (
                         not uploaded_file_source
                         and (new_loading != original_loading or new_active != original_active)
-                        and updated_data_json
+                        and (updated_data_json or original_cell.get('parquet_path'))
                     ):
                         try:
-                            # Parse the original DataFrame - fix deprecation warning
-                            original_df = pd.read_json(StringIO(updated_data_json))
+                            # Load the original DataFrame (parquet when the cell is stored as one)
+                            original_df = load_cell_dataframe(original_cell)
                             
                             # Recalculate gravimetric capacities
                             updated_df = recalculate_gravimetric_capacities(original_df, new_loading, new_active)
@@ -3633,8 +3662,11 @@ with tab_inputs:
                         'cycler': dataset.get('cycler'),
                         'channel': dataset.get('channel'),
                         'cycler_channel': dataset.get('cycler_channel'),
-                        'tracking_placeholder': bool(dataset.get('tracking_placeholder', False) and not updated_data_json)
+                        'tracking_placeholder': bool(dataset.get('tracking_placeholder', False) and not (updated_data_json or updated_cell.get('parquet_path')))
                     })
+                    if updated_data_json is not original_cell.get('data_json'):
+                        # The stored parquet file holds the old data
+                        updated_cell.pop('parquet_path', None)
                     updated_cells_data.append(updated_cell)
                 else:
                     # This is a new cell being added to the experiment (e.g., uploading to a duplicate)
@@ -3734,15 +3766,9 @@ with tab_inputs:
                     'experiment_notes': experiment_notes
                 })
                 
-                # Clear any cached processed data to force recalculation
-                if 'processed_data_cache' in st.session_state:
-                    del st.session_state['processed_data_cache']
-                if 'cache_key' in st.session_state:
-                    del st.session_state['cache_key']
-                
                 # Reload the experiment from database to get the updated data
                 try:
-                    updated_experiment_data = get_experiment_data(experiment_id)
+                    updated_experiment_data = get_experiment_data(experiment_id, inline_cells=False)
                     if updated_experiment_data:
                         # get_experiment_data returns: id, project_id, cell_name, file_name, loading, active_material, 
                         # formation_cycles, test_number, electrolyte, substrate, separator, data_json, created_date
@@ -3764,7 +3790,10 @@ with tab_inputs:
                     st.warning(f"Experiment updated but failed to reload data: {str(reload_error)}")
                     st.success("✅ Experiment updated successfully!")
                 
-                st.rerun()
+                # The rest of this run already reads the reloaded experiment from session
+                # state; only the header and sidebar (rendered above) show the name.
+                if experiment_name_input != previous_experiment_name:
+                    st.rerun()
             except Exception as e:
                 st.error(f"Error updating experiment: {str(e)}")
     
@@ -3780,6 +3809,12 @@ with tab_inputs:
                 # Use experiment name from input or generate one
                 exp_name = experiment_name_input if experiment_name_input else f"Experiment_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 
+                # Get project type for efficiency calculation
+                project_type = "Full Cell"  # Default
+                project_info = get_project_by_id(current_project_id)
+                if project_info:
+                    project_type = project_info[3]  # project_type is the 4th field
+                
                 # Prepare cells data
                 cells_data = []
                 for i, ds in enumerate(valid_datasets):
@@ -3787,20 +3822,14 @@ with tab_inputs:
                     file_name = ds['file'].name if ds['file'] else f'cell_{i+1}.csv'
                     
                     try:
-                        # Get project type for efficiency calculation
-                        project_type = "Full Cell"  # Default
-                        if st.session_state.get('current_project_id'):
-                            current_project_id = st.session_state['current_project_id']
-                            project_info = get_project_by_id(current_project_id)
-                            if project_info:
-                                project_type = project_info[3]  # project_type is the 4th field
-                        
-                        # Process the data to get DataFrame
-                        temp_dfs = load_and_preprocess_data([ds], project_type)
-                        if temp_dfs and len(temp_dfs) > 0:
-                            processed_cell = temp_dfs[0]
-                            df = processed_cell['df']
-                            
+                        # Reuse the cached parse from the analysis pass instead of re-reading the file
+                        file_obj = ds['file']
+                        parsed_df, file_type, lower_voltage, upper_voltage = parse_uploaded_cell(
+                            file_obj.getvalue(), file_obj.name, ds['loading'], ds['active'], ds['testnum'], project_type
+                        )
+                        processed_cell = build_processed_cell(ds, parsed_df, file_type, lower_voltage, upper_voltage, project_type)
+                        df = processed_cell['df']
+                        if df is not None and not df.empty:
                             cells_data.append({
                                 'cell_name': cell_name,
                                 'file_name': file_name,
@@ -3914,8 +3943,8 @@ if loaded_experiment:
     for i, cell_data in enumerate(cells_data):
         cell_name = cell_data.get('cell_name', 'Unknown')
         try:
-            # Fix the deprecation warning by using StringIO
-            df = pd.read_json(StringIO(cell_data['data_json']))
+            # Stored cells are read from their parquet files; inline data_json is the fallback
+            df = load_cell_dataframe(cell_data)
             
             # Get project type for efficiency recalculation
             project_type = "Full Cell"  # Default
@@ -4014,10 +4043,10 @@ if loaded_experiment:
         
         # Update datasets in session state to reflect any widget changes
         # This ensures Summary tables and other components also show updated values
-        for i, df_data in enumerate(loaded_dfs):
-            if i < len(st.session_state.get('datasets', [])):
-                st.session_state['datasets'][i]['loading'] = df_data['loading']
-                st.session_state['datasets'][i]['active'] = df_data['active']
+        session_datasets = st.session_state.get('datasets', [])
+        for df_data, session_dataset in zip(loaded_dfs, session_datasets):
+            session_dataset['loading'] = df_data['loading']
+            session_dataset['active'] = df_data['active']
         
         # Display experiment metadata
         if experiment_data.get('experiment_date'):
@@ -4053,9 +4082,6 @@ if loaded_experiment:
                             st.markdown("### Capacity vs Cycle Plot")
                             st.markdown("*This plot image can be included in your LLM prompt for visual analysis.*")
                             # Decode and display image
-                            import base64
-                            from io import BytesIO
-                            from PIL import Image
                             img_data = base64.b64decode(plot_image_base64)
                             img = Image.open(BytesIO(img_data))
                             st.image(img, caption=f"{loaded_experiment['experiment_name']} - Capacity vs Cycle", 
@@ -4113,9 +4139,6 @@ if loaded_experiment:
                     
                     if cached_plot:
                         st.markdown("### Capacity vs Cycle Plot")
-                        import base64
-                        from io import BytesIO
-                        from PIL import Image
                         img_data = base64.b64decode(cached_plot)
                         img = Image.open(BytesIO(img_data))
                         st.image(img, caption=f"{loaded_experiment['experiment_name']} - Capacity vs Cycle", 
@@ -4159,76 +4182,43 @@ else:
     
     # Process uploaded data if we have valid datasets
     if valid_datasets:
-        # Create a cache key based on file names and parameters
-        cache_key = []
+        # valid_datasets only holds uploads with a positive size, so the files
+        # can be parsed without first reading a sample from each one.
+        
+        # Get project type for efficiency calculation
+        project_type = "Full Cell"  # Default
+        if st.session_state.get('current_project_id'):
+            current_project_id = st.session_state['current_project_id']
+            project_info = get_project_by_id(current_project_id)
+            if project_info:
+                project_type = project_info[3]  # project_type is the 4th field
+        
+        # Parsing is cached on the file content, so only new or edited uploads are re-parsed
+        dfs = []
         for ds in valid_datasets:
-            if ds.get('file'):
-                file_info = f"{ds['file'].name}_{ds['loading']}_{ds['active']}_{ds['formation_cycles']}"
-                cache_key.append(file_info)
-        cache_key_str = "_".join(cache_key)
+            file_obj = ds['file']
+            df, file_type, lower_voltage, upper_voltage = parse_uploaded_cell(
+                file_obj.getvalue(), file_obj.name, ds['loading'], ds['active'], ds['testnum'], project_type
+            )
+            dfs.append(build_processed_cell(ds, df, file_type, lower_voltage, upper_voltage, project_type))
         
-        # Check if we have cached processed data
-        if ('processed_data_cache' in st.session_state and 
-            st.session_state.get('cache_key') == cache_key_str):
-            dfs = st.session_state['processed_data_cache']
-        else:
-            # Process data and cache it
-            # Final safety check before processing
-            safe_datasets = []
-            for ds in valid_datasets:
-                try:
-                    # Test that we can actually read from the file
-                    file_obj = ds['file']
-                    current_pos = file_obj.tell() if hasattr(file_obj, 'tell') else 0
-                    file_obj.seek(0)
-                    # Try to read a small sample to verify it's readable
-                    sample = file_obj.read(10)
-                    file_obj.seek(current_pos)  # Reset position
-                    if sample:  # File has content
-                        safe_datasets.append(ds)
-                except Exception as e:
-                    st.warning(f"Skipping invalid file: {ds.get('file', {}).get('name', 'Unknown')} - {str(e)}")
-                    continue
-            
-            if safe_datasets:
-                # Get project type for efficiency calculation
-                project_type = "Full Cell"  # Default
-                if st.session_state.get('current_project_id'):
-                    current_project_id = st.session_state['current_project_id']
-                    project_info = get_project_by_id(current_project_id)
-                    if project_info:
-                        project_type = project_info[3]  # project_type is the 4th field
-                
-                dfs = load_and_preprocess_data(safe_datasets, project_type)
-                # After loading and preprocessing, re-attach the latest formation_cycles to each dfs entry
-                for i, d in enumerate(dfs):
-                    if i < len(safe_datasets):
-                        d['formation_cycles'] = safe_datasets[i]['formation_cycles']
-                
-                # Display file type information
-                file_types = [d.get('file_type', 'Unknown') for d in dfs]
-                biologic_count = file_types.count('biologic_csv')
-                neware_count = file_types.count('neware_xlsx')
-                mti_count = file_types.count('mti_xlsx')
-                
-                # Build info message about processed files
-                file_type_parts = []
-                if biologic_count > 0:
-                    file_type_parts.append(f"{biologic_count} Biologic CSV file(s)")
-                if neware_count > 0:
-                    file_type_parts.append(f"{neware_count} Neware XLSX file(s)")
-                if mti_count > 0:
-                    file_type_parts.append(f"{mti_count} MTI XLSX file(s)")
-                
-                if file_type_parts:
-                    st.info(f"Processed {len(dfs)} files: {', '.join(file_type_parts)}")
-            else:
-                dfs = []
-                st.error("No valid files found for processing.")
-            
-            # Cache the processed data
-            st.session_state['processed_data_cache'] = dfs
-            st.session_state['cache_key'] = cache_key_str
+        # Display file type information
+        file_types = [d.get('file_type', 'Unknown') for d in dfs]
+        biologic_count = file_types.count('biologic_csv')
+        neware_count = file_types.count('neware_xlsx')
+        mti_count = file_types.count('mti_xlsx')
+        
+        # Build info message about processed files
+        file_type_parts = []
+        if biologic_count > 0:
+            file_type_parts.append(f"{biologic_count} Biologic CSV file(s)")
+        if neware_count > 0:
+            file_type_parts.append(f"{neware_count} Neware XLSX file(s)")
+        if mti_count > 0:
+            file_type_parts.append(f"{mti_count} MTI XLSX file(s)")
+        
+        if file_type_parts:
+            st.info(f"Processed {len(dfs)} files: {', '.join(file_type_parts)}")
         
         ready = len(dfs) > 0
     else:
@@ -4250,9 +4240,8 @@ if ready:
         dfs = [d for d in loaded_dfs if not d.get('excluded', False)]
     else:
         # For new experiments, we need to filter the processed dfs, not the raw valid_datasets
-        # The processed dfs are already cached in st.session_state['processed_data_cache']
-        processed_dfs = st.session_state.get('processed_data_cache', [])
-        valid_datasets = st.session_state.get('datasets', [])
+        processed_dfs = dfs
+        valid_datasets = datasets
         
         # Create a mapping of file names to excluded status
         excluded_files = {}
@@ -4271,41 +4260,17 @@ if ready:
     # --- Group Average Curve Calculation for Plotting ---
     group_curves = []
     if enable_grouping and group_assignments is not None:
+        # Bucket dfs by group in one pass over the assignments that line up with them
+        dfs_by_group = defaultdict(list)
+        for d, g in zip(dfs, group_assignments):
+            dfs_by_group[g].append(d)
         group_dfs = [[], [], []]
         for idx, name in enumerate(group_names):
-            group_dfs[idx] = [df for df, g in zip(dfs, group_assignments) if g == name]
-        def compute_group_avg_curve(group_dfs):
-            if not group_dfs:
-                return None, None, None, None
-            dfs_trimmed = [d['df'] for d in group_dfs]
-            x_col = dfs_trimmed[0].columns[0]
-            common_cycles = set(dfs_trimmed[0][x_col])
-            for df in dfs_trimmed[1:]:
-                common_cycles = common_cycles & set(df[x_col])
-            common_cycles = sorted(list(common_cycles))
-            if not common_cycles:
-                return None, None, None, None
-            avg_qdis = []
-            avg_qchg = []
-            avg_eff = []
-            for cycle in common_cycles:
-                qdis_vals = []
-                qchg_vals = []
-                eff_vals = []
-                for df in dfs_trimmed:
-                    row = df[df[x_col] == cycle]
-                    if not row.empty:
-                        if 'Q Dis (mAh/g)' in row:
-                            qdis_vals.append(row['Q Dis (mAh/g)'].values[0])
-                        if 'Q Chg (mAh/g)' in row:
-                            qchg_vals.append(row['Q Chg (mAh/g)'].values[0])
-                        if 'Efficiency (-)' in row and not pd.isnull(row['Efficiency (-)'].values[0]):
-                            eff_vals.append(row['Efficiency (-)'].values[0] * 100)
-                avg_qdis.append(sum(qdis_vals)/len(qdis_vals) if qdis_vals else None)
-                avg_qchg.append(sum(qchg_vals)/len(qchg_vals) if qchg_vals else None)
-                avg_eff.append(sum(eff_vals)/len(eff_vals) if eff_vals else None)
-            return common_cycles, avg_qdis, avg_qchg, avg_eff
-        group_curves = [compute_group_avg_curve(group_dfs[idx]) for idx in range(3)]
+            group_dfs[idx] = dfs_by_group.get(name, [])
+        group_curves = [
+            compute_group_avg_curve(tuple(d['df'] for d in group_dfs[idx]))
+            for idx in range(3)
+        ]
     # --- Main Tabs Content ---
     with tab1:
         st.subheader("📈 Cycling Performance Plots")
@@ -4494,6 +4459,8 @@ if ready:
                 st.info("💡 **Tip**: Hover over data points for cycle, capacity, and retention details. Retention uses the first valid post-formation cycle for each cell and skips clearly anomalous baseline cycles when needed.")
             else:
                 # Static matplotlib plot
+                # A plain Figure stays out of pyplot's global registry, so nothing
+                # accumulates across reruns and no plt.close is needed
                 fig = plot_capacity_graph(
                     dfs, show_lines, show_efficiency_lines, remove_last_cycle, show_graph_title, experiment_name,
                     show_average_performance, avg_line_toggles, remove_markers, hide_legend,
@@ -4510,7 +4477,8 @@ if ready:
                     cycle_filter=cycle_filter,
                     custom_colors=custom_colors,
                     y_axis_limits=y_axis_limits,
-                    excluded_from_average=excluded_from_average
+                    excluded_from_average=excluded_from_average,
+                    fig=Figure()
                 )
                 st.pyplot(fig)
             
@@ -4700,7 +4668,6 @@ if ready:
                 )
             
             try:
-                from plotting import plot_coulombic_efficiency_precision
                 ce_fig = plot_coulombic_efficiency_precision(
                     dfs, show_lines, remove_last_cycle, show_graph_title, experiment_name,
                     remove_markers=remove_markers, hide_legend=hide_legend, 
@@ -4718,7 +4685,6 @@ if ready:
             st.markdown("Energy efficiency (E_discharge / E_charge) provides insights into voltage polarization and cycle life")
             
             try:
-                from plotting import plot_energy_efficiency
                 ee_fig = plot_energy_efficiency(
                     dfs, show_lines, remove_last_cycle, show_graph_title, experiment_name,
                     remove_markers=remove_markers, hide_legend=hide_legend, 
@@ -4811,54 +4777,73 @@ if ready:
                     with summary_cols[1]:
                         st.metric("Notes", "Included" if include_notes else "Off")
                 
-                from export import export_powerpoint
+                
+                pptx_options = {
+                    'show_averages': show_average_performance,
+                    'experiment_name': experiment_name,
+                    'show_lines': show_lines,
+                    'show_efficiency_lines': show_efficiency_lines,
+                    'remove_last_cycle': remove_last_cycle,
+                    'include_summary_table': include_summary_table,
+                    'include_main_plot': include_main_plot,
+                    'include_retention_plot': include_retention_plot,
+                    'include_notes': include_notes,
+                    'include_electrode_data': include_electrode_data,
+                    'include_porosity': include_porosity,
+                    'include_thickness': include_thickness,
+                    'include_solids_content': include_solids_content,
+                    'include_formulation': include_formulation,
+                    'experiment_notes': stored_experiment_notes if include_notes else "",
+                    'retention_threshold': current_threshold,
+                    'reference_cycle': current_ref_cycle,
+                    'formation_cycles': dfs[0].get('formation_cycles', 4) if dfs else st.session_state.get('current_formation_cycles', 4),
+                    'retention_show_lines': show_lines,
+                    'retention_remove_markers': remove_markers,
+                    'retention_hide_legend': hide_legend,
+                    'retention_show_title': show_graph_title,
+                    'show_baseline_line': st.session_state.get('retention_show_baseline', True),
+                    'show_threshold_line': st.session_state.get('retention_show_threshold', True),
+                    'y_axis_min': st.session_state.get('y_axis_min', 0.0),
+                    'y_axis_max': st.session_state.get('y_axis_max', 110.0),
+                    'show_graph_title': st.session_state.get('show_graph_title', True),
+                    'show_average_performance': show_average_performance,
+                    'avg_line_toggles': st.session_state.get('avg_line_toggles', {}),
+                    'remove_markers': st.session_state.get('remove_markers', False),
+                    'hide_legend': st.session_state.get('hide_legend', False),
+                }
+                # The deck is only rendered on request; the stored bytes are offered
+                # for download while each cell's data and metadata and the slide options stay the same
+                pptx_signature = (
+                    tuple(
+                        (hash_dataframe(d['df']), repr({k: v for k, v in d.items() if k != 'df'}))
+                        for d in dfs
+                    ),
+                    repr(pptx_options),
+                )
                 
                 try:
-                    with st.spinner("Preparing PowerPoint..."):
-                        pptx_bytes, pptx_file_name = export_powerpoint(
-                            dfs=dfs,
-                            show_averages=show_average_performance,
-                            experiment_name=experiment_name,
-                            show_lines=show_lines,
-                            show_efficiency_lines=show_efficiency_lines,
-                            remove_last_cycle=remove_last_cycle,
-                            include_summary_table=include_summary_table,
-                            include_main_plot=include_main_plot,
-                            include_retention_plot=include_retention_plot,
-                            include_notes=include_notes,
-                            include_electrode_data=include_electrode_data,
-                            include_porosity=include_porosity,
-                            include_thickness=include_thickness,
-                            include_solids_content=include_solids_content,
-                            include_formulation=include_formulation,
-                            experiment_notes=stored_experiment_notes if include_notes else "",
-                            retention_threshold=current_threshold,
-                            reference_cycle=current_ref_cycle,
-                            formation_cycles=dfs[0].get('formation_cycles', 4) if dfs else st.session_state.get('current_formation_cycles', 4),
-                            retention_show_lines=show_lines,
-                            retention_remove_markers=remove_markers,
-                            retention_hide_legend=hide_legend,
-                            retention_show_title=show_graph_title,
-                            show_baseline_line=st.session_state.get('retention_show_baseline', True),
-                            show_threshold_line=st.session_state.get('retention_show_threshold', True),
-                            y_axis_min=st.session_state.get('y_axis_min', 0.0),
-                            y_axis_max=st.session_state.get('y_axis_max', 110.0),
-                            show_graph_title=st.session_state.get('show_graph_title', True),
-                            show_average_performance=show_average_performance,
-                            avg_line_toggles=st.session_state.get('avg_line_toggles', {}),
-                            remove_markers=st.session_state.get('remove_markers', False),
-                            hide_legend=st.session_state.get('hide_legend', False)
-                        )
+                    if st.button("Prepare PowerPoint", key='prep_pptx', use_container_width=True):
+                        with st.spinner("Preparing PowerPoint..."):
+                            pptx_bytes, pptx_file_name = build_experiment_pptx(dfs, **pptx_options)
+                        st.session_state['pptx_export'] = {
+                            'signature': pptx_signature,
+                            'bytes': pptx_bytes,
+                            'file_name': pptx_file_name,
+                        }
                     
-                    st.download_button(
-                        "Download PowerPoint",
-                        data=pptx_bytes,
-                        file_name=pptx_file_name,
-                        mime='application/vnd.openxmlformats-officedocument.presentationml.presentation',
-                        key='download_enhanced_pptx',
-                        use_container_width=True
-                    )
-                    st.caption(f"Ready: {pptx_file_name}")
+                    pptx_export = st.session_state.get('pptx_export')
+                    if pptx_export and pptx_export['signature'] == pptx_signature:
+                        st.download_button(
+                            "Download PowerPoint",
+                            data=pptx_export['bytes'],
+                            file_name=pptx_export['file_name'],
+                            mime='application/vnd.openxmlformats-officedocument.presentationml.presentation',
+                            key='download_enhanced_pptx',
+                            use_container_width=True
+                        )
+                        st.caption(f"Ready: {pptx_export['file_name']}")
+                    elif pptx_export:
+                        st.caption("Slide options or cells changed since the last build. Prepare the PowerPoint again to download.")
                 except Exception as e:
                     st.error(f"Error generating PowerPoint: {str(e)}")
                     st.error("Please check your data and settings, then try again.")
@@ -4871,23 +4856,15 @@ if ready:
                     
                     if st.button("Build Project PowerPoint", type="secondary", use_container_width=True):
                         try:
-                            from database import get_all_project_experiments_data, get_project_by_id
-                            from export import export_powerpoint
-                            from io import BytesIO
-                            from pptx import Presentation
-                            import json
-                            from io import StringIO
-                            from data_processing import calculate_efficiency_based_on_project_type
                             
                             # Get all experiments for the project, sorted by creation date
-                            all_experiments_data = get_all_project_experiments_data(current_project_id)
+                            all_experiments_data = get_all_project_experiments_data(current_project_id, inline_cells=False)
                             
                             if not all_experiments_data:
                                 st.error("No experiments found in this project.")
                             else:
                                 # Sort by creation date (chronologically)
                                 # Handle None values by using a far-future date for sorting
-                                from datetime import datetime
                                 def get_sort_key(exp_data):
                                     created_date = exp_data[13] if len(exp_data) > 13 else None  # created_date is index 13
                                     if created_date is None:
@@ -4930,7 +4907,7 @@ if ready:
                                         if not cells_data:
                                             # Single cell experiment
                                             cells_data = [{
-                                                'data_json': data_json,
+                                                **legacy_cell_source(data_json, parsed_data),
                                                 'cell_name': exp_name,
                                                 'test_number': test_number,
                                                 'loading': loading,
@@ -4945,11 +4922,10 @@ if ready:
                                             if cell_data.get('excluded', False):
                                                 continue
                                             
-                                            cell_data_json = cell_data.get('data_json', '')
-                                            if not cell_data_json:
+                                            if not (cell_data.get('data_json') or cell_data.get('parquet_path')):
                                                 continue
                                             
-                                            df = pd.read_json(StringIO(cell_data_json))
+                                            df = load_cell_dataframe(cell_data)
                                             
                                             # Recalculate efficiency based on project type
                                             if 'Q charge (mA.h)' in df.columns and 'Q discharge (mA.h)' in df.columns:
@@ -5057,11 +5033,10 @@ if ready:
                 st.subheader("Excel")
                 st.caption("Download the processed data and summary sheets for the current experiment.")
                 
-                from export import export_excel
                 
                 try:
                     with st.spinner("Preparing Excel workbook..."):
-                        excel_bytes, excel_file_name = export_excel(dfs, show_average_performance, experiment_name)
+                        excel_bytes, excel_file_name = build_experiment_excel(dfs, show_average_performance, experiment_name)
                     
                     st.download_button(
                         "Download Excel",
@@ -5109,7 +5084,7 @@ if tab_comparison and current_project_id:
         st.caption(f"Project: {current_project_name}")
         
         # Get all experiments data for this project
-        all_experiments_data = get_all_project_experiments_data(current_project_id)
+        all_experiments_data = get_all_project_experiments_data(current_project_id, inline_cells=False)
         
         if not all_experiments_data:
             st.info("No experiments found in this project. Create experiments to see comparison data.")
@@ -5182,7 +5157,7 @@ if tab_comparison and current_project_id:
                                     continue
                                     
                                 try:
-                                    df = pd.read_json(StringIO(cell_data['data_json']))
+                                    df = load_cell_dataframe(cell_data)
                                     
                                     # Get project type for efficiency calculation
                                     project_type = "Full Cell"  # Default
@@ -5222,7 +5197,7 @@ if tab_comparison and current_project_id:
                                 comparison_data.append(exp_summary)
                         else:
                             # Legacy single cell experiment
-                            df = pd.read_json(StringIO(data_json))
+                            df = load_cell_dataframe(legacy_cell_source(data_json, parsed_data))
                             
                             # Get project type for efficiency calculation
                             project_type = "Full Cell"  # Default
@@ -5348,8 +5323,8 @@ if tab_comparison and current_project_id:
                                     if cell_data.get('excluded', False):
                                         continue  # Skip excluded cells
                                     
-                                    if 'data_json' in cell_data:
-                                        df = pd.read_json(StringIO(cell_data['data_json']))
+                                    if cell_data.get('data_json') or cell_data.get('parquet_path'):
+                                        df = load_cell_dataframe(cell_data)
                                         test_num = cell_data.get('test_number', cell_data.get('testnum', f'Cell {len(dfs)+1}'))
                                         dfs.append({
                                             'df': df,
@@ -5360,7 +5335,7 @@ if tab_comparison and current_project_id:
                                         })
                             else:
                                 # Single cell experiment - data_json is at the top level
-                                df = pd.read_json(StringIO(data_json))
+                                df = load_cell_dataframe(legacy_cell_source(data_json, parsed_data))
                                 test_num = test_number or f'Cell 1'
                                 dfs.append({
                                     'df': df,
@@ -5456,7 +5431,7 @@ if tab_comparison and current_project_id:
                                 
                                 # Export option for the comparison plot
                                 buf = io.BytesIO()
-                                comparison_fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
+                                comparison_fig.savefig(buf, format='png', dpi=300, bbox_inches='tight', pil_kwargs={'compress_level': 1})
                                 buf.seek(0)
                                 st.download_button(
                                     label="Download Plot",
@@ -5585,7 +5560,7 @@ if tab_comparison and current_project_id:
                 if selected_component:
                     # Get experiments with this component
                     matching_experiments = get_experiments_by_formulation_component(
-                        current_project_id, selected_component
+                        current_project_id, selected_component, inline_cells=False
                     )
                     
                     if not matching_experiments:
@@ -5604,7 +5579,8 @@ if tab_comparison and current_project_id:
                             filtered_experiments = get_experiments_by_formulation_component(
                                 current_project_id, selected_component,
                                 min_percentage=min_pct if min_pct > 0 else None,
-                                max_percentage=max_pct if max_pct < 100 else None
+                                max_percentage=max_pct if max_pct < 100 else None,
+                                inline_cells=False
                             )
                         else:
                             filtered_experiments = matching_experiments
@@ -5716,7 +5692,7 @@ if tab_comparison and current_project_id:
                                         
                                         # Export plot
                                         buf = io.BytesIO()
-                                        fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
+                                        fig.savefig(buf, format='png', dpi=300, bbox_inches='tight', pil_kwargs={'compress_level': 1})
                                         buf.seek(0)
                                         st.download_button(
                                             label=f"Download Plot",
@@ -5813,23 +5789,24 @@ if tab_comparison and current_project_id:
                                                         if cell.get('active_material') is not None:
                                                             cell_active_material = cell.get('active_material')
                                                         
-                                                        if 'data_json' in cell:
+                                                        if cell.get('data_json') or cell.get('parquet_path'):
                                                             try:
-                                                                df = pd.read_json(StringIO(cell['data_json']))
+                                                                df = load_cell_dataframe(cell)
                                                                 
                                                                 # Get first discharge capacity (max of first 3 cycles)
                                                                 if 'Q Dis (mAh/g)' in df.columns:
-                                                                    first_three = df['Q Dis (mAh/g)'].head(3).tolist()
+                                                                    qdis_arr = df['Q Dis (mAh/g)'].to_numpy()
+                                                                    first_three = qdis_arr[:3].tolist()
                                                                     if first_three:
                                                                         cell_first_discharge = max(first_three)
                                                                     
                                                                     # Get first post-formation cycle (reversible capacity)
                                                                     if len(df) > formation_cycles:
-                                                                        cell_reversible_capacity = df['Q Dis (mAh/g)'].iloc[formation_cycles]
+                                                                        cell_reversible_capacity = qdis_arr[formation_cycles]
                                                                 
                                                                 # Get first cycle efficiency
                                                                 if 'Efficiency (-)' in df.columns and len(df) > 0:
-                                                                    first_eff = df['Efficiency (-)'].iloc[0]
+                                                                    first_eff = df['Efficiency (-)'].to_numpy()[0]
                                                                     if first_eff is not None:
                                                                         try:
                                                                             cell_first_efficiency = float(first_eff) * 100
@@ -5840,7 +5817,7 @@ if tab_comparison and current_project_id:
                                                                 if 'Q Dis (mAh/g)' in df.columns and len(df) > formation_cycles:
                                                                     post_formation = df.iloc[formation_cycles:]
                                                                     if not post_formation.empty:
-                                                                        initial_capacity = post_formation['Q Dis (mAh/g)'].iloc[0]
+                                                                        initial_capacity = qdis_arr[formation_cycles]
                                                                         if initial_capacity > 0:
                                                                             threshold = 0.8 * initial_capacity
                                                                             below_threshold = post_formation[post_formation['Q Dis (mAh/g)'] < threshold]
@@ -5865,22 +5842,23 @@ if tab_comparison and current_project_id:
                                                 else:
                                                     # Legacy single cell experiment
                                                     try:
-                                                        df = pd.read_json(StringIO(data_json))
+                                                        df = load_cell_dataframe(legacy_cell_source(data_json, parsed_data))
                                                         formation_cycles = formation_cycles or 4
                                                         
                                                         if 'Q Dis (mAh/g)' in df.columns:
                                                             # First discharge (max of first 3)
-                                                            first_three = df['Q Dis (mAh/g)'].head(3).tolist()
+                                                            qdis_arr = df['Q Dis (mAh/g)'].to_numpy()
+                                                            first_three = qdis_arr[:3].tolist()
                                                             if first_three:
                                                                 first_discharge = max(first_three)
                                                             
                                                             # Reversible capacity
                                                             if len(df) > formation_cycles:
-                                                                reversible_capacity = df['Q Dis (mAh/g)'].iloc[formation_cycles]
+                                                                reversible_capacity = qdis_arr[formation_cycles]
                                                         
                                                         # First cycle efficiency
                                                         if 'Efficiency (-)' in df.columns and len(df) > 0:
-                                                            first_eff = df['Efficiency (-)'].iloc[0]
+                                                            first_eff = df['Efficiency (-)'].to_numpy()[0]
                                                             if first_eff is not None:
                                                                 try:
                                                                     first_efficiency = float(first_eff) * 100
@@ -5891,7 +5869,7 @@ if tab_comparison and current_project_id:
                                                         if 'Q Dis (mAh/g)' in df.columns and len(df) > formation_cycles:
                                                             post_formation = df.iloc[formation_cycles:]
                                                             if not post_formation.empty:
-                                                                initial_capacity = post_formation['Q Dis (mAh/g)'].iloc[0]
+                                                                initial_capacity = qdis_arr[formation_cycles]
                                                                 if initial_capacity > 0:
                                                                     threshold = 0.8 * initial_capacity
                                                                     below_threshold = post_formation[post_formation['Q Dis (mAh/g)'] < threshold]
@@ -5995,16 +5973,24 @@ if tab_master and current_project_id:
         st.markdown("---")
         
         # Get all experiments data for this project
-        all_experiments_data = get_all_project_experiments_data(current_project_id)
+        all_experiments_data = get_all_project_experiments_data(current_project_id, inline_cells=False)
         
         if not all_experiments_data:
             st.info("No experiments found in this project. Create experiments to see master table data.")
         else:
-            # Process experiment data
-            experiment_summaries = []
-            individual_cells = []
+            # Project type is shared by every cell; resolve it once here, since
+            # session state is only readable from the script thread
+            project_type = "Full Cell"  # Default
+            if st.session_state.get('current_project_id'):
+                project_info = get_project_by_id(st.session_state['current_project_id'])
+                if project_info:
+                    project_type = project_info[3]  # project_type is the 4th field
             
-            for exp_data in all_experiments_data:
+            def summarize_master_table_experiment(exp_data):
+                """Summaries for one experiment row: (experiment summaries, cell summaries, (cell name, frame) pairs, error message)."""
+                experiment_summaries = []
+                individual_cells = []
+                cell_frames = []
                 exp_id, exp_name, file_name, loading, active_material, formation_cycles, test_number, electrolyte, substrate, separator, formulation_json, data_json, created_date, porosity, experiment_notes, cutoff_voltage_lower, cutoff_voltage_upper = exp_data
                 
                 # If substrate or separator are None from database, we'll extract them from JSON data
@@ -6026,15 +6012,8 @@ if tab_master and current_project_id:
                             if cell_data.get('excluded', False):
                                 continue
                             try:
-                                df = pd.read_json(StringIO(cell_data['data_json']))
-                                
-                                # Get project type for efficiency calculation
-                                project_type = "Full Cell"  # Default
-                                if st.session_state.get('current_project_id'):
-                                    current_project_id = st.session_state['current_project_id']
-                                    project_info = get_project_by_id(current_project_id)
-                                    if project_info:
-                                        project_type = project_info[3]  # project_type is the 4th field
+                                df = load_cell_dataframe(cell_data)
+                                cell_frames.append((cell_data.get('test_number') or cell_data.get('cell_name', 'Unknown'), df))
                                 
                                 cell_summary = calculate_cell_summary(df, cell_data, disc_area_cm2, project_type)
                                 cell_summary['experiment_name'] = exp_name
@@ -6109,15 +6088,8 @@ if tab_master and current_project_id:
                     
                     else:
                         # Legacy single cell experiment
-                        df = pd.read_json(StringIO(data_json))
-                        
-                        # Get project type for efficiency calculation
-                        project_type = "Full Cell"  # Default
-                        if st.session_state.get('current_project_id'):
-                            current_project_id = st.session_state['current_project_id']
-                            project_info = get_project_by_id(current_project_id)
-                            if project_info:
-                                project_type = project_info[3]  # project_type is the 4th field
+                        df = load_cell_dataframe(legacy_cell_source(data_json, parsed_data))
+                        cell_frames.append((test_number or exp_name, df))
                         
                         cell_summary = calculate_cell_summary(df, {
                             'cell_name': test_number or exp_name,
@@ -6248,66 +6220,56 @@ if tab_master and current_project_id:
                         experiment_summaries.append(exp_summary)
                         
                 except Exception as e:
-                    st.error(f"Error processing experiment {exp_name}: {str(e)}")
-                    continue
+                    return experiment_summaries, individual_cells, cell_frames, f"Error processing experiment {exp_name}: {str(e)}"
+                return experiment_summaries, individual_cells, cell_frames, None
+            
+            # Experiments are independent; parquet reads and summary maths overlap across
+            # workers, and errors are reported back here on the script thread
+            experiment_summaries = []
+            individual_cells = []
+            cell_frames = []  # Decoded cycling frames, reused by the flagging pass below
+            with ThreadPoolExecutor(max_workers=MASTER_TABLE_WORKERS) as pool:
+                for exp_summaries, exp_cells, exp_frames, error in pool.map(summarize_master_table_experiment, all_experiments_data):
+                    experiment_summaries.extend(exp_summaries)
+                    individual_cells.extend(exp_cells)
+                    cell_frames.extend(exp_frames)
+                    if error:
+                        st.error(error)
             
             # ===========================
             # Automated Anomaly Detection & Flagging
             # ===========================
-            from cell_flags import analyze_cell_for_flags, get_experiment_context
+            from cell_flags import FlagAccumulator, analyze_cell_for_flags, get_experiment_context
             
-            all_flags = {}  # Dictionary mapping cell_name to list of flags
+            all_flags = FlagAccumulator()  # cell_name -> list of flags, with running summary counts
             
             if individual_cells:
                 # Build experiment context for statistical comparison
                 experiment_context = get_experiment_context(individual_cells)
                 
-                # Analyze each cell for anomalies
-                for exp_data in all_experiments_data:
-                    exp_id, exp_name, file_name, loading, active_material, formation_cycles, test_number, electrolyte, substrate, separator, formulation_json, data_json, created_date, porosity, experiment_notes, cutoff_voltage_lower, cutoff_voltage_upper = exp_data
-                    
+                # Index cell summaries by name once (first match wins, as before)
+                cell_summaries_by_name = {}
+                for c in individual_cells:
+                    cell_summaries_by_name.setdefault(c['cell_name'], c)
+                
+                # Analyze each cell for anomalies, on the frames the summary pass already
+                # decoded rather than parsing every data_json payload a second time
+                def flag_master_table_cell(cell_frame):
+                    cell_name, df = cell_frame
+                    cell_summary = cell_summaries_by_name.get(cell_name)
+                    if not cell_summary:
+                        return cell_name, None
                     try:
-                        parsed_data = json.loads(data_json)
-                        
-                        # Check if this is a multi-cell experiment or single cell
-                        if 'cells' in parsed_data:
-                            # Multi-cell experiment
-                            cells_data = parsed_data['cells']
-                            disc_diameter = parsed_data.get('disc_diameter_mm', 15)
-                            disc_area_cm2 = np.pi * (disc_diameter / 2 / 10) ** 2
-                            
-                            for cell_data in cells_data:
-                                if cell_data.get('excluded', False):
-                                    continue
-                                try:
-                                    df = pd.read_json(StringIO(cell_data['data_json']))
-                                    cell_name = cell_data.get('test_number') or cell_data.get('cell_name', 'Unknown')
-                                    
-                                    # Find corresponding cell_summary from individual_cells
-                                    cell_summary = next((c for c in individual_cells if c['cell_name'] == cell_name), None)
-                                    
-                                    if cell_summary:
-                                        # Analyze cell for flags
-                                        flags = analyze_cell_for_flags(df, cell_summary, experiment_context)
-                                        all_flags[cell_name] = flags
-                                except Exception:
-                                    continue
-                        
-                        else:
-                            # Legacy single cell experiment
-                            df = pd.read_json(StringIO(data_json))
-                            cell_name = test_number or exp_name
-                            
-                            # Find corresponding cell_summary
-                            cell_summary = next((c for c in individual_cells if c['cell_name'] == cell_name), None)
-                            
-                            if cell_summary:
-                                # Analyze cell for flags
-                                flags = analyze_cell_for_flags(df, cell_summary, experiment_context)
-                                all_flags[cell_name] = flags
-                    
+                        return cell_name, analyze_cell_for_flags(df, cell_summary, experiment_context)
                     except Exception:
-                        continue
+                        return cell_name, None
+                
+                # Cells are independent, so they are flagged on the same worker pool size as
+                # the summaries; map() keeps input order, so later duplicates still win
+                with ThreadPoolExecutor(max_workers=MASTER_TABLE_WORKERS) as pool:
+                    for cell_name, flags in pool.map(flag_master_table_cell, cell_frames):
+                        if flags is not None:
+                            all_flags[cell_name] = flags
             
             # Import flag display functions
             from display_components import display_cell_flags_summary, display_detailed_flags_section
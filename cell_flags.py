@@ -8,15 +8,23 @@ using statistical, pattern-based, and physics-based algorithms.
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
+import numbers
+from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
 
 
 class FlagSeverity(Enum):
-    """Flag severity levels."""
-    INFO = "ℹ️"
-    WARNING = "⚠️"
-    CRITICAL = "🚨"
+    """Flag severity levels. The value is the display icon; `rank` sorts most severe first."""
+    INFO = ("ℹ️", 2)
+    WARNING = ("⚠️", 1)
+    CRITICAL = ("🚨", 0)
+    
+    def __new__(cls, icon: str, rank: int):
+        member = object.__new__(cls)
+        member._value_ = icon
+        member.rank = rank
+        return member
 
 
 class FlagCategory(Enum):
@@ -27,9 +35,9 @@ class FlagCategory(Enum):
     ELECTROCHEMISTRY = "Electrochemistry"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CellFlag:
-    """Represents a single cell flag/anomaly."""
+    """Represents a single cell flag/anomaly. Immutable and slotted, as many are built per cell."""
     flag_id: str
     flag_type: str
     severity: FlagSeverity
@@ -60,6 +68,30 @@ class CellFlag:
         }
 
 
+@dataclass(slots=True, frozen=True)
+class CellArrays:
+    """
+    Per-cell column data and shared intermediate values used by the detectors.
+    
+    Built once per cell by prepare_cell_arrays(), which is the only place the
+    detectors' inputs are read from the DataFrame. Array fields are None when
+    the column is missing, and derived values are None (or NaN) when they
+    cannot be computed.
+    """
+    n_rows: int                       # Number of cycles (rows) in the frame
+    qdis: Optional[np.ndarray]        # Discharge capacity (mAh/g), NaN where missing
+    capacity: Optional[np.ndarray]    # Discharge capacity with missing values dropped
+    eff: Optional[np.ndarray]         # Coulombic efficiency as a fraction, NaN where missing
+    cycle: Optional[np.ndarray]       # First column of the frame (cycle number)
+    initial_cap: Optional[float]      # Max capacity of the first 3 cycles
+    qdis_max: float                   # Peak discharge capacity, NaN if none recorded
+    eff_max: float                    # Peak efficiency (fraction), NaN if none recorded
+    ce_cycles: int                    # Number of cycles from cycle 5 onward
+    ce_mean: float                    # Mean post-formation CE (%), missing values skipped
+    ce_std: float                     # Sample std of post-formation CE (%)
+    missing_pct: Dict[str, float]     # % missing per critical column present in the frame
+
+
 def analyze_cell_for_flags(df: pd.DataFrame, cell_data: Dict[str, Any], 
                            experiment_context: Optional[Dict[str, Any]] = None) -> List[CellFlag]:
     """
@@ -75,96 +107,170 @@ def analyze_cell_for_flags(df: pd.DataFrame, cell_data: Dict[str, Any],
     """
     flags = []
     
+    # Read the cycling columns once; every detector below works on these arrays
+    arrs = prepare_cell_arrays(df)
+    
     # Performance-based detection
-    flags.extend(detect_performance_anomalies(df, cell_data))
+    flags.extend(detect_performance_anomalies(df, cell_data, arrs))
     
     # Data integrity checks
-    flags.extend(detect_data_integrity_issues(df, cell_data))
+    flags.extend(detect_data_integrity_issues(df, cell_data, arrs))
     
     # Electrochemical violations
-    flags.extend(detect_electrochemical_violations(df, cell_data))
+    flags.extend(detect_electrochemical_violations(df, cell_data, arrs))
     
     # Statistical anomalies (if we have experiment context)
     if experiment_context:
         flags.extend(detect_statistical_anomalies(cell_data, experiment_context))
     
     # Sort by severity (Critical > Warning > Info) and then by confidence
-    severity_order = {FlagSeverity.CRITICAL: 0, FlagSeverity.WARNING: 1, FlagSeverity.INFO: 2}
-    flags.sort(key=lambda f: (severity_order[f.severity], -f.confidence))
+    flags.sort(key=lambda f: (f.severity.rank, -f.confidence))
     
     return flags
 
 
-def detect_performance_anomalies(df: pd.DataFrame, cell_data: Dict[str, Any]) -> List[CellFlag]:
+# Columns checked for missing values by detect_missing_data
+CRITICAL_COLUMNS = ('Q Dis (mAh/g)', 'Q Chg (mAh/g)', 'Efficiency (-)')
+
+
+def _column_array(df: pd.DataFrame, col: str, columns: frozenset) -> Optional[np.ndarray]:
+    """Return a column as a float ndarray (NaN for missing), or None if absent, duplicated or non-numeric."""
+    if col not in columns:
+        return None
+    series = df[col]
+    if not isinstance(series, pd.Series):
+        # Duplicate column names select a DataFrame rather than one column
+        return None
+    if series.dtype == np.float64:
+        # Already float64 with NaN for gaps: a zero-copy view (detectors never write to it)
+        return series.to_numpy()
+    try:
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        return None
+
+
+def prepare_cell_arrays(df: pd.DataFrame) -> CellArrays:
+    """Extract the columns used by the detectors, and the values they share, once per cell."""
+    # Column membership is resolved against one hashed set rather than rescanning df.columns
+    columns = frozenset(df.columns)
+    qdis = _column_array(df, 'Q Dis (mAh/g)', columns)
+    capacity = qdis[~np.isnan(qdis)] if qdis is not None else None
+    eff = _column_array(df, 'Efficiency (-)', columns)
+    
+    # Post-formation CE (cycles 5+) in percent, shared by the CE detectors
+    ce_cycles, ce_mean, ce_std = 0, np.nan, np.nan
+    if eff is not None:
+        efficiency = eff[4:] * 100
+        ce_cycles = len(efficiency)
+        efficiency = efficiency[~np.isnan(efficiency)]
+        if len(efficiency):
+            ce_mean = efficiency.mean()
+        if len(efficiency) > 1:
+            ce_std = efficiency.std(ddof=1)
+    
+    # One isna pass over all critical columns at once
+    present = [col for col in CRITICAL_COLUMNS if col in columns]
+    missing_pct = {}
+    if present and len(df):
+        missing_pct = dict(zip(present, df[present].isna().to_numpy().mean(axis=0) * 100))
+    
+    return CellArrays(
+        n_rows=len(df),
+        qdis=qdis,
+        capacity=capacity,
+        eff=eff,
+        cycle=df.iloc[:, 0].to_numpy() if columns else None,
+        initial_cap=capacity[:3].max() if capacity is not None and len(capacity) else None,
+        # fmax skips NaN, so each peak is a single reduction with no mask allocated
+        qdis_max=np.fmax.reduce(qdis) if qdis is not None and len(qdis) else np.nan,
+        eff_max=np.fmax.reduce(eff) if eff is not None and len(eff) else np.nan,
+        ce_cycles=ce_cycles,
+        ce_mean=ce_mean,
+        ce_std=ce_std,
+        missing_pct=missing_pct,
+    )
+
+
+def detect_performance_anomalies(df: pd.DataFrame, cell_data: Dict[str, Any],
+                                 arrs: Optional[CellArrays] = None) -> List[CellFlag]:
     """Detect performance-related anomalies (capacity fade, efficiency issues, etc.)."""
     flags = []
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
     
     # 1. Rapid Capacity Fade Detection
-    rapid_fade_flag = detect_rapid_capacity_fade(df)
+    rapid_fade_flag = detect_rapid_capacity_fade(df, arrs)
     if rapid_fade_flag:
         flags.append(rapid_fade_flag)
     
     # 2. Cell Failure Detection
-    failure_flag = detect_cell_failure(df)
+    failure_flag = detect_cell_failure(df, arrs)
     if failure_flag:
         flags.append(failure_flag)
     
     # 3. High CE Variation Detection
-    ce_variation_flag = detect_high_ce_variation(df)
+    ce_variation_flag = detect_high_ce_variation(df, arrs)
     if ce_variation_flag:
         flags.append(ce_variation_flag)
     
     # 4. Low Coulombic Efficiency Detection
-    low_ce_flag = detect_low_coulombic_efficiency(df)
+    low_ce_flag = detect_low_coulombic_efficiency(df, arrs)
     if low_ce_flag:
         flags.append(low_ce_flag)
     
     # 5. Accelerating Degradation Detection
-    accel_deg_flag = detect_accelerating_degradation(df)
+    accel_deg_flag = detect_accelerating_degradation(df, arrs)
     if accel_deg_flag:
         flags.append(accel_deg_flag)
     
     # 6. First Cycle Issues
-    first_cycle_flag = detect_first_cycle_issues(df, cell_data)
+    first_cycle_flag = detect_first_cycle_issues(df, cell_data, arrs)
     if first_cycle_flag:
         flags.append(first_cycle_flag)
     
     return flags
 
 
-def detect_data_integrity_issues(df: pd.DataFrame, cell_data: Dict[str, Any]) -> List[CellFlag]:
+def detect_data_integrity_issues(df: pd.DataFrame, cell_data: Dict[str, Any],
+                                 arrs: Optional[CellArrays] = None) -> List[CellFlag]:
     """Detect data quality and integrity issues."""
     flags = []
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
     
     # 1. Incomplete Dataset Detection
-    incomplete_flag = detect_incomplete_dataset(df, cell_data)
+    incomplete_flag = detect_incomplete_dataset(df, cell_data, arrs)
     if incomplete_flag:
         flags.append(incomplete_flag)
     
     # 2. Missing Data Detection
-    missing_data_flag = detect_missing_data(df)
+    missing_data_flag = detect_missing_data(df, arrs)
     if missing_data_flag:
         flags.append(missing_data_flag)
     
     # 3. Data Consistency Issues
-    consistency_flag = detect_data_inconsistency(df)
+    consistency_flag = detect_data_inconsistency(df, arrs)
     if consistency_flag:
         flags.append(consistency_flag)
     
     return flags
 
 
-def detect_electrochemical_violations(df: pd.DataFrame, cell_data: Dict[str, Any]) -> List[CellFlag]:
+def detect_electrochemical_violations(df: pd.DataFrame, cell_data: Dict[str, Any],
+                                      arrs: Optional[CellArrays] = None) -> List[CellFlag]:
     """Detect violations of electrochemical principles (physics-based detection)."""
     flags = []
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
     
     # 1. Impossible Efficiency (>100%)
-    impossible_eff_flag = detect_impossible_efficiency(df)
+    impossible_eff_flag = detect_impossible_efficiency(df, arrs)
     if impossible_eff_flag:
         flags.append(impossible_eff_flag)
     
     # 2. Theoretical Capacity Violation
-    capacity_violation_flag = detect_theoretical_capacity_violation(df, cell_data)
+    capacity_violation_flag = detect_theoretical_capacity_violation(df, cell_data, arrs)
     if capacity_violation_flag:
         flags.append(capacity_violation_flag)
     
@@ -187,436 +293,446 @@ def detect_statistical_anomalies(cell_data: Dict[str, Any],
 # ===========================
 # Individual Detection Functions
 # ===========================
+#
+# Each detector accepts the arrays from prepare_cell_arrays(); when called
+# directly with only a DataFrame, they are extracted on the fly.
 
-def detect_rapid_capacity_fade(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_rapid_capacity_fade(df: pd.DataFrame,
+                               arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect rapid capacity fade in early cycles."""
-    if 'Q Dis (mAh/g)' not in df.columns or len(df) < 10:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    qdis = arrs.qdis
+    if qdis is None or len(qdis) < 10:
         return None
     
-    try:
-        capacity = df['Q Dis (mAh/g)'].dropna()
-        if len(capacity) < 10:
-            return None
-        
-        # Calculate initial capacity (max of first 3 cycles)
-        initial_cap = capacity.head(3).max()
-        if initial_cap <= 0:
-            return None
-        
-        # Check capacity at cycle 10
-        cap_at_10 = capacity.iloc[9] if len(capacity) > 9 else capacity.iloc[-1]
-        retention_pct = (cap_at_10 / initial_cap) * 100
-        
-        if retention_pct < 80:
-            severity = FlagSeverity.CRITICAL if retention_pct < 70 else FlagSeverity.WARNING
-            confidence = 0.95 if retention_pct < 70 else 0.85
-            
-            return CellFlag(
-                flag_id='rapid_capacity_fade',
-                flag_type='Rapid Capacity Fade',
-                severity=severity,
-                category=FlagCategory.PERFORMANCE,
-                description=f"Cell shows rapid capacity loss: {retention_pct:.1f}% retention after 10 cycles",
-                confidence=confidence,
-                algorithm='pattern_rapid_fade',
-                cycle=10,
-                metric_value=retention_pct,
-                threshold_value=80.0,
-                recommendation="Check electrode processing quality, electrolyte compatibility, and cycling conditions. Consider cell manufacturing defects."
-            )
-    except Exception:
-        pass
+    capacity = arrs.capacity
+    if len(capacity) < 10:
+        return None
+    
+    # Calculate initial capacity (max of first 3 cycles)
+    initial_cap = arrs.initial_cap
+    if initial_cap <= 0:
+        return None
+    
+    # Check capacity at cycle 10
+    cap_at_10 = capacity[9]
+    retention_pct = (cap_at_10 / initial_cap) * 100
+    
+    if retention_pct < 80:
+        severity = FlagSeverity.CRITICAL if retention_pct < 70 else FlagSeverity.WARNING
+        confidence = 0.95 if retention_pct < 70 else 0.85
+        
+        return CellFlag(
+            flag_id='rapid_capacity_fade',
+            flag_type='Rapid Capacity Fade',
+            severity=severity,
+            category=FlagCategory.PERFORMANCE,
+            description=f"Cell shows rapid capacity loss: {retention_pct:.1f}% retention after 10 cycles",
+            confidence=confidence,
+            algorithm='pattern_rapid_fade',
+            cycle=10,
+            metric_value=retention_pct,
+            threshold_value=80.0,
+            recommendation="Check electrode processing quality, electrolyte compatibility, and cycling conditions. Consider cell manufacturing defects."
+        )
     
     return None
 
 
-def detect_cell_failure(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_cell_failure(df: pd.DataFrame,
+                        arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect complete or near-complete cell failure."""
-    if 'Q Dis (mAh/g)' not in df.columns or len(df) < 5:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    qdis = arrs.qdis
+    if qdis is None or len(qdis) < 5:
         return None
     
-    try:
-        capacity = df['Q Dis (mAh/g)'].dropna()
-        if len(capacity) < 5:
-            return None
-        
-        # Get initial capacity
-        initial_cap = capacity.head(3).max()
-        if initial_cap <= 0:
-            return None
-        
-        # Check if any recent capacity drops below 50% of initial
-        recent_capacity = capacity.tail(min(5, len(capacity)))
-        min_recent_cap = recent_capacity.min()
-        retention_pct = (min_recent_cap / initial_cap) * 100
-        
-        if retention_pct < 50 and len(capacity) < 50:  # Early failure
-            return CellFlag(
-                flag_id='cell_failure',
-                flag_type='Cell Failure',
-                severity=FlagSeverity.CRITICAL,
-                category=FlagCategory.PERFORMANCE,
-                description=f"Cell failure detected: capacity dropped to {retention_pct:.1f}% of initial value",
-                confidence=0.98,
-                algorithm='pattern_cell_failure',
-                metric_value=retention_pct,
-                threshold_value=50.0,
-                recommendation="Cell has failed. Check for internal short, dendrite formation, or severe degradation. Data may not be reliable."
-            )
-    except Exception:
-        pass
+    capacity = arrs.capacity
+    if len(capacity) < 5:
+        return None
+    
+    # Get initial capacity
+    initial_cap = arrs.initial_cap
+    if initial_cap <= 0:
+        return None
+    
+    # Check if any recent capacity drops below 50% of initial
+    min_recent_cap = capacity[-5:].min()
+    retention_pct = (min_recent_cap / initial_cap) * 100
+    
+    if retention_pct < 50 and len(capacity) < 50:  # Early failure
+        return CellFlag(
+            flag_id='cell_failure',
+            flag_type='Cell Failure',
+            severity=FlagSeverity.CRITICAL,
+            category=FlagCategory.PERFORMANCE,
+            description=f"Cell failure detected: capacity dropped to {retention_pct:.1f}% of initial value",
+            confidence=0.98,
+            algorithm='pattern_cell_failure',
+            metric_value=retention_pct,
+            threshold_value=50.0,
+            recommendation="Cell has failed. Check for internal short, dendrite formation, or severe degradation. Data may not be reliable."
+        )
     
     return None
 
 
-def detect_high_ce_variation(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_high_ce_variation(df: pd.DataFrame,
+                             arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect high variation in coulombic efficiency during stable cycling."""
-    if 'Efficiency (-)' not in df.columns or len(df) < 10:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    eff = arrs.eff
+    if eff is None or len(eff) < 10:
         return None
     
-    try:
-        # Use efficiency data from after formation cycles (cycles 5+)
-        efficiency = df['Efficiency (-)'].iloc[4:] * 100  # Convert to percentage
-        
-        if len(efficiency) < 5:
-            return None
-        
-        ce_mean = efficiency.mean()
-        ce_std = efficiency.std()
-        
-        # Only flag if mean CE is reasonable (>90%) but variation is high
-        if ce_mean > 90 and ce_std > 5.0:
-            severity = FlagSeverity.CRITICAL if ce_std > 10 else FlagSeverity.WARNING
-            confidence = 0.90 if ce_std > 10 else 0.80
-            
-            return CellFlag(
-                flag_id='high_ce_variation',
-                flag_type='High CE Variation',
-                severity=severity,
-                category=FlagCategory.PERFORMANCE,
-                description=f"High coulombic efficiency variation: {ce_std:.1f}% std dev (mean: {ce_mean:.1f}%)",
-                confidence=confidence,
-                algorithm='statistical_ce_variation',
-                metric_value=ce_std,
-                threshold_value=5.0,
-                recommendation="Check for inconsistent cycling conditions, temperature fluctuations, or electrode stability issues."
-            )
-    except Exception:
-        pass
+    # Use efficiency data from after formation cycles (cycles 5+)
+    if arrs.ce_cycles < 5:
+        return None
+    
+    ce_mean = arrs.ce_mean
+    ce_std = arrs.ce_std
+    
+    # Only flag if mean CE is reasonable (>90%) but variation is high
+    if ce_mean > 90 and ce_std > 5.0:
+        severity = FlagSeverity.CRITICAL if ce_std > 10 else FlagSeverity.WARNING
+        confidence = 0.90 if ce_std > 10 else 0.80
+        
+        return CellFlag(
+            flag_id='high_ce_variation',
+            flag_type='High CE Variation',
+            severity=severity,
+            category=FlagCategory.PERFORMANCE,
+            description=f"High coulombic efficiency variation: {ce_std:.1f}% std dev (mean: {ce_mean:.1f}%)",
+            confidence=confidence,
+            algorithm='statistical_ce_variation',
+            metric_value=ce_std,
+            threshold_value=5.0,
+            recommendation="Check for inconsistent cycling conditions, temperature fluctuations, or electrode stability issues."
+        )
     
     return None
 
 
-def detect_low_coulombic_efficiency(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_low_coulombic_efficiency(df: pd.DataFrame,
+                                    arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect consistently low coulombic efficiency."""
-    if 'Efficiency (-)' not in df.columns or len(df) < 10:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    eff = arrs.eff
+    if eff is None or len(eff) < 10:
         return None
     
-    try:
-        # Use efficiency data from after formation cycles (cycles 5+)
-        efficiency = df['Efficiency (-)'].iloc[4:] * 100  # Convert to percentage
-        
-        if len(efficiency) < 5:
-            return None
-        
-        ce_mean = efficiency.mean()
-        
-        if ce_mean < 95:
-            severity = FlagSeverity.CRITICAL if ce_mean < 90 else FlagSeverity.WARNING
-            confidence = 0.95
-            
-            return CellFlag(
-                flag_id='low_coulombic_efficiency',
-                flag_type='Low Coulombic Efficiency',
-                severity=severity,
-                category=FlagCategory.PERFORMANCE,
-                description=f"Consistently low coulombic efficiency: {ce_mean:.2f}% average",
-                confidence=confidence,
-                algorithm='statistical_low_ce',
-                metric_value=ce_mean,
-                threshold_value=95.0,
-                recommendation="Low CE indicates side reactions or active material loss. Check electrolyte stability and electrode-electrolyte interface."
-            )
-    except Exception:
-        pass
+    # Use efficiency data from after formation cycles (cycles 5+)
+    if arrs.ce_cycles < 5:
+        return None
+    
+    ce_mean = arrs.ce_mean
+    
+    if ce_mean < 95:
+        severity = FlagSeverity.CRITICAL if ce_mean < 90 else FlagSeverity.WARNING
+        confidence = 0.95
+        
+        return CellFlag(
+            flag_id='low_coulombic_efficiency',
+            flag_type='Low Coulombic Efficiency',
+            severity=severity,
+            category=FlagCategory.PERFORMANCE,
+            description=f"Consistently low coulombic efficiency: {ce_mean:.2f}% average",
+            confidence=confidence,
+            algorithm='statistical_low_ce',
+            metric_value=ce_mean,
+            threshold_value=95.0,
+            recommendation="Low CE indicates side reactions or active material loss. Check electrolyte stability and electrode-electrolyte interface."
+        )
     
     return None
 
 
-def detect_accelerating_degradation(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_accelerating_degradation(df: pd.DataFrame,
+                                    arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect if degradation rate is increasing over time."""
-    if 'Q Dis (mAh/g)' not in df.columns or len(df) < 20:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    qdis = arrs.qdis
+    if qdis is None or len(qdis) < 20:
         return None
     
-    try:
-        capacity = df['Q Dis (mAh/g)'].dropna()
-        if len(capacity) < 20:
-            return None
-        
-        # Split into early and late periods
-        mid_point = len(capacity) // 2
-        early_capacity = capacity.iloc[:mid_point]
-        late_capacity = capacity.iloc[mid_point:]
-        
-        # Calculate fade rates for each period (% per cycle)
-        early_fade_rate = calculate_fade_rate(early_capacity)
-        late_fade_rate = calculate_fade_rate(late_capacity)
-        
-        # Check if late fade rate is significantly higher than early
-        if early_fade_rate is not None and late_fade_rate is not None:
-            if late_fade_rate > early_fade_rate * 2 and late_fade_rate > 0.2:
-                return CellFlag(
-                    flag_id='accelerating_degradation',
-                    flag_type='Accelerating Degradation',
-                    severity=FlagSeverity.WARNING,
-                    category=FlagCategory.PERFORMANCE,
-                    description=f"Degradation rate increasing: early {early_fade_rate:.2f}%/cycle → late {late_fade_rate:.2f}%/cycle",
-                    confidence=0.85,
-                    algorithm='pattern_accelerating_fade',
-                    metric_value=late_fade_rate,
-                    threshold_value=early_fade_rate * 2,
-                    recommendation="Accelerating degradation suggests progressive failure mechanism. Check for dendrite growth or SEI instability."
-                )
-    except Exception:
-        pass
+    capacity = arrs.capacity
+    if len(capacity) < 20:
+        return None
+    
+    # Split into early and late periods
+    mid_point = len(capacity) // 2
+    early_capacity = capacity[:mid_point]
+    late_capacity = capacity[mid_point:]
+    
+    # Calculate fade rates for each period (% per cycle)
+    early_fade_rate = calculate_fade_rate(early_capacity)
+    late_fade_rate = calculate_fade_rate(late_capacity)
+    
+    # Check if late fade rate is significantly higher than early
+    if early_fade_rate is not None and late_fade_rate is not None:
+        if late_fade_rate > early_fade_rate * 2 and late_fade_rate > 0.2:
+            return CellFlag(
+                flag_id='accelerating_degradation',
+                flag_type='Accelerating Degradation',
+                severity=FlagSeverity.WARNING,
+                category=FlagCategory.PERFORMANCE,
+                description=f"Degradation rate increasing: early {early_fade_rate:.2f}%/cycle → late {late_fade_rate:.2f}%/cycle",
+                confidence=0.85,
+                algorithm='pattern_accelerating_fade',
+                metric_value=late_fade_rate,
+                threshold_value=early_fade_rate * 2,
+                recommendation="Accelerating degradation suggests progressive failure mechanism. Check for dendrite growth or SEI instability."
+            )
     
     return None
 
 
-def calculate_fade_rate(capacity_series: pd.Series) -> Optional[float]:
-    """Calculate capacity fade rate as percentage per cycle."""
+def calculate_fade_rate(capacity_series) -> Optional[float]:
+    """Calculate capacity fade rate as percentage per cycle (accepts a Series or 1-D array)."""
     try:
-        if len(capacity_series) < 2:
-            return None
-        
-        # Linear regression to get slope
-        cycles = np.arange(len(capacity_series))
-        coeffs = np.polyfit(cycles, capacity_series, 1)
-        slope = coeffs[0]
-        
-        # Convert to percentage per cycle
-        initial_cap = capacity_series.iloc[0]
-        if initial_cap > 0:
-            fade_rate_pct = abs(slope / initial_cap) * 100
-            return fade_rate_pct
-    except Exception:
-        pass
+        values = np.asarray(capacity_series, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if values.ndim != 1 or len(values) < 2:
+        return None
+    
+    # Least-squares slope against cycle index 0..n-1, in closed form:
+    # with centred x, slope = sum(x*y) / sum(x^2) and sum(x^2) = n(n^2-1)/12
+    n = len(values)
+    centred_cycles = np.arange(n) - (n - 1) / 2
+    slope = (centred_cycles @ values) / (n * (n * n - 1) / 12)
+    
+    # Convert to percentage per cycle
+    initial_cap = values[0]
+    if initial_cap > 0:
+        fade_rate_pct = abs(slope / initial_cap) * 100
+        return fade_rate_pct
     
     return None
 
 
-def detect_first_cycle_issues(df: pd.DataFrame, cell_data: Dict[str, Any]) -> Optional[CellFlag]:
+def detect_first_cycle_issues(df: pd.DataFrame, cell_data: Dict[str, Any],
+                              arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect issues with first cycle performance."""
-    if 'Efficiency (-)' not in df.columns or len(df) < 1:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    eff = arrs.eff
+    if eff is None or len(eff) < 1:
         return None
     
-    try:
-        first_efficiency = df['Efficiency (-)'].iloc[0] * 100
-        
-        # Flag extremely low first cycle efficiency
-        if first_efficiency < 60:
-            severity = FlagSeverity.CRITICAL if first_efficiency < 40 else FlagSeverity.WARNING
-            
-            return CellFlag(
-                flag_id='poor_first_cycle_efficiency',
-                flag_type='Poor First Cycle Efficiency',
-                severity=severity,
-                category=FlagCategory.PERFORMANCE,
-                description=f"Very low first cycle efficiency: {first_efficiency:.1f}%",
-                confidence=0.90,
-                algorithm='threshold_first_efficiency',
-                cycle=1,
-                metric_value=first_efficiency,
-                threshold_value=60.0,
-                recommendation="Low first cycle efficiency indicates excessive SEI formation or irreversible capacity loss. Check electrode surface area and electrolyte composition."
-            )
-    except Exception:
-        pass
+    first_efficiency = eff[0] * 100
+    
+    # Flag extremely low first cycle efficiency
+    if first_efficiency < 60:
+        severity = FlagSeverity.CRITICAL if first_efficiency < 40 else FlagSeverity.WARNING
+        
+        return CellFlag(
+            flag_id='poor_first_cycle_efficiency',
+            flag_type='Poor First Cycle Efficiency',
+            severity=severity,
+            category=FlagCategory.PERFORMANCE,
+            description=f"Very low first cycle efficiency: {first_efficiency:.1f}%",
+            confidence=0.90,
+            algorithm='threshold_first_efficiency',
+            cycle=1,
+            metric_value=first_efficiency,
+            threshold_value=60.0,
+            recommendation="Low first cycle efficiency indicates excessive SEI formation or irreversible capacity loss. Check electrode surface area and electrolyte composition."
+        )
     
     return None
 
 
-def detect_incomplete_dataset(df: pd.DataFrame, cell_data: Dict[str, Any]) -> Optional[CellFlag]:
+def detect_incomplete_dataset(df: pd.DataFrame, cell_data: Dict[str, Any],
+                              arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect if dataset appears incomplete or terminated early."""
-    if len(df) < 5:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    if arrs.n_rows < 5:
         return None
     
-    try:
-        # Check if cell stopped cycling unexpectedly (rapid termination)
-        capacity = df['Q Dis (mAh/g)'].dropna() if 'Q Dis (mAh/g)' in df.columns else None
+    # Check if cell stopped cycling unexpectedly (rapid termination)
+    capacity = arrs.capacity
+    
+    if capacity is not None and len(capacity) >= 5:
+        # Get initial capacity
+        initial_cap = arrs.initial_cap
+        final_cap = capacity[-1]
+        retention = (final_cap / initial_cap) * 100 if initial_cap > 0 else 100
+        
+        # If cell still has good capacity but few cycles, likely stopped early
+        if retention > 80 and len(capacity) < 30:
+            return CellFlag(
+                flag_id='incomplete_dataset',
+                flag_type='Incomplete Dataset',
+                severity=FlagSeverity.INFO,
+                category=FlagCategory.DATA_INTEGRITY,
+                description=f"Dataset appears incomplete: only {len(capacity)} cycles with {retention:.1f}% capacity retention",
+                confidence=0.75,
+                algorithm='heuristic_incomplete_data',
+                metric_value=len(capacity),
+                recommendation="Cell stopped early - data may not reflect full cycle life. Consider continuing test or marking as preliminary data."
+            )
         
-        if capacity is not None and len(capacity) >= 5:
-            # Get initial capacity
-            initial_cap = capacity.head(3).max()
-            final_cap = capacity.iloc[-1]
-            retention = (final_cap / initial_cap) * 100 if initial_cap > 0 else 100
+        # Check for abrupt termination (sudden stop in cycling)
+        if len(capacity) > 10:
+            # Check if capacity is stable at end (not degrading) - suggests manual stop
+            final_5_capacity = capacity[-5:]
+            final_5_mean = final_5_capacity.mean()
+            capacity_trend = final_5_capacity.std(ddof=1) / final_5_mean if final_5_mean > 0 else 0
             
-            # If cell still has good capacity but few cycles, likely stopped early
-            if retention > 80 and len(capacity) < 30:
+            if capacity_trend < 0.05 and retention > 70:  # Very stable capacity at end
                 return CellFlag(
-                    flag_id='incomplete_dataset',
-                    flag_type='Incomplete Dataset',
+                    flag_id='premature_termination',
+                    flag_type='Premature Termination',
                     severity=FlagSeverity.INFO,
                     category=FlagCategory.DATA_INTEGRITY,
-                    description=f"Dataset appears incomplete: only {len(capacity)} cycles with {retention:.1f}% capacity retention",
-                    confidence=0.75,
-                    algorithm='heuristic_incomplete_data',
-                    metric_value=len(capacity),
-                    recommendation="Cell stopped early - data may not reflect full cycle life. Consider continuing test or marking as preliminary data."
+                    description=f"Test terminated prematurely: {len(capacity)} cycles completed with stable capacity",
+                    confidence=0.80,
+                    algorithm='pattern_premature_stop',
+                    metric_value=retention,
+                    recommendation="Cell was stopped while still performing well. Cycle life data incomplete."
                 )
-            
-            # Check for abrupt termination (sudden stop in cycling)
-            if len(capacity) > 10:
-                # Check if capacity is stable at end (not degrading) - suggests manual stop
-                final_5_capacity = capacity.tail(5)
-                capacity_trend = final_5_capacity.std() / final_5_capacity.mean() if final_5_capacity.mean() > 0 else 0
-                
-                if capacity_trend < 0.05 and retention > 70:  # Very stable capacity at end
-                    return CellFlag(
-                        flag_id='premature_termination',
-                        flag_type='Premature Termination',
-                        severity=FlagSeverity.INFO,
-                        category=FlagCategory.DATA_INTEGRITY,
-                        description=f"Test terminated prematurely: {len(capacity)} cycles completed with stable capacity",
-                        confidence=0.80,
-                        algorithm='pattern_premature_stop',
-                        metric_value=retention,
-                        recommendation="Cell was stopped while still performing well. Cycle life data incomplete."
-                    )
-    except Exception:
-        pass
     
     return None
 
 
-def detect_missing_data(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_missing_data(df: pd.DataFrame,
+                        arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect missing or sparse data in critical columns."""
-    try:
-        critical_columns = ['Q Dis (mAh/g)', 'Q Chg (mAh/g)', 'Efficiency (-)']
-        missing_info = []
-        
-        for col in critical_columns:
-            if col in df.columns:
-                missing_pct = (df[col].isna().sum() / len(df)) * 100
-                if missing_pct > 20:
-                    missing_info.append(f"{col}: {missing_pct:.0f}% missing")
-        
-        if missing_info:
-            return CellFlag(
-                flag_id='missing_data',
-                flag_type='Missing Data',
-                severity=FlagSeverity.WARNING,
-                category=FlagCategory.DATA_INTEGRITY,
-                description=f"Significant missing data: {', '.join(missing_info)}",
-                confidence=1.0,
-                algorithm='data_completeness_check',
-                recommendation="Missing data may affect analysis accuracy. Check data acquisition system."
-            )
-    except Exception:
-        pass
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    
+    missing_info = [
+        f"{col}: {missing_pct:.0f}% missing"
+        for col, missing_pct in arrs.missing_pct.items()
+        if missing_pct > 20
+    ]
+    
+    if missing_info:
+        return CellFlag(
+            flag_id='missing_data',
+            flag_type='Missing Data',
+            severity=FlagSeverity.WARNING,
+            category=FlagCategory.DATA_INTEGRITY,
+            description=f"Significant missing data: {', '.join(missing_info)}",
+            confidence=1.0,
+            algorithm='data_completeness_check',
+            recommendation="Missing data may affect analysis accuracy. Check data acquisition system."
+        )
     
     return None
 
 
-def detect_data_inconsistency(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_data_inconsistency(df: pd.DataFrame,
+                              arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect inconsistencies in data (e.g., negative capacities, zero values)."""
-    try:
-        issues = []
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    
+    issues = []
+    qdis = arrs.qdis
+    
+    if qdis is not None:
+        # Count negative and zero capacities together: bins are sign -1, 0, +1
+        # (missing values are already dropped from arrs.capacity)
+        negative_count, zero_count, _ = np.bincount(
+            (np.sign(arrs.capacity) + 1).astype(np.intp), minlength=3
+        )
         
         # Check for negative capacities
-        if 'Q Dis (mAh/g)' in df.columns:
-            negative_count = (df['Q Dis (mAh/g)'] < 0).sum()
-            if negative_count > 0:
-                issues.append(f"{negative_count} negative discharge capacity values")
+        if negative_count > 0:
+            issues.append(f"{negative_count} negative discharge capacity values")
         
         # Check for zero capacities (unusual)
-        if 'Q Dis (mAh/g)' in df.columns:
-            zero_count = (df['Q Dis (mAh/g)'] == 0).sum()
-            if zero_count > len(df) * 0.1:  # More than 10% zeros
-                issues.append(f"{zero_count} zero capacity values")
-        
-        if issues:
-            return CellFlag(
-                flag_id='data_inconsistency',
-                flag_type='Data Inconsistency',
-                severity=FlagSeverity.WARNING,
-                category=FlagCategory.DATA_INTEGRITY,
-                description=f"Data inconsistencies detected: {', '.join(issues)}",
-                confidence=1.0,
-                algorithm='data_validation',
-                recommendation="Check raw data files for corruption or processing errors."
-            )
-    except Exception:
-        pass
+        if zero_count > len(qdis) * 0.1:  # More than 10% zeros
+            issues.append(f"{zero_count} zero capacity values")
+    
+    if issues:
+        return CellFlag(
+            flag_id='data_inconsistency',
+            flag_type='Data Inconsistency',
+            severity=FlagSeverity.WARNING,
+            category=FlagCategory.DATA_INTEGRITY,
+            description=f"Data inconsistencies detected: {', '.join(issues)}",
+            confidence=1.0,
+            algorithm='data_validation',
+            recommendation="Check raw data files for corruption or processing errors."
+        )
     
     return None
 
 
-def detect_impossible_efficiency(df: pd.DataFrame) -> Optional[CellFlag]:
+def detect_impossible_efficiency(df: pd.DataFrame,
+                                 arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect physically impossible efficiency values (>100%)."""
-    if 'Efficiency (-)' not in df.columns:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    eff = arrs.eff
+    if eff is None:
         return None
     
-    try:
-        efficiency_pct = df['Efficiency (-)'] * 100
-        impossible_count = (efficiency_pct > 105).sum()  # Allow 5% measurement tolerance
-        
-        if impossible_count > 0:
-            max_efficiency = efficiency_pct.max()
-            max_cycle_idx = efficiency_pct.idxmax()
-            cycle_num = df.iloc[max_cycle_idx, 0] if len(df.columns) > 0 else None
-            
-            return CellFlag(
-                flag_id='impossible_efficiency',
-                flag_type='Impossible Efficiency',
-                severity=FlagSeverity.CRITICAL,
-                category=FlagCategory.ELECTROCHEMISTRY,
-                description=f"Physically impossible efficiency detected: {max_efficiency:.1f}% at cycle {cycle_num}",
-                confidence=0.99,
-                algorithm='physics_conservation_laws',
-                cycle=cycle_num,
-                metric_value=max_efficiency,
-                threshold_value=100.0,
-                recommendation="Efficiency >100% violates conservation of energy. Check data processing, loading values, and active material percentage."
-            )
-    except Exception:
-        pass
+    max_efficiency = arrs.eff_max * 100
+    
+    if max_efficiency > 105:  # Allow 5% measurement tolerance
+        max_cycle_idx = np.nanargmax(eff)
+        cycle_num = arrs.cycle[max_cycle_idx] if arrs.cycle is not None else None
+        
+        return CellFlag(
+            flag_id='impossible_efficiency',
+            flag_type='Impossible Efficiency',
+            severity=FlagSeverity.CRITICAL,
+            category=FlagCategory.ELECTROCHEMISTRY,
+            description=f"Physically impossible efficiency detected: {max_efficiency:.1f}% at cycle {cycle_num}",
+            confidence=0.99,
+            algorithm='physics_conservation_laws',
+            cycle=cycle_num,
+            metric_value=max_efficiency,
+            threshold_value=100.0,
+            recommendation="Efficiency >100% violates conservation of energy. Check data processing, loading values, and active material percentage."
+        )
     
     return None
 
 
-def detect_theoretical_capacity_violation(df: pd.DataFrame, cell_data: Dict[str, Any]) -> Optional[CellFlag]:
+def detect_theoretical_capacity_violation(df: pd.DataFrame, cell_data: Dict[str, Any],
+                                          arrs: Optional[CellArrays] = None) -> Optional[CellFlag]:
     """Detect if capacity exceeds reasonable theoretical limits."""
-    if 'Q Dis (mAh/g)' not in df.columns:
+    if arrs is None:
+        arrs = prepare_cell_arrays(df)
+    qdis = arrs.qdis
+    if qdis is None:
         return None
     
-    try:
-        # Theoretical capacity limits for common materials (mAh/g)
-        # Graphite: ~372, NMC: ~275, LFP: ~170, Si: ~4200
-        # Use conservative upper limit of 450 mAh/g for most cathode materials
-        theoretical_limit = 450  # mAh/g - conservative upper bound
-        
-        max_capacity = df['Q Dis (mAh/g)'].max()
-        
-        if max_capacity > theoretical_limit:
-            max_cycle_idx = df['Q Dis (mAh/g)'].idxmax()
-            cycle_num = df.iloc[max_cycle_idx, 0] if len(df.columns) > 0 else None
-            
-            return CellFlag(
-                flag_id='theoretical_capacity_violation',
-                flag_type='Exceeds Theoretical Capacity',
-                severity=FlagSeverity.WARNING,
-                category=FlagCategory.ELECTROCHEMISTRY,
-                description=f"Capacity exceeds typical limits: {max_capacity:.1f} mAh/g at cycle {cycle_num}",
-                confidence=0.80,
-                algorithm='physics_theoretical_limit',
-                cycle=cycle_num,
-                metric_value=max_capacity,
-                threshold_value=theoretical_limit,
-                recommendation="Verify loading measurement and active material percentage. For specialized materials (e.g., Si), this may be normal."
-            )
-    except Exception:
-        pass
+    # Theoretical capacity limits for common materials (mAh/g)
+    # Graphite: ~372, NMC: ~275, LFP: ~170, Si: ~4200
+    # Use conservative upper limit of 450 mAh/g for most cathode materials
+    theoretical_limit = 450  # mAh/g - conservative upper bound
+    
+    max_capacity = arrs.qdis_max
+    
+    if max_capacity > theoretical_limit:
+        max_cycle_idx = np.nanargmax(qdis)
+        cycle_num = arrs.cycle[max_cycle_idx] if arrs.cycle is not None else None
+        
+        return CellFlag(
+            flag_id='theoretical_capacity_violation',
+            flag_type='Exceeds Theoretical Capacity',
+            severity=FlagSeverity.WARNING,
+            category=FlagCategory.ELECTROCHEMISTRY,
+            description=f"Capacity exceeds typical limits: {max_capacity:.1f} mAh/g at cycle {cycle_num}",
+            confidence=0.80,
+            algorithm='physics_theoretical_limit',
+            cycle=cycle_num,
+            metric_value=max_capacity,
+            threshold_value=theoretical_limit,
+            recommendation="Verify loading measurement and active material percentage. For specialized materials (e.g., Si), this may be normal."
+        )
     
     return None
 
@@ -624,43 +740,46 @@ def detect_theoretical_capacity_violation(df: pd.DataFrame, cell_data: Dict[str,
 def detect_anomalous_first_discharge(cell_data: Dict[str, Any], 
                                      experiment_context: Dict[str, Any]) -> Optional[CellFlag]:
     """Detect if first discharge capacity is statistically anomalous compared to experiment."""
-    try:
-        first_discharge = cell_data.get('first_discharge')
-        if first_discharge is None:
-            return None
-        
-        # Get experiment statistics
+    first_discharge = cell_data.get('first_discharge')
+    if not isinstance(first_discharge, numbers.Real):
+        return None
+    
+    # Get experiment statistics (precomputed once per experiment by get_experiment_context)
+    if 'first_discharge_mean' in experiment_context:
+        exp_count = experiment_context['first_discharge_count']
+        exp_mean = experiment_context['first_discharge_mean']
+        exp_std = experiment_context['first_discharge_std']
+    else:
         exp_first_discharge_values = experiment_context.get('first_discharge_values', [])
-        if len(exp_first_discharge_values) < 3:  # Need at least 3 cells for comparison
-            return None
-        
-        exp_mean = np.mean(exp_first_discharge_values)
-        exp_std = np.std(exp_first_discharge_values)
-        
-        if exp_std == 0:
-            return None
-        
-        z_score = abs((first_discharge - exp_mean) / exp_std)
-        
-        if z_score > 3.0:
-            direction = "high" if first_discharge > exp_mean else "low"
-            severity = FlagSeverity.WARNING if z_score < 4 else FlagSeverity.CRITICAL
-            
-            return CellFlag(
-                flag_id='anomalous_first_discharge',
-                flag_type='Anomalous First Discharge',
-                severity=severity,
-                category=FlagCategory.QUALITY,
-                description=f"First discharge capacity is anomalous: {first_discharge:.1f} mAh/g ({direction}, {z_score:.1f}σ from experiment mean {exp_mean:.1f})",
-                confidence=0.90,
-                algorithm='statistical_z_score',
-                cycle=1,
-                metric_value=first_discharge,
-                threshold_value=exp_mean,
-                recommendation="Verify loading and active material measurements. May indicate cell preparation variability."
-            )
-    except Exception:
-        pass
+        exp_count = len(exp_first_discharge_values)
+        exp_mean = np.mean(exp_first_discharge_values) if exp_count else None
+        exp_std = np.std(exp_first_discharge_values) if exp_count else None
+    
+    if exp_count < 3:  # Need at least 3 cells for comparison
+        return None
+    
+    if exp_std == 0:
+        return None
+    
+    z_score = abs((first_discharge - exp_mean) / exp_std)
+    
+    if z_score > 3.0:
+        direction = "high" if first_discharge > exp_mean else "low"
+        severity = FlagSeverity.WARNING if z_score < 4 else FlagSeverity.CRITICAL
+        
+        return CellFlag(
+            flag_id='anomalous_first_discharge',
+            flag_type='Anomalous First Discharge',
+            severity=severity,
+            category=FlagCategory.QUALITY,
+            description=f"First discharge capacity is anomalous: {first_discharge:.1f} mAh/g ({direction}, {z_score:.1f}σ from experiment mean {exp_mean:.1f})",
+            confidence=0.90,
+            algorithm='statistical_z_score',
+            cycle=1,
+            metric_value=first_discharge,
+            threshold_value=exp_mean,
+            recommendation="Verify loading and active material measurements. May indicate cell preparation variability."
+        )
     
     return None
 
@@ -685,9 +804,23 @@ def get_experiment_context(individual_cells: List[Dict[str, Any]]) -> Dict[str,
     ]
     context['first_discharge_values'] = first_discharge_values
     
+    # Cohort statistics are computed here once rather than per cell in the detectors
+    values = np.asarray(first_discharge_values, dtype=float)
+    context['first_discharge_count'] = len(values)
+    context['first_discharge_mean'] = values.mean() if len(values) else None
+    context['first_discharge_std'] = values.std() if len(values) else None
+    
     return context
 
 
+# Display template for every critical/warning/info presence combination, indexed by
+# a 3-bit mask (critical = 4, warning = 2, info = 1)
+_FLAG_DISPLAY_TEMPLATES = tuple(
+    " ".join(part for bit, part in ((4, "🚨 {0}"), (2, "⚠️ {1}"), (1, "ℹ️ {2}")) if mask & bit)
+    for mask in range(8)
+)
+
+
 def format_flags_for_display(flags: List[CellFlag]) -> str:
     """
     Format flags for compact display in table cell.
@@ -701,20 +834,113 @@ def format_flags_for_display(flags: List[CellFlag]) -> str:
     if not flags:
         return ""
     
-    # Group by severity
-    critical = [f for f in flags if f.severity == FlagSeverity.CRITICAL]
-    warning = [f for f in flags if f.severity == FlagSeverity.WARNING]
-    info = [f for f in flags if f.severity == FlagSeverity.INFO]
+    # Tally by severity in one pass (enum members are singletons, so `is` suffices)
+    critical = warning = info = 0
+    for f in flags:
+        severity = f.severity
+        if severity is FlagSeverity.CRITICAL:
+            critical += 1
+        elif severity is FlagSeverity.WARNING:
+            warning += 1
+        elif severity is FlagSeverity.INFO:
+            info += 1
+    
+    mask = (bool(critical) << 2) | (bool(warning) << 1) | bool(info)
+    return _FLAG_DISPLAY_TEMPLATES[mask].format(critical, warning, info)
+
+
+class FlagAccumulator(dict):
+    """
+    Mapping of cell_name to list of flags that keeps summary counters current.
+    
+    Every dict mutator (item assignment and deletion, `update`, `setdefault`, `pop`,
+    `popitem`, `clear`) adjusts the counters in O(1) per flag, so `summary_stats` is a
+    read rather than a rescan of every flag. Append to a cell's flags through `add`;
+    appending to the stored list directly bypasses the counters.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._reset_counts()
     
-    parts = []
-    if critical:
-        parts.append(f"🚨 {len(critical)}")
-    if warning:
-        parts.append(f"⚠️ {len(warning)}")
-    if info:
-        parts.append(f"ℹ️ {len(info)}")
+    def _reset_counts(self) -> None:
+        self.severity_counts = Counter()
+        self.flag_type_counts = Counter()
+        self.category_counts = Counter()
+        self.cells_with_flags = 0
     
-    return " ".join(parts)
+    def _count(self, flags: List[CellFlag], step: int) -> None:
+        for flag in flags:
+            self.severity_counts[flag.severity] += step
+            self.flag_type_counts[flag.flag_type] += step
+            self.category_counts[flag.category.value] += step
+    
+    def _count_cell(self, flags: List[CellFlag], step: int) -> None:
+        self._count(flags, step)
+        self.cells_with_flags += step * bool(flags)
+    
+    def add(self, cell_name: str, flag: CellFlag) -> None:
+        """Append a single flag to a cell's list."""
+        flags = self.setdefault(cell_name, [])
+        if not flags:
+            self.cells_with_flags += 1
+        flags.append(flag)
+        self._count([flag], 1)
+    
+    def __setitem__(self, cell_name: str, flags: List[CellFlag]) -> None:
+        self._count_cell(self.get(cell_name, []), -1)
+        flags = list(flags)
+        super().__setitem__(cell_name, flags)
+        self._count_cell(flags, 1)
+    
+    def __delitem__(self, cell_name: str) -> None:
+        self._count_cell(self[cell_name], -1)
+        super().__delitem__(cell_name)
+    
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    
+    def update(self, *args, **kwargs) -> None:
+        for cell_name, flags in dict(*args, **kwargs).items():
+            self[cell_name] = flags
+    
+    def setdefault(self, cell_name: str, default: Optional[List[CellFlag]] = None) -> List[CellFlag]:
+        if cell_name not in self:
+            self[cell_name] = default or []
+        return self[cell_name]
+    
+    def pop(self, cell_name: str, *default):
+        if cell_name not in self:
+            return super().pop(cell_name, *default)
+        flags = self[cell_name]
+        del self[cell_name]
+        return flags
+    
+    def popitem(self):
+        cell_name, flags = super().popitem()
+        self._count_cell(flags, -1)
+        return cell_name, flags
+    
+    def clear(self) -> None:
+        super().clear()
+        self._reset_counts()
+    
+    def summary_stats(self) -> Dict[str, Any]:
+        """Summary statistics in the shape returned by `get_flag_summary_stats`."""
+        total_flags = sum(self.severity_counts.values())
+        critical_count = self.severity_counts[FlagSeverity.CRITICAL]
+        warning_count = self.severity_counts[FlagSeverity.WARNING]
+        
+        return {
+            'total_flags': total_flags,
+            'critical_count': critical_count,
+            'warning_count': warning_count,
+            'info_count': total_flags - critical_count - warning_count,
+            'flag_type_counts': dict(+self.flag_type_counts),
+            'category_counts': dict(+self.category_counts),
+            'cells_with_flags': self.cells_with_flags
+        }
 
 
 def get_flag_summary_stats(all_flags: Dict[str, List[CellFlag]]) -> Dict[str, Any]:
@@ -722,44 +948,18 @@ def get_flag_summary_stats(all_flags: Dict[str, List[CellFlag]]) -> Dict[str, An
     Calculate summary statistics for all flags.
     
     Args:
-        all_flags: Dictionary mapping cell_name to list of flags
+        all_flags: Dictionary mapping cell_name to list of flags; a FlagAccumulator
+            returns its running counts without rescanning
         
     Returns:
         Dictionary with summary statistics
     """
-    total_flags = sum(len(flags) for flags in all_flags.values())
-    
-    critical_count = 0
-    warning_count = 0
-    info_count = 0
+    if not isinstance(all_flags, FlagAccumulator):
+        accumulator = FlagAccumulator()
+        for cell_name, flags in all_flags.items():
+            accumulator[cell_name] = flags
+        all_flags = accumulator
     
-    flag_type_counts = {}
-    category_counts = {}
-    
-    for flags in all_flags.values():
-        for flag in flags:
-            # Count by severity
-            if flag.severity == FlagSeverity.CRITICAL:
-                critical_count += 1
-            elif flag.severity == FlagSeverity.WARNING:
-                warning_count += 1
-            else:
-                info_count += 1
-            
-            # Count by type
-            flag_type_counts[flag.flag_type] = flag_type_counts.get(flag.flag_type, 0) + 1
-            
-            # Count by category
-            category_counts[flag.category.value] = category_counts.get(flag.category.value, 0) + 1
-    
-    return {
-        'total_flags': total_flags,
-        'critical_count': critical_count,
-        'warning_count': warning_count,
-        'info_count': info_count,
-        'flag_type_counts': flag_type_counts,
-        'category_counts': category_counts,
-        'cells_with_flags': len([f for f in all_flags.values() if f])
-    }
+    return all_flags.summary_stats()
 
 
@@ -7,17 +7,63 @@ Extracts cycling performance metrics across projects and cells.
 
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import heapq
+from itertools import groupby, islice
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 import json
+import logging
 import os
-from io import StringIO
+import streamlit as st
 from database import get_db_connection, TEST_USER_ID, hydrate_data_json
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser returns the same objects
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
 # Broad physical bounds used to discard impossible dashboard summary values.
 RETENTION_PLAUSIBLE_RANGE = (0.0, 250.0)      # Capacity retention (%)
 FADE_RATE_PLAUSIBLE_RANGE = (-20.0, 300.0)    # Fade rate (% per 100 cycles)
 
+# Top-performer metric -> (column to rank by, higher is better)
+TOP_PERFORMER_SORT = {
+    'retention': ('retention_pct', True),
+    'fade_rate': ('fade_rate', False),
+    'efficiency': ('avg_efficiency', True),
+}
+
+
+# Parsed cell frames kept per process; each entry holds one cell's cycling data
+CELL_FRAME_CACHE_ENTRIES = 256
+
+
+@st.cache_data(show_spinner=False, max_entries=CELL_FRAME_CACHE_ENTRIES)
+def parse_cell_data_json(cell_data_json: str) -> pd.DataFrame:
+    """
+    Build a cell DataFrame from its `df.to_json()` payload (column -> {index: value}).
+
+    Parsing once and using the DataFrame constructor skips read_json's second pass
+    over the data. The index keys arrive as strings and all-null columns as None
+    objects, so both are converted back as read_json would (integer index, float NaN).
+    Results are cached on the payload content, so the dashboard queries and plots
+    that see the same cell share one parse.
+    """
+    df = pd.DataFrame(_json_loads(cell_data_json))
+    try:
+        df.index = df.index.astype(np.int64)
+    except (TypeError, ValueError):
+        pass
+    null_cols = [col for col in df.columns if df[col].dtype == object and df[col].isna().all()]
+    if null_cols:
+        df[null_cols] = df[null_cols].astype(float)
+    return df
+
 
 def _is_plausible_metric(value: Optional[float], bounds: Tuple[float, float]) -> bool:
     """Check if a metric value is finite and inside broad physical bounds."""
@@ -65,6 +111,55 @@ def _filter_metric_outliers(
     return robust_arr.tolist()
 
 
+def _build_where_clause(
+    user_id: str,
+    filter_params: Optional[Dict],
+    include_date_range: bool = False
+) -> Tuple[str, List]:
+    """
+    Build the dashboard WHERE clause over projects `p` / experiments `ce` and its parameters.
+
+    Project ids are bound as one JSON array read through json_each, so the SQL text
+    is the same however many projects are selected and SQLite can reuse the
+    compiled statement instead of re-preparing one per selection size.
+    """
+    where_conditions = ["p.user_id = ?"]
+    params = [user_id]
+    
+    if filter_params and filter_params.get('project_ids'):
+        where_conditions.append("p.id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(pid) for pid in filter_params['project_ids']]))
+    
+    if include_date_range:
+        date_condition, date_params = _date_range_condition(filter_params)
+        if date_condition:
+            where_conditions.append(date_condition)
+            params.extend(date_params)
+    
+    return " AND ".join(where_conditions), params
+
+
+def _date_range_condition(filter_params: Optional[Dict]) -> Tuple[Optional[str], List]:
+    """
+    SQL condition on `ce.created_date` for the filter's inclusive (start, end) date range.
+
+    Stored timestamps look like 'YYYY-MM-DD HH:MM:SS', so the range is compared as the
+    half-open string interval [start, end + 1 day): every time on the end day is kept
+    and the created_date index can serve the range.
+    """
+    if not filter_params or not filter_params.get('date_range'):
+        return None, []
+    
+    start_date, end_date = (
+        value.date() if isinstance(value, datetime) else value
+        for value in filter_params['date_range']
+    )
+    return (
+        "ce.created_date >= ? AND ce.created_date < ?",
+        [start_date.isoformat(), (end_date + timedelta(days=1)).isoformat()],
+    )
+
+
 def get_global_statistics(user_id: str, filter_params: Optional[Dict] = None) -> Dict:
     """
     Aggregate statistics across all projects for a user.
@@ -85,21 +180,7 @@ def get_global_statistics(user_id: str, filter_params: Optional[Dict] = None) ->
         cursor = conn.cursor()
         
         # Build WHERE clause from filters
-        where_conditions = ["p.user_id = ?"]
-        params = [user_id]
-        
-        if filter_params:
-            if filter_params.get('project_ids'):
-                placeholders = ','.join('?' * len(filter_params['project_ids']))
-                where_conditions.append(f"p.id IN ({placeholders})")
-                params.extend(filter_params['project_ids'])
-            
-            if filter_params.get('date_range'):
-                start_date, end_date = filter_params['date_range']
-                where_conditions.append("ce.created_date BETWEEN ? AND ?")
-                params.extend([start_date.isoformat(), end_date.isoformat()])
-        
-        where_clause = " AND ".join(where_conditions)
+        where_clause, params = _build_where_clause(user_id, filter_params, include_date_range=True)
         
         # Total projects
         cursor.execute(f"""
@@ -122,7 +203,7 @@ def get_global_statistics(user_id: str, filter_params: Optional[Dict] = None) ->
         
         # Get all cells with cycling data to calculate best retention and avg fade
         cursor.execute(f"""
-            SELECT ce.data_json, ce.parquet_path, ce.id
+            SELECT ce.id
             FROM cell_experiments ce
             JOIN projects p ON ce.project_id = p.id
             WHERE {where_clause} AND (ce.data_json IS NOT NULL OR ce.parquet_path IS NOT NULL)
@@ -131,35 +212,15 @@ def get_global_statistics(user_id: str, filter_params: Optional[Dict] = None) ->
         all_retentions = []
         all_fade_rates = []
         
-        for data_json_str, p_path, exp_id in cursor.fetchall():
-            data_json_str = hydrate_data_json(data_json_str, p_path, exp_id)
-            if not data_json_str:
-                continue
+        for (exp_id,) in cursor.fetchall():
+            for cell in _dashboard_cell_metrics(exp_id):
+                retention = cell.get('retention_pct')
+                if _is_plausible_metric(retention, RETENTION_PLAUSIBLE_RANGE):
+                    all_retentions.append(retention)
                 
-            try:
-                data = json.loads(data_json_str)
-                cells = data.get('cells', [])
-                
-                for cell in cells:
-                    df = None
-                    if cell.get('excluded', False):
-                        pass
-                    elif cell.get('data_json'):
-                        cell_data_json = cell.get('data_json')
-                        df = pd.read_json(StringIO(cell_data_json))
-                        
-                    if df is not None:
-                        # Calculate retention
-                        retention = calculate_retention_percent(df)
-                        if _is_plausible_metric(retention, RETENTION_PLAUSIBLE_RANGE):
-                            all_retentions.append(retention)
-                        
-                        # Calculate fade rate
-                        fade_rate = calculate_fade_rate(df)
-                        if _is_plausible_metric(fade_rate, FADE_RATE_PLAUSIBLE_RANGE):
-                            all_fade_rates.append(fade_rate)
-            except (json.JSONDecodeError, Exception):
-                continue
+                fade_rate = cell.get('fade_rate_pct_per_100_cycles')
+                if _is_plausible_metric(fade_rate, FADE_RATE_PLAUSIBLE_RANGE):
+                    all_fade_rates.append(fade_rate)
 
         valid_retentions = _filter_metric_outliers(
             all_retentions,
@@ -205,31 +266,26 @@ def get_project_summaries(user_id: str, filter_params: Optional[Dict] = None) ->
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Get all projects
-        cursor.execute("""
-            SELECT id, name, project_type
-            FROM projects
-            WHERE user_id = ?
-            ORDER BY last_modified DESC
-        """, (user_id,))
+        # Build WHERE clause; the date filter belongs to the join so that projects
+        # without experiments in range are still listed
+        where_clause, where_params = _build_where_clause(user_id, filter_params)
+        date_condition, date_params = _date_range_condition(filter_params)
+        join_condition = "ce.project_id = p.id" + (f" AND {date_condition}" if date_condition else "")
+        
+        # Get all projects with their experiments in one query; the LEFT JOIN keeps
+        # projects without experiments, and ordering by id keeps each project's rows together
+        cursor.execute(f"""
+            SELECT p.id, p.name, p.project_type, ce.id
+            FROM projects p
+            LEFT JOIN cell_experiments ce ON {join_condition}
+            WHERE {where_clause}
+            ORDER BY p.last_modified DESC, p.id
+        """, date_params + where_params)
         
-        projects = cursor.fetchall()
         summaries = []
         
-        for project_id, project_name, project_type in projects:
-            # Apply project filter if specified
-            if filter_params and filter_params.get('project_ids'):
-                if project_id not in filter_params['project_ids']:
-                    continue
-            
-            # Get all experiments for this project
-            cursor.execute("""
-                SELECT data_json, created_date, parquet_path, id
-                FROM cell_experiments
-                WHERE project_id = ?
-            """, (project_id,))
-            
-            experiments = cursor.fetchall()
+        for (project_id, project_name, project_type), rows in groupby(cursor.fetchall(), key=lambda row: row[:3]):
+            experiment_ids = [row[3] for row in rows if row[3] is not None]
             
             cell_count = 0
             max_cycles = 0
@@ -237,56 +293,28 @@ def get_project_summaries(user_id: str, filter_params: Optional[Dict] = None) ->
             best_retention = 0.0
             all_fade_rates = []
             
-            for data_json_str, created_date, p_path, exp_id in experiments:
-                # Apply date filter
-                if filter_params and filter_params.get('date_range'):
-                    start_date, end_date = filter_params['date_range']
-                    exp_date = datetime.fromisoformat(created_date) if created_date else None
-                    if exp_date:
-                        if exp_date < start_date or exp_date > end_date:
-                            continue
-                            
-                data_json_str = hydrate_data_json(data_json_str, p_path, exp_id)
-                if not data_json_str:
-                    continue
-                
-                try:
-                    data = json.loads(data_json_str)
-                    cells = data.get('cells', [])
+            for exp_id in experiment_ids:
+                for cell in _dashboard_cell_metrics(exp_id):
+                    cell_count += 1
                     
-                    for cell in cells:
-                        df = None
-                        if cell.get('excluded', False):
-                            pass
-                        elif cell.get('data_json'):
-                            cell_data_json = cell.get('data_json')
-                            df = pd.read_json(StringIO(cell_data_json))
-                        
-                        if df is not None:
-                            cell_count += 1
-                            
-                            # Get max cycle
-                            cycle_col = 'Cycle' if 'Cycle' in df.columns else 'Cycle number'
-                            if cycle_col in df.columns:
-                                cell_max_cycle = df[cycle_col].max()
-                                max_cycles = max(max_cycles, cell_max_cycle)
-                            
-                            # Check retention
-                            retention = calculate_retention_percent(df)
-                            if (
-                                _is_plausible_metric(retention, RETENTION_PLAUSIBLE_RANGE)
-                                and retention > best_retention
-                            ):
-                                best_retention = retention
-                                best_cell_id = cell.get('test_number', cell.get('cell_name', 'Unknown'))
-                            
-                            # Collect fade rates
-                            fade_rate = calculate_fade_rate(df)
-                            if _is_plausible_metric(fade_rate, FADE_RATE_PLAUSIBLE_RANGE):
-                                all_fade_rates.append(fade_rate)
-                
-                except (json.JSONDecodeError, Exception):
-                    continue
+                    # Get max cycle
+                    cell_max_cycle = cell.get('max_cycle')
+                    if cell_max_cycle is not None:
+                        max_cycles = max(max_cycles, cell_max_cycle)
+                    
+                    # Check retention
+                    retention = cell.get('retention_pct')
+                    if (
+                        _is_plausible_metric(retention, RETENTION_PLAUSIBLE_RANGE)
+                        and retention > best_retention
+                    ):
+                        best_retention = retention
+                        best_cell_id = cell.get('cell_id')
+                    
+                    # Collect fade rates
+                    fade_rate = cell.get('fade_rate_pct_per_100_cycles')
+                    if _is_plausible_metric(fade_rate, FADE_RATE_PLAUSIBLE_RANGE):
+                        all_fade_rates.append(fade_rate)
             
             # Determine status based on average fade rate
             valid_project_fade_rates = _filter_metric_outliers(
@@ -347,145 +375,146 @@ def get_top_performers(
         - cycles_tested: int
         - avg_efficiency: float (optional)
     """
-    all_cells = []
-    
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
         # Build WHERE clause
-        where_conditions = ["p.user_id = ?"]
-        params = [user_id]
-        
-        if filter_params and filter_params.get('project_ids'):
-            placeholders = ','.join('?' * len(filter_params['project_ids']))
-            where_conditions.append(f"p.id IN ({placeholders})")
-            params.extend(filter_params['project_ids'])
-        
-        where_clause = " AND ".join(where_conditions)
+        where_clause, params = _build_where_clause(user_id, filter_params)
         
         cursor.execute(f"""
-            SELECT p.id, p.name, ce.data_json, ce.parquet_path, ce.id
+            SELECT p.id, p.name, ce.id
             FROM cell_experiments ce
             JOIN projects p ON ce.project_id = p.id
             WHERE {where_clause} AND (ce.data_json IS NOT NULL OR ce.parquet_path IS NOT NULL)
         """, params)
-        
-        for project_id, project_name, data_json_str, p_path, exp_id in cursor.fetchall():
-            data_json_str = hydrate_data_json(data_json_str, p_path, exp_id)
-            if not data_json_str:
-                continue
-                
-            try:
-                data = json.loads(data_json_str)
-                cells = data.get('cells', [])
+        # Fetched up front (the rows are just ids): a cold metrics refresh writes to
+        # the database, which must not wait on this connection's open read
+        experiments = cursor.fetchall()
+    
+    def candidate_cells():
+        for project_id, project_name, exp_id in experiments:
+            for cell in _dashboard_cell_metrics(exp_id):
+                # Check minimum cycles
+                cycles_tested = cell.get('max_cycle')
+                if cycles_tested is None or cycles_tested < min_cycles:
+                    continue
                 
-                for cell in cells:
-                    if cell.get('excluded', False):
-                        continue
-                    
-                    cell_data_json = cell.get('data_json')
-                    if not cell_data_json:
-                         continue
-                         
-                    df = pd.read_json(StringIO(cell_data_json))
-                    
-                    # Check minimum cycles
-                    cycle_col = 'Cycle' if 'Cycle' in df.columns else 'Cycle number'
-                    if cycle_col not in df.columns:
-                        continue
-                    
-                    cycles_tested = df[cycle_col].max()
-                    if cycles_tested < min_cycles:
-                        continue
-                    
-                    # Calculate metrics
-                    retention = calculate_retention_percent(df)
-                    fade_rate = calculate_fade_rate(df)
-                    retention_is_valid = _is_plausible_metric(retention, RETENTION_PLAUSIBLE_RANGE)
-                    fade_is_valid = _is_plausible_metric(fade_rate, FADE_RATE_PLAUSIBLE_RANGE)
-
-                    # Skip outlier rows when sorting by these metrics.
-                    if metric == 'retention' and not retention_is_valid:
-                        continue
-                    if metric == 'fade_rate' and not fade_is_valid:
-                        continue
+                retention = cell.get('retention_pct')
+                fade_rate = cell.get('fade_rate_pct_per_100_cycles')
+                retention_is_valid = _is_plausible_metric(retention, RETENTION_PLAUSIBLE_RANGE)
+                fade_is_valid = _is_plausible_metric(fade_rate, FADE_RATE_PLAUSIBLE_RANGE)
 
-                    initial_cap, current_cap = get_capacity_values(df)
-                    avg_eff = calculate_avg_efficiency(df)
-                    
-                    cell_id = cell.get('test_number', cell.get('cell_name', 'Unknown'))
-                    
-                    all_cells.append({
-                        'cell_id': cell_id,
-                        'project_name': project_name,
-                        'project_id': project_id,
-                        'initial_capacity': initial_cap,
-                        'current_capacity': current_cap,
-                        'retention_pct': retention if retention_is_valid else 0.0,
-                        'fade_rate': fade_rate if fade_is_valid else 0.0,
-                        'cycles_tested': cycles_tested,
-                        'avg_efficiency': avg_eff if avg_eff else 0.0
-                    })
-            
-            except (json.JSONDecodeError, Exception):
-                continue
+                # Skip outlier rows when sorting by these metrics.
+                if metric == 'retention' and not retention_is_valid:
+                    continue
+                if metric == 'fade_rate' and not fade_is_valid:
+                    continue
+
+                avg_eff = cell.get('avg_efficiency')
+                
+                yield {
+                    'cell_id': cell.get('cell_id'),
+                    'project_name': project_name,
+                    'project_id': project_id,
+                    'initial_capacity': cell.get('initial_capacity'),
+                    'current_capacity': cell.get('current_capacity'),
+                    'retention_pct': retention if retention_is_valid else 0.0,
+                    'fade_rate': fade_rate if fade_is_valid else 0.0,
+                    'cycles_tested': cycles_tested,
+                    'avg_efficiency': avg_eff if avg_eff else 0.0
+                }
+    
+    # Keep only the top_n rows while streaming (heapq's selection is stable on ties)
+    if metric in TOP_PERFORMER_SORT:
+        sort_col, descending = TOP_PERFORMER_SORT[metric]
+        select = heapq.nlargest if descending else heapq.nsmallest
+        top_cells = select(top_n, candidate_cells(), key=itemgetter(sort_col))
+    else:
+        top_cells = list(islice(candidate_cells(), max(top_n, 0)))
     
-    if not all_cells:
+    if not top_cells:
         return pd.DataFrame()
     
-    df = pd.DataFrame(all_cells)
+    return pd.DataFrame(top_cells)
+
+
+def _dashboard_cell_metrics(experiment_id: int) -> List[Dict]:
+    """
+    Per-cell metrics for one experiment, skipping excluded cells and cells without data.
+
+    The metrics come from derived_metrics_service, which computes them once per
+    experiment revision and stores them in SQLite, so dashboard refreshes read
+    cached rows instead of re-parsing and re-fitting every cell payload.
+    """
+    # Imported here because derived_metrics_service imports this module
+    from derived_metrics_service import get_or_refresh_experiment_derived_metrics
     
-    # Sort by specified metric
-    if metric == 'retention':
-        df = df.sort_values('retention_pct', ascending=False)
-    elif metric == 'fade_rate':
-        df = df.sort_values('fade_rate', ascending=True)
-    elif metric == 'efficiency':
-        df = df.sort_values('avg_efficiency', ascending=False)
+    try:
+        metrics = get_or_refresh_experiment_derived_metrics(experiment_id)
+    except Exception:
+        logger.exception("Failed to load derived metrics for experiment %s", experiment_id)
+        return []
+    if not metrics:
+        return []
     
-    return df.head(top_n)
+    return [
+        cell for cell in metrics.get('cell_metrics', [])
+        if cell.get('has_data') and not cell.get('excluded', False)
+    ]
 
 
-def calculate_retention_percent(df: pd.DataFrame) -> Optional[float]:
-    """Calculate capacity retention percentage."""
-    # Handle multiple column naming conventions
-    cap_col = None
-    if 'Qdis' in df.columns:
-        cap_col = 'Qdis'
-    elif 'Q discharge (mA.h)' in df.columns:
-        cap_col = 'Q discharge (mA.h)'
-    elif 'Q Dis (mAh/g)' in df.columns:
-        cap_col = 'Q Dis (mAh/g)'
-    elif 'discharge_capacity' in df.columns:
-        cap_col = 'discharge_capacity'
-    
+# Column naming conventions, in lookup order
+CAPACITY_COLUMNS = ('Qdis', 'Q discharge (mA.h)', 'Q Dis (mAh/g)', 'discharge_capacity')
+CYCLE_COLUMNS = ('Cycle', 'Cycle number')
+EFFICIENCY_COLUMNS = ('Efficiency', 'Efficiency (-)', 'coulombic_efficiency')
+
+
+def _find_column(df: pd.DataFrame, candidates: Tuple[str, ...]) -> Optional[str]:
+    """Return the first candidate column present in the frame."""
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def _extract_arrays(df: pd.DataFrame) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Get (cycle, capacity) arrays restricted to rows with positive capacity.
+
+    The capacity mask is applied once here, so the metric helpers work on plain
+    ndarrays. Capacity is None without a capacity column; cycle is None without
+    a cycle column.
+    """
+    cap_col = _find_column(df, CAPACITY_COLUMNS)
     if cap_col is None:
-        return None
+        return None, None
     
-    # Handle cycle column naming
-    cycle_col = None
-    if 'Cycle' in df.columns:
-        cycle_col = 'Cycle'
-    elif 'Cycle number' in df.columns:
-        cycle_col = 'Cycle number'
+    cap = df[cap_col].to_numpy(dtype=float, na_value=np.nan)
+    mask = cap > 0
     
-    # Get initial capacity (first non-zero value, skip formation cycles if possible)
-    valid_caps = df[df[cap_col] > 0][cap_col]
-    if len(valid_caps) < 2:
+    cycle_col = _find_column(df, CYCLE_COLUMNS)
+    if cycle_col is None:
+        return None, cap[mask]
+    
+    cycle = df[cycle_col].to_numpy(dtype=float, na_value=np.nan)
+    return cycle[mask], cap[mask]
+
+
+def calculate_retention_percent(df: pd.DataFrame) -> Optional[float]:
+    """Calculate capacity retention percentage."""
+    return _retention_from_arrays(*_extract_arrays(df))
+
+
+def _retention_from_arrays(cycles: Optional[np.ndarray], valid_caps: Optional[np.ndarray]) -> Optional[float]:
+    if valid_caps is None or len(valid_caps) < 2:
         return None
     
     # Use capacity at cycle 5-10 as "initial" to skip formation variability
-    if cycle_col is not None:
-        initial_df = df[(df[cycle_col] >= 5) & (df[cycle_col] <= 10) & (df[cap_col] > 0)]
-        if not initial_df.empty:
-            initial_capacity = initial_df[cap_col].mean()
-        else:
-            initial_capacity = valid_caps.iloc[0]
-    else:
-        initial_capacity = valid_caps.iloc[0]
+    initial_capacity = valid_caps[0]
+    if cycles is not None:
+        initial_caps = valid_caps[(cycles >= 5) & (cycles <= 10)]
+        if len(initial_caps):
+            initial_capacity = initial_caps.mean()
     
     # Get latest capacity
-    current_capacity = valid_caps.iloc[-1]
+    current_capacity = valid_caps[-1]
     
     retention = (current_capacity / initial_capacity) * 100
     return round(retention, 2)
@@ -495,110 +524,96 @@ def calculate_fade_rate(df: pd.DataFrame) -> Optional[float]:
     """
     Calculate capacity fade rate in % per 100 cycles using linear regression.
     """
-    # Handle multiple column naming conventions
-    cap_col = None
-    if 'Qdis' in df.columns:
-        cap_col = 'Qdis'
-    elif 'Q discharge (mA.h)' in df.columns:
-        cap_col = 'Q discharge (mA.h)'
-    elif 'Q Dis (mAh/g)' in df.columns:
-        cap_col = 'Q Dis (mAh/g)'
-    elif 'discharge_capacity' in df.columns:
-        cap_col = 'discharge_capacity'
-    
-    if cap_col is None:
-        return None
-    
-    # Handle cycle column naming
-    cycle_col = None
-    if 'Cycle' in df.columns:
-        cycle_col = 'Cycle'
-    elif 'Cycle number' in df.columns:
-        cycle_col = 'Cycle number'
-    
-    if cycle_col is None:
+    return _fade_rate_from_arrays(*_extract_arrays(df))
+
+
+def _fade_rate_from_arrays(cycles: Optional[np.ndarray], caps: Optional[np.ndarray]) -> Optional[float]:
+    if caps is None or cycles is None:
         return None
     
     # Filter valid data
-    valid_data = df[(df[cap_col] > 0) & (df[cycle_col] > 0)].copy()
-    if len(valid_data) < 10:
+    valid = cycles > 0
+    cycles, caps = cycles[valid], caps[valid]
+    if len(caps) < 10:
         return None
     
     # Normalize to initial capacity
-    initial_cap = valid_data[cap_col].iloc[0]
-    valid_data['retention'] = (valid_data[cap_col] / initial_cap) * 100
+    retention = (caps / caps[0]) * 100
     
-    # Linear regression
-    try:
-        from scipy.stats import linregress
-        slope, intercept, r_value, p_value, std_err = linregress(
-            valid_data[cycle_col], valid_data['retention']
-        )
-        
-        # Convert slope to % fade per 100 cycles (negative of slope)
-        fade_per_100_cycles = -slope * 100
-        
-        return round(fade_per_100_cycles, 3)
-    except:
-        # Fallback: simple first-last calculation
-        first_retention = valid_data['retention'].iloc[0]
-        last_retention = valid_data['retention'].iloc[-1]
-        cycles = valid_data[cycle_col].iloc[-1] - valid_data[cycle_col].iloc[0]
-        
-        if cycles > 0:
-            fade_per_100_cycles = ((first_retention - last_retention) / cycles) * 100
-            return round(fade_per_100_cycles, 3)
+    # Least-squares slope in closed form
+    centred_cycles = cycles - cycles.mean()
+    sxx = centred_cycles @ centred_cycles
+    if sxx == 0:
+        return None
+    slope = (centred_cycles @ (retention - retention.mean())) / sxx
     
-    return None
+    # Convert slope to % fade per 100 cycles (negative of slope)
+    fade_per_100_cycles = -slope * 100
+    return round(fade_per_100_cycles, 3)
 
 
 def get_capacity_values(df: pd.DataFrame) -> Tuple[float, float]:
     """Get initial and current capacity values."""
-    # Handle multiple column naming conventions
-    cap_col = None
-    if 'Qdis' in df.columns:
-        cap_col = 'Qdis'
-    elif 'Q discharge (mA.h)' in df.columns:
-        cap_col = 'Q discharge (mA.h)'
-    elif 'Q Dis (mAh/g)' in df.columns:
-        cap_col = 'Q Dis (mAh/g)'
-    elif 'discharge_capacity' in df.columns:
-        cap_col = 'discharge_capacity'
-    
-    if cap_col is None:
-        return 0.0, 0.0
-    
-    valid_caps = df[df[cap_col] > 0][cap_col]
-    if len(valid_caps) < 2:
+    return _capacity_values_from_arrays(_extract_arrays(df)[1])
+
+
+def _capacity_values_from_arrays(valid_caps: Optional[np.ndarray]) -> Tuple[float, float]:
+    if valid_caps is None or len(valid_caps) < 2:
         return 0.0, 0.0
     
-    initial = valid_caps.iloc[0]
-    current = valid_caps.iloc[-1]
-    
-    return round(initial, 2), round(current, 2)
+    return round(valid_caps[0], 2), round(valid_caps[-1], 2)
+
+
+def get_max_cycle(df: pd.DataFrame) -> Optional[float]:
+    """Get the highest cycle number, or None if the frame has no cycle column."""
+    cycle_col = _find_column(df, CYCLE_COLUMNS)
+    if cycle_col is None:
+        return None
+    return df[cycle_col].max()
 
 
 def calculate_avg_efficiency(df: pd.DataFrame) -> Optional[float]:
     """Calculate average coulombic efficiency."""
-    # Handle multiple column naming conventions
-    eff_col = None
-    if 'Efficiency' in df.columns:
-        eff_col = 'Efficiency'
-    elif 'Efficiency (-)' in df.columns:
-        eff_col = 'Efficiency (-)'
-    elif 'coulombic_efficiency' in df.columns:
-        eff_col = 'coulombic_efficiency'
-    
+    eff_col = _find_column(df, EFFICIENCY_COLUMNS)
     if eff_col is None:
         return None
     
-    valid_eff = df[(df[eff_col] > 0) & (df[eff_col] <= 100)][eff_col]
+    eff = df[eff_col].to_numpy(dtype=float, na_value=np.nan)
+    valid_eff = eff[(eff > 0) & (eff <= 100)]
     if len(valid_eff) == 0:
         return None
     
     return round(valid_eff.mean(), 3)
 
 
+@dataclass(slots=True, frozen=True)
+class CellCapacityMetrics:
+    """Dashboard metrics for one cell."""
+    retention_pct: Optional[float]
+    fade_rate: Optional[float]             # % per 100 cycles
+    initial_capacity: float
+    current_capacity: float
+    avg_efficiency: Optional[float]
+
+
+def calculate_cell_metrics(df: pd.DataFrame) -> CellCapacityMetrics:
+    """
+    Calculate retention, fade rate, capacities and efficiency for one cell together.
+
+    Equivalent to calling the individual helpers, but the capacity and cycle columns
+    are resolved, converted and masked once and shared by all three capacity metrics.
+    """
+    cycles, valid_caps = _extract_arrays(df)
+    initial_capacity, current_capacity = _capacity_values_from_arrays(valid_caps)
+    return CellCapacityMetrics(
+        retention_pct=_retention_from_arrays(cycles, valid_caps),
+        fade_rate=_fade_rate_from_arrays(cycles, valid_caps),
+        initial_capacity=initial_capacity,
+        current_capacity=current_capacity,
+        avg_efficiency=calculate_avg_efficiency(df),
+    )
+
+
 def get_recent_activity(user_id: str, days: int = 30) -> List[Dict]:
     """
     Get timeline of recent experiment uploads.
@@ -674,15 +689,7 @@ def get_cells_with_cycle_data(user_id: str, min_cycles: int = 0, filter_params:
         cursor = conn.cursor()
         
         # Build WHERE clause
-        where_conditions = ["p.user_id = ?"]
-        params = [user_id]
-        
-        if filter_params and filter_params.get('project_ids'):
-            placeholders = ','.join('?' * len(filter_params['project_ids']))
-            where_conditions.append(f"p.id IN ({placeholders})")
-            params.extend(filter_params['project_ids'])
-        
-        where_clause = " AND ".join(where_conditions)
+        where_clause, params = _build_where_clause(user_id, filter_params)
         
         cursor.execute(f"""
             SELECT p.id, p.name, ce.data_json, ce.parquet_path, ce.id
@@ -691,13 +698,15 @@ def get_cells_with_cycle_data(user_id: str, min_cycles: int = 0, filter_params:
             WHERE {where_clause} AND (ce.data_json IS NOT NULL OR ce.parquet_path IS NOT NULL)
         """, params)
         
-        for project_id, project_name, data_json_str, p_path, exp_id in cursor.fetchall():
+        # Iterate the cursor rather than fetchall() so only one experiment payload is
+        # held at a time; nothing in the loop writes to the database
+        for project_id, project_name, data_json_str, p_path, exp_id in cursor:
             data_json_str = hydrate_data_json(data_json_str, p_path, exp_id)
             if not data_json_str:
                 continue
                 
             try:
-                data = json.loads(data_json_str)
+                data = _json_loads(data_json_str)
                 cells = data.get('cells', [])
                 
                 for cell in cells:
@@ -708,13 +717,13 @@ def get_cells_with_cycle_data(user_id: str, min_cycles: int = 0, filter_params:
                     if not cell_data_json:
                         continue
                     
-                    df = pd.read_json(StringIO(cell_data_json))
-                    
-                    # Check minimum cycles
-                    cycle_col = 'Cycle' if 'Cycle' in df.columns else 'Cycle number'
-                    if cycle_col in df.columns:
-                        max_cycle = df[cycle_col].max()
-                        if max_cycle < min_cycles:
+                    # Check minimum cycles, from the value recorded at save time when
+                    # present so the cell payload is not parsed just to filter it
+                    if min_cycles > 0:
+                        max_cycle = cell.get('max_cycle')
+                        if max_cycle is None:
+                            max_cycle = get_max_cycle(parse_cell_data_json(cell_data_json))
+                        if max_cycle is not None and max_cycle < min_cycles:
                             continue
                     
                     cell_id = cell.get('test_number', cell.get('cell_name', 'Unknown'))
@@ -96,6 +96,8 @@ def plot_multi_project_retention(
     Returns:
         Plotly Figure object
     """
+    from dashboard_analytics import parse_cell_data_json
+    
     fig = go.Figure()
     
     if not cells_data:
@@ -147,7 +149,7 @@ def plot_multi_project_retention(
         
         for i, cell in enumerate(cells):
             try:
-                df = pd.read_json(cell['data_json'])
+                df = parse_cell_data_json(cell['data_json'])
                 
                 # Detect column names
                 cap_col = None
@@ -284,13 +286,13 @@ def plot_fade_rate_scatter(
         Plotly Figure object
     """
     # Prepare data
-    from dashboard_analytics import calculate_fade_rate
+    from dashboard_analytics import calculate_fade_rate, parse_cell_data_json
     
     plot_data = []
     
     for cell in cells_data:
         try:
-            df = pd.read_json(cell['data_json'])
+            df = parse_cell_data_json(cell['data_json'])
             
             # Detect column names
             cap_col = None
@@ -1,5 +1,33 @@
 import pandas as pd
 import numpy as np
+from functools import reduce
+
+
+def _float_tail(values, start_idx=0):
+    """float64 array of values[start_idx:]; only non-numeric columns go through pd.to_numeric."""
+    tail = pd.Series(values).iloc[start_idx:]
+    if not pd.api.types.is_numeric_dtype(tail):
+        tail = pd.to_numeric(tail, errors='coerce')
+    return tail.to_numpy(dtype=float, na_value=np.nan)
+
+
+def mean_capacity_ratio_pct(qdis, qch, start_idx=0):
+    """Mean of Q dis / Q ch (in %) from start_idx on, over rows with a discharge value and a positive charge."""
+    qd = _float_tail(qdis, start_idx)
+    qc = _float_tail(qch, start_idx)
+    valid = ~np.isnan(qd) & (qc > 0)
+    if not valid.any():
+        return None
+    return float(np.mean(qd[valid] / qc[valid]) * 100)
+
+
+def mean_positive_pct(values, start_idx=0):
+    """Mean of the positive efficiency ratios from start_idx on, as a percentage."""
+    ratios = _float_tail(values, start_idx)
+    ratios = ratios[ratios > 0]  # NaN compares False
+    if ratios.size == 0:
+        return None
+    return float(np.mean(ratios) * 100)
 
 
 def _calculate_post_formation_ce(df, formation_cycles, project_type="Full Cell"):
@@ -9,7 +37,6 @@ def _calculate_post_formation_ce(df, formation_cycles, project_type="Full Cell")
         return None
 
     start_idx = formation_cycles if n_cycles > formation_cycles else 0
-    ceff_values = []
 
     try:
         if 'Q charge (mA.h)' in df.columns and 'Q discharge (mA.h)' in df.columns:
@@ -19,22 +46,13 @@ def _calculate_post_formation_ce(df, formation_cycles, project_type="Full Cell")
                 pd.to_numeric(df['Q discharge (mA.h)'], errors='coerce'),
                 project_type
             ) / 100
-            ceff_values = [
-                float(val) * 100
-                for val in corrected_efficiency.iloc[start_idx:n_cycles]
-                if pd.notna(val) and float(val) > 0
-            ]
+            return mean_positive_pct(corrected_efficiency, start_idx)
         elif 'Efficiency (-)' in df.columns:
-            eff_series = pd.to_numeric(df['Efficiency (-)'], errors='coerce')
-            ceff_values = [
-                float(val) * 100
-                for val in eff_series.iloc[start_idx:n_cycles]
-                if pd.notna(val) and float(val) > 0
-            ]
+            return mean_positive_pct(df['Efficiency (-)'], start_idx)
     except Exception:
         return None
 
-    return sum(ceff_values) / len(ceff_values) if ceff_values else None
+    return None
 
 def calculate_cell_summary(df, cell_data, disc_area_cm2, project_type="Full Cell"):
     """Calculate summary statistics for a single cell."""
@@ -45,8 +63,11 @@ def calculate_cell_summary(df, cell_data, disc_area_cm2, project_type="Full Cell
         active_material = cell_data.get('active_material', 0)
         formation_cycles = cell_data.get('formation_cycles', 4)
         
+        # Column arrays read once and sliced below
+        qdis_arr = df['Q Dis (mAh/g)'].to_numpy()
+        
         # 1st Cycle Discharge Capacity (mAh/g)
-        first_three_qdis = df['Q Dis (mAh/g)'].head(3).tolist()
+        first_three_qdis = qdis_arr[:3].tolist()
         max_qdis = max(first_three_qdis) if first_three_qdis else None
         
         # First Cycle Efficiency (%)
@@ -68,7 +89,7 @@ def calculate_cell_summary(df, cell_data, disc_area_cm2, project_type="Full Cell
                 eff_pct = None
         elif 'Efficiency (-)' in df.columns and not df['Efficiency (-)'].empty:
             # Fallback to DataFrame efficiency if charge/discharge data not available
-            first_cycle_eff = df['Efficiency (-)'].iloc[0]
+            first_cycle_eff = df['Efficiency (-)'].to_numpy()[0]
             try:
                 eff_pct = float(first_cycle_eff) * 100
             except (ValueError, TypeError):
@@ -78,7 +99,8 @@ def calculate_cell_summary(df, cell_data, disc_area_cm2, project_type="Full Cell
         cycle_life_80 = None
         try:
             qdis_series = df['Q Dis (mAh/g)'].dropna()
-            cycle_index_series = df[df.columns[0]].iloc[qdis_series.index]
+            x_col = df.columns[0]
+            cycle_index_series = df[x_col].to_numpy()[qdis_series.index.to_numpy()]
             cycle_life_80 = calculate_cycle_life_80(qdis_series, cycle_index_series, formation_cycles)
         except:
             pass
@@ -93,8 +115,8 @@ def calculate_cell_summary(df, cell_data, disc_area_cm2, project_type="Full Cell
         
         # Reversible Capacity (mAh/g)
         reversible_capacity = None
-        if len(df) > formation_cycles:
-            reversible_capacity = df['Q Dis (mAh/g)'].iloc[formation_cycles]
+        if qdis_arr.size > formation_cycles:
+            reversible_capacity = qdis_arr[formation_cycles]
         
         # Coulombic Efficiency (post-formation, %)
         ceff_avg = None
@@ -190,7 +212,12 @@ def calculate_experiment_average(experiment_cells, exp_name, exp_date):
     }
 
 def calculate_cycle_life_80(qdis_series, cycle_index_series, formation_cycles=4):
-    """Calculate cycle life at 80% capacity retention."""
+    """Calculate cycle life at 80% capacity retention.
+
+    cycle_index_series holds the cycle numbers aligned position-by-position with
+    qdis_series; a Series or a plain array both work.
+    """
+    cycle_values = np.asarray(cycle_index_series)
     # Use max of cycles 3 and 4 as initial, or last available if <4 cycles
     if len(qdis_series) >= 4:
         initial_qdis = max(qdis_series.iloc[2], qdis_series.iloc[3])
@@ -210,25 +237,16 @@ def calculate_cycle_life_80(qdis_series, cycle_index_series, formation_cycles=4)
     
     if start_checking_idx >= len(qdis_series):
         # Not enough post-formation data
-        return int(cycle_index_series.iloc[-1])
-    
-    # Get the subset of data after formation cycles
-    post_formation_qdis = qdis_series.iloc[start_checking_idx:]
-    post_formation_cycles = cycle_index_series.iloc[start_checking_idx:]
+        return int(cycle_values[-1])
     
     # Check for capacity below threshold in post-formation data
-    below_threshold = post_formation_qdis <= threshold
+    below_threshold = qdis_series.to_numpy()[start_checking_idx:] <= threshold
     if below_threshold.any():
-        # Find the first cycle where capacity drops below threshold
-        first_below_indices = below_threshold[below_threshold].index
-        if len(first_below_indices) > 0:
-            first_below_idx = first_below_indices[0]
-            # Get the corresponding cycle number
-            cycle_position = qdis_series.index.get_loc(first_below_idx)
-            return int(cycle_index_series.iloc[cycle_position])
+        # Cycle number at the first position where capacity drops below threshold
+        return int(cycle_values[start_checking_idx + np.argmax(below_threshold)])
     
     # If capacity never drops below 80% after formation, return the last cycle number
-    return int(cycle_index_series.iloc[-1])
+    return int(cycle_values[-1])
 
 def calculate_capacity_fade_rate(df, formation_cycles=4, min_linear_cycles=10):
     """
@@ -314,6 +332,19 @@ def get_qdis_series(df_cell):
         return pd.Series(qdis_raw).dropna()
 
 
+def build_cycle_lookup(df, x_col):
+    """Map each cycle value to its first row's capacity/efficiency values for O(1) per-cycle lookups."""
+    value_cols = [col for col in ('Q Dis (mAh/g)', 'Q Chg (mAh/g)', 'Efficiency (-)') if col in df.columns]
+    return df.drop_duplicates(subset=x_col).set_index(x_col)[value_cols].to_dict('index')
+
+
+def common_cycle_values(dfs, x_col):
+    """Sorted cycle values present in every DataFrame, intersected in NumPy rather than Python sets."""
+    arrays = [df[x_col].to_numpy() for df in dfs]
+    # Seeding with the first array means even a single frame goes through intersect1d,
+    # which sorts, drops repeats and leaves out NaN cycles
+    return reduce(np.intersect1d, arrays, arrays[0]).tolist()
+
 def calculate_np_ratio_from_formation(df, formation_cycles=4, anode_mass=None, cathode_mass=None):
     """
     Calculate N/P ratio from formation cycle capacities.
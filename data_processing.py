@@ -453,6 +453,96 @@ def parse_mti_xlsx(file_obj, dataset: Dict[str, Any], project_type: str = "Full
     except Exception as e:
         raise ValueError(f"Error parsing MTI XLSX file: {str(e)}")
 
+def parse_cell_file(file_obj, ds: Dict[str, Any], project_type: str = "Full Cell") -> Tuple[pd.DataFrame, str, Optional[float], Optional[float]]:
+    """
+    Detect the cycler format of one uploaded file and parse it.
+
+    Only depends on the file content and the loading/active/testnum values in ``ds``,
+    so callers can cache the result by file content.
+
+    Returns:
+        Tuple of (dataframe, file_type, lower_cutoff_voltage, upper_cutoff_voltage)
+    """
+    # Reset file position before processing
+    try:
+        file_obj.seek(0)
+    except (AttributeError, OSError):
+        # Handle case where file object doesn't support seek or is closed
+        pass
+    
+    file_type = detect_file_type(file_obj)
+    
+    # Reset file position again before parsing
+    try:
+        file_obj.seek(0)
+    except (AttributeError, OSError):
+        pass
+    
+    if file_type == 'biologic_csv':
+        df, lower_voltage, upper_voltage = parse_biologic_csv(file_obj, ds, project_type)
+    elif file_type == 'neware_xlsx':
+        df, lower_voltage, upper_voltage = parse_neware_xlsx(file_obj, ds, project_type)
+    elif file_type == 'mti_xlsx':
+        df, lower_voltage, upper_voltage = parse_mti_xlsx(file_obj, ds, project_type)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+    return df, file_type, lower_voltage, upper_voltage
+
+def build_processed_cell(ds: Dict[str, Any], df: pd.DataFrame, file_type: str, lower_voltage: Optional[float], upper_voltage: Optional[float], project_type: str = "Full Cell") -> Dict[str, Any]:
+    """Combine a parsed cell DataFrame with its dataset inputs and electrode data."""
+    # Allow manual override of cutoff voltages if provided in dataset
+    if 'cutoff_voltage_lower' in ds and ds['cutoff_voltage_lower'] is not None:
+        lower_voltage = ds['cutoff_voltage_lower']
+    if 'cutoff_voltage_upper' in ds and ds['cutoff_voltage_upper'] is not None:
+        upper_voltage = ds['cutoff_voltage_upper']
+    
+    # Add electrode data if available in session state
+    pressed_thickness = None
+    solids_content = None
+    porosity = None
+    
+    # Try to get electrode data from session state (for new experiments)
+    try:
+        import streamlit as st
+        pressed_thickness = st.session_state.get('pressed_thickness', None)
+        solids_content = st.session_state.get('solids_content', None)
+        
+        # Calculate porosity if we have the required data
+        if (pressed_thickness and pressed_thickness > 0 and 
+            ds.get('formulation') and 
+            st.session_state.get('current_disc_diameter_mm')):
+            
+            try:
+                from porosity_calculations import calculate_porosity_from_experiment_data
+                porosity_data = calculate_porosity_from_experiment_data(
+                    disc_mass_mg=ds['loading'],
+                    disc_diameter_mm=st.session_state.get('current_disc_diameter_mm', 15),
+                    pressed_thickness_um=pressed_thickness,
+                    formulation=ds['formulation']
+                )
+                porosity = porosity_data['porosity']
+            except Exception as e:
+                print(f"Error calculating porosity for {ds['testnum']}: {e}")
+                porosity = None
+    except ImportError:
+        # streamlit not available (e.g., in testing)
+        pass
+    
+    return {
+        'df': df,
+        'testnum': ds['testnum'],
+        'loading': ds['loading'],
+        'active': ds['active'],
+        'formation_cycles': ds.get('formation_cycles', 4),
+        'file_type': file_type,
+        'project_type': project_type,
+        'pressed_thickness': pressed_thickness,
+        'solids_content': solids_content,
+        'porosity': porosity,
+        'cutoff_voltage_lower': lower_voltage,
+        'cutoff_voltage_upper': upper_voltage
+    }
+
 def load_and_preprocess_data(datasets: List[Dict[str, Any]], project_type: str = "Full Cell") -> List[Dict[str, Any]]:
     """
     Load CSVs or XLSX files, calculate columns, and return list of dicts for each cell.
@@ -463,83 +553,8 @@ def load_and_preprocess_data(datasets: List[Dict[str, Any]], project_type: str =
     """
     dfs = []
     for ds in datasets:
-        file_obj = ds['file']
-        
-        # Reset file position before processing
-        try:
-            file_obj.seek(0)
-        except (AttributeError, OSError):
-            # Handle case where file object doesn't support seek or is closed
-            pass
-        
-        file_type = detect_file_type(file_obj)
-        
-        # Reset file position again before parsing
-        try:
-            file_obj.seek(0)
-        except (AttributeError, OSError):
-            pass
-        
-        if file_type == 'biologic_csv':
-            df, lower_voltage, upper_voltage = parse_biologic_csv(file_obj, ds, project_type)
-        elif file_type == 'neware_xlsx':
-            df, lower_voltage, upper_voltage = parse_neware_xlsx(file_obj, ds, project_type)
-        elif file_type == 'mti_xlsx':
-            df, lower_voltage, upper_voltage = parse_mti_xlsx(file_obj, ds, project_type)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
-        
-        # Allow manual override of cutoff voltages if provided in dataset
-        if 'cutoff_voltage_lower' in ds and ds['cutoff_voltage_lower'] is not None:
-            lower_voltage = ds['cutoff_voltage_lower']
-        if 'cutoff_voltage_upper' in ds and ds['cutoff_voltage_upper'] is not None:
-            upper_voltage = ds['cutoff_voltage_upper']
-        
-        # Add electrode data if available in session state
-        pressed_thickness = None
-        solids_content = None
-        porosity = None
-        
-        # Try to get electrode data from session state (for new experiments)
-        try:
-            import streamlit as st
-            pressed_thickness = st.session_state.get('pressed_thickness', None)
-            solids_content = st.session_state.get('solids_content', None)
-            
-            # Calculate porosity if we have the required data
-            if (pressed_thickness and pressed_thickness > 0 and 
-                ds.get('formulation') and 
-                st.session_state.get('current_disc_diameter_mm')):
-                
-                try:
-                    from porosity_calculations import calculate_porosity_from_experiment_data
-                    porosity_data = calculate_porosity_from_experiment_data(
-                        disc_mass_mg=ds['loading'],
-                        disc_diameter_mm=st.session_state.get('current_disc_diameter_mm', 15),
-                        pressed_thickness_um=pressed_thickness,
-                        formulation=ds['formulation']
-                    )
-                    porosity = porosity_data['porosity']
-                except Exception as e:
-                    print(f"Error calculating porosity for {ds['testnum']}: {e}")
-                    porosity = None
-        except ImportError:
-            # streamlit not available (e.g., in testing)
-            pass
-        
-        dfs.append({
-            'df': df,
-            'testnum': ds['testnum'],
-            'loading': ds['loading'],
-            'active': ds['active'],
-            'file_type': file_type,
-            'project_type': project_type,
-            'pressed_thickness': pressed_thickness,
-            'solids_content': solids_content,
-            'porosity': porosity,
-            'cutoff_voltage_lower': lower_voltage,
-            'cutoff_voltage_upper': upper_voltage
-        })
+        df, file_type, lower_voltage, upper_voltage = parse_cell_file(ds['file'], ds, project_type)
+        dfs.append(build_processed_cell(ds, df, file_type, lower_voltage, upper_voltage, project_type))
     return dfs
 
 def calculate_summary_stats(df: pd.DataFrame) -> Dict[str, Any]:
@@ -1,17 +1,21 @@
 import sqlite3
 import json
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import time
 import random
 import os
 import uuid
+from io import StringIO
 import pandas as pd
 from pathlib import Path
 import streamlit as st
 
 DATABASE_PATH = 'cellscope.db'
 SQLITE_TIMEOUT = 60
+# Parquet reads release the GIL, so project-wide loads hydrate experiments in parallel
+HYDRATION_WORKERS = 4
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("database")
@@ -76,9 +80,54 @@ def _load_df_from_parquet(filepath):
         return None
     return pd.read_parquet(filepath)
 
-def hydrate_data_json(d_json, p_path, row_id=None):
-    """Helper to hydrate data_json from parquet path(s)."""
+def _max_cycle(df):
+    """Highest cycle number in a cell frame, stored on the cell so listings can filter without loading it."""
+    for col in ('Cycle', 'Cycle number'):
+        if col in df.columns:
+            value = pd.to_numeric(df[col], errors='coerce').max()
+            return None if pd.isna(value) else value.item()
+    return None
+
+def load_cell_dataframe(cell_data):
+    """
+    Helper to load a cell's DataFrame, reading its parquet file directly when available
+    and falling back to the inline data_json.
+
+    Cells whose data is replaced in session (e.g. capacities recalculated on save) must
+    drop their parquet_path, so an older file never hides the new data_json.
+    """
+    p_path = cell_data.get('parquet_path')
+    if p_path and os.path.exists(p_path):
+        try:
+            return _load_df_from_parquet(p_path)
+        except Exception as e:
+            logger.error(f"Error loading parquet data from {p_path}: {e}")
+    d_json = cell_data.get('data_json')
+    if not d_json:
+        raise ValueError(f"No data_json or parquet file for cell {cell_data.get('cell_name', 'Unknown')}")
+    return pd.read_json(StringIO(d_json))
+
+def legacy_cell_source(data_json, parsed_data):
+    """
+    Helper to build the cell dict load_cell_dataframe reads for a legacy single-cell
+    experiment, given its payload as returned with inline_cells=False.
+    """
+    if isinstance(parsed_data, dict) and set(parsed_data) == {'parquet_path'}:
+        return parsed_data
+    return {'data_json': data_json}
+
+def hydrate_data_json(d_json, p_path, row_id=None, inline_cells=True):
+    """
+    Helper to hydrate data_json from parquet path(s).
+
+    With inline_cells=False the cells of a multi-cell payload keep their parquet_path
+    references instead of being re-encoded as JSON, for callers that read each cell
+    through load_cell_dataframe. A legacy single-cell parquet is likewise returned as a
+    {"parquet_path": ...} reference; see legacy_cell_source.
+    """
     # Hydrate from main parquet
+    if p_path and os.path.exists(p_path) and not inline_cells:
+        return json.dumps({'parquet_path': p_path})
     if p_path and os.path.exists(p_path):
          try:
              df = _load_df_from_parquet(p_path)
@@ -90,7 +139,7 @@ def hydrate_data_json(d_json, p_path, row_id=None):
              # fall through to check d_json or return existing d_json
 
     # Hydrate embedded parquet (multi-cell)
-    if d_json:
+    if d_json and inline_cells:
         try:
              # Fast check: does it contain "parquet_path"?
              if "parquet_path" in d_json:
@@ -481,6 +530,17 @@ def migrate_database():
                 FOREIGN KEY (experiment_id) REFERENCES cell_experiments (id) ON DELETE CASCADE
             )
         ''')
+
+        # Dashboard indexes: per-user project listing ordered by activity, and
+        # per-project experiment date ranges (recent activity, date filters)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_projects_user_modified
+            ON projects (user_id, last_modified DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_cell_experiments_project_date
+            ON cell_experiments (project_id, created_date)
+        ''')
         
         conn.commit()
 
@@ -648,7 +708,7 @@ def get_project_experiment_index(project_id):
         ''', (project_id,))
         return cursor.fetchall()
 
-def get_hydrated_experiment_payload(experiment_id):
+def get_hydrated_experiment_payload(experiment_id, inline_cells=True):
     """Get an experiment payload only when the full hydrated data is needed."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -663,7 +723,7 @@ def get_hydrated_experiment_payload(experiment_id):
             return None
 
         project_id, experiment_name, data_json, parquet_path = row
-        hydrated_json = hydrate_data_json(data_json, parquet_path, experiment_id)
+        hydrated_json = hydrate_data_json(data_json, parquet_path, experiment_id, inline_cells)
         return project_id, experiment_name, hydrated_json
 
 def check_experiment_exists(project_id, cell_name, file_name):
@@ -678,7 +738,7 @@ def check_experiment_exists(project_id, cell_name, file_name):
         ''', (project_id, cell_name, file_name))
         return bool(cursor.fetchone()[0])
 
-def get_experiment_data(experiment_id):
+def get_experiment_data(experiment_id, inline_cells=True):
     """Get detailed data for a specific experiment."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -697,7 +757,7 @@ def get_experiment_data(experiment_id):
         row_id, pid, cname, fname, loading, active, form, testnum, elec, sub, sep, d_json, cdate, p_path = row
         
         # Hydrate
-        d_json = hydrate_data_json(d_json, p_path, row_id)
+        d_json = hydrate_data_json(d_json, p_path, row_id, inline_cells)
         
         return (row_id, pid, cname, fname, loading, active, form, testnum, elec, sub, sep, d_json, cdate)
 
@@ -858,6 +918,8 @@ def save_experiment(project_id, experiment_name, experiment_date, disc_diameter_
         
         # Process cells to extract data to parquet
         if cells_data:
+            # Work on copies so the caller's cells keep their in-memory data_json
+            cells_data = [dict(cell) for cell in cells_data]
             for cell in cells_data:
                 d_json = cell.get('data_json')
                 # If d_json is present and substantial (looks like a dataframe json)
@@ -869,6 +931,7 @@ def save_experiment(project_id, experiment_name, experiment_date, disc_diameter_
                             path = _save_df_to_parquet(df, prefix="cell_multi")
                             cell['parquet_path'] = path
                             cell['data_json'] = None # Clear embedded data
+                            cell['max_cycle'] = _max_cycle(df)
                     except Exception as e:
                         logger.error(f"Error converting cell data to parquet: {e}")
 
@@ -912,7 +975,13 @@ def save_experiment(project_id, experiment_name, experiment_date, disc_diameter_
         return experiment_id
 
 def update_experiment(experiment_id, project_id, experiment_name, experiment_date, disc_diameter_mm, group_assignments, group_names, cells_data, solids_content=None, pressed_thickness=None, experiment_notes=None, cell_format_data=None, additional_data=None):
-    """Update an existing experiment with new experiment-level fields."""
+    """
+    Update an existing experiment with new experiment-level fields.
+
+    Cells that only carry a parquet_path keep their existing file; cells with inline
+    data_json are written to a new one. Files the experiment no longer references are
+    removed once the update commits. Returns the cells as stored.
+    """
     try:
         from porosity_calculations import calculate_porosity_from_experiment_data
         
@@ -984,12 +1053,18 @@ def update_experiment(experiment_id, project_id, experiment_name, experiment_dat
         for key, value in existing_data.items():
             if key not in experiment_data:
                 experiment_data[key] = value
+        previous_paths = {
+            cell.get('parquet_path') for cell in existing_data.get('cells', [])
+            if isinstance(cell, dict) and cell.get('parquet_path')
+        }
 
         if additional_data:
             experiment_data.update(additional_data)
         
         # Process cells to extract data to parquet
         if cells_data:
+            # Work on copies so the caller's cells keep their in-memory data_json
+            cells_data = [dict(cell) for cell in cells_data]
             for cell in cells_data:
                 d_json = cell.get('data_json')
                 if d_json and len(str(d_json)) > 100:
@@ -1003,14 +1078,10 @@ def update_experiment(experiment_id, project_id, experiment_name, experiment_dat
                             path = _save_df_to_parquet(df, prefix="cell_multi")
                             cell['parquet_path'] = path
                             cell['data_json'] = None
-                            
-                            # Clean up old file if there was one? 
-                            # Hard to track unless we kept the old path in the cell data passed from frontend.
-                            # The frontend hydrates it, so 'parquet_path' key might be lost/overwritten?
-                            # If frontend preserves unknown keys, 'parquet_path' might be there.
-                            # If we overwrite it, we orphan the old file. Minimal issue for now.
+                            cell['max_cycle'] = _max_cycle(df)
                     except Exception as e:
                         logger.error(f"Error in update_experiment parquet conversion: {e}")
+        experiment_data['cells'] = cells_data
 
         cursor.execute('''
             UPDATE cell_experiments 
@@ -1029,6 +1100,108 @@ def update_experiment(experiment_id, project_id, experiment_name, experiment_dat
         ''', (project_id,))
         conn.commit()
 
+    # Remove the files of cells whose data was replaced or that were dropped
+    current_paths = {cell.get('parquet_path') for cell in cells_data}
+    for stale_path in previous_paths - current_paths:
+        try:
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+        except OSError as e:
+            logger.warning(f"Could not remove replaced parquet file {stale_path}: {e}")
+    return cells_data
+
+# Values the edit form fills in for cell fields that older stored cells may not carry
+CELL_FIELD_DEFAULTS = {
+    'formation_cycles': 4,
+    'electrolyte': '1M LiPF6 1:1:1',
+    'substrate': 'Copper',
+    'separator': '25um PP',
+    'formulation': [],
+    'excluded': False,
+    'tracking_placeholder': False,
+}
+
+def cells_match_stored(updated_cells, stored_cells):
+    """
+    Check whether the edited cells carry the same values as the stored cells.
+
+    A field missing from a stored cell compares against the default the edit form
+    fills in (CELL_FIELD_DEFAULTS, else None), and test_number against cell_name.
+    """
+    if len(updated_cells) != len(stored_cells):
+        return False
+    for updated, stored in zip(updated_cells, stored_cells):
+        for key, value in updated.items():
+            if key in stored:
+                stored_value = stored[key]
+            elif key == 'test_number':
+                stored_value = stored.get('cell_name')
+            else:
+                stored_value = CELL_FIELD_DEFAULTS.get(key)
+            if stored_value != value:
+                return False
+    return True
+
+def update_experiment_metadata(experiment_id, project_id, experiment_date, disc_diameter_mm, group_assignments, group_names, solids_content=None, pressed_thickness=None, experiment_notes=None, cell_format_data=None, additional_data=None):
+    """
+    Update experiment-level fields only, leaving the stored cell payloads untouched.
+
+    The fields are written with SQLite's json_set, so the stored 'cells' list (inline
+    data_json included) is never decoded or re-encoded in Python.
+    """
+    fields = {
+        'experiment_date': experiment_date.isoformat() if experiment_date else None,
+        'disc_diameter_mm': disc_diameter_mm,
+        'group_assignments': group_assignments,
+        'group_names': group_names,
+        'solids_content': solids_content,
+        'pressed_thickness': pressed_thickness,
+        'experiment_notes': experiment_notes
+    }
+
+    if cell_format_data:
+        fields.update(cell_format_data)
+
+    if additional_data:
+        fields.update(additional_data)
+
+    assignments = ', '.join('?, json(?)' for _ in fields)
+    params = []
+    for key, value in fields.items():
+        params.extend([f'$."{key}"', json.dumps(value)])
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            UPDATE cell_experiments 
+            SET data_json = json_set(COALESCE(NULLIF(data_json, ''), '{{}}'), {assignments}),
+                solids_content = ?, pressed_thickness = ?, experiment_notes = ?
+            WHERE id = ? AND json_valid(COALESCE(NULLIF(data_json, ''), '{{}}'))
+        ''', (*params, solids_content, pressed_thickness, experiment_notes, experiment_id))
+        if cursor.rowcount == 0:
+            # SQLite rejects payloads Python's json accepts (e.g. NaN), so merge those here.
+            cursor.execute('SELECT data_json FROM cell_experiments WHERE id = ?', (experiment_id,))
+            existing_row = cursor.fetchone()
+            experiment_data = {}
+            if existing_row and existing_row[0]:
+                try:
+                    experiment_data = json.loads(existing_row[0])
+                except (TypeError, json.JSONDecodeError):
+                    experiment_data = {}
+            experiment_data.update(fields)
+            cursor.execute('''
+                UPDATE cell_experiments 
+                SET data_json = ?, solids_content = ?, pressed_thickness = ?, experiment_notes = ?
+                WHERE id = ?
+            ''', (json.dumps(experiment_data), solids_content, pressed_thickness, experiment_notes, experiment_id))
+        # Update project last_modified
+        cursor.execute('''
+            UPDATE projects 
+            SET last_modified = CURRENT_TIMESTAMP 
+            WHERE id = ?
+        ''', (project_id,))
+        conn.commit()
+
 def get_experiment_by_id(experiment_id):
     """Get experiment data by experiment ID."""
     with get_db_connection() as conn:
@@ -1206,8 +1379,13 @@ def get_experiment_by_name(project_id, experiment_name):
         result = cursor.fetchone()
         return result[0] if result else None
 
-def get_all_project_experiments_data(project_id):
-    """Get all experiments data for a project for Master Table analysis."""
+def get_all_project_experiments_data(project_id, inline_cells=True):
+    """
+    Get all experiments data for a project for Master Table analysis.
+
+    Pass inline_cells=False when each cell is read through load_cell_dataframe; the
+    payloads then keep their parquet references (see hydrate_data_json).
+    """
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -1218,21 +1396,21 @@ def get_all_project_experiments_data(project_id):
             ORDER BY created_date DESC
         ''', (project_id,))
         results = cursor.fetchall()
-        
-        hydrated_results = []
-        for row in results:
-            # row: 0=id, 11=data_json, 17=parquet_path
-            d_json = row[11]
-            p_path = row[17]
-            
-            d_json = hydrate_data_json(d_json, p_path, row[0])
-            
-            # Reconstruct row without parquet_path (length 17)
-            new_row = list(row[:17])
-            new_row[11] = d_json
-            hydrated_results.append(tuple(new_row))
-            
-        return hydrated_results
+    
+    def _hydrate_row(row):
+        # row: 0=id, 11=data_json, 17=parquet_path
+        d_json = hydrate_data_json(row[11], row[17], row[0], inline_cells)
+        
+        # Reconstruct row without parquet_path (length 17)
+        new_row = list(row[:17])
+        new_row[11] = d_json
+        return tuple(new_row)
+    
+    # Keeping parquet references reads no files, so only inlining needs the pool.
+    if len(results) <= 1 or not inline_cells:
+        return [_hydrate_row(row) for row in results]
+    with ThreadPoolExecutor(max_workers=min(HYDRATION_WORKERS, len(results))) as pool:
+        return list(pool.map(_hydrate_row, results))
 
 @st.cache_data(ttl=30, show_spinner=False)
 def get_project_preferences(project_id):
@@ -1280,7 +1458,7 @@ def get_project_preference(project_id, key, default=None):
         result = cursor.fetchone()
         return result[0] if result else default
 
-def get_experiments_by_formulation_component(project_id, component_name, min_percentage=None, max_percentage=None):
+def get_experiments_by_formulation_component(project_id, component_name, min_percentage=None, max_percentage=None, inline_cells=True):
     """
     Get experiments that contain a specific formulation component within a percentage range.
     
@@ -1289,6 +1467,7 @@ def get_experiments_by_formulation_component(project_id, component_name, min_per
         component_name: Name of the component to search for (e.g., "Graphite")
         min_percentage: Minimum dry mass fraction percentage (optional)
         max_percentage: Maximum dry mass fraction percentage (optional)
+        inline_cells: Pass False to keep parquet references in the payloads (see hydrate_data_json)
     
     Returns:
         List of experiment data tuples matching the criteria
@@ -1312,7 +1491,7 @@ def get_experiments_by_formulation_component(project_id, component_name, min_per
             # exp: 0=id, 12=data_json, 18=parquet_path
             d_json = exp[12]
             p_path = exp[18]
-            d_json = hydrate_data_json(d_json, p_path, exp[0])
+            d_json = hydrate_data_json(d_json, p_path, exp[0], inline_cells)
             
             # Construct hydrated experiment tuple (18 elements)
             hydrated_exp = list(exp[:18])
@@ -1394,7 +1573,7 @@ def get_formulation_summary(project_id):
         component_summary = {}
         
         for formulation_json, data_json, p_path, exp_id in results:
-            d_json = hydrate_data_json(data_json, p_path, exp_id)
+            d_json = hydrate_data_json(data_json, p_path, exp_id, inline_cells=False)
             data_json = d_json
             
             formulations_to_check = []
@@ -1462,7 +1641,7 @@ def get_experiments_grouped_by_formulation(project_id, component_name):
     Returns:
         Dictionary with percentage ranges as keys and lists of experiment IDs as values
     """
-    experiments = get_experiments_by_formulation_component(project_id, component_name)
+    experiments = get_experiments_by_formulation_component(project_id, component_name, inline_cells=False)
     grouped = {}
     
     for exp in experiments:
@@ -5,16 +5,19 @@ from __future__ import annotations
 import hashlib
 import json
 import os
-from io import StringIO
 from typing import Any, Dict, Iterable, List, Optional
 
 import numpy as np
 import pandas as pd
 
-from dashboard_analytics import calculate_fade_rate, calculate_retention_percent
+from dashboard_analytics import calculate_cell_metrics, get_max_cycle, parse_cell_data_json
 from data_analysis import calculate_cell_summary
 from database import get_db_connection, hydrate_data_json
 
+# Bump when the cached payload gains fields or its values change, so existing rows
+# are recomputed.
+METRICS_SCHEMA_VERSION = 3
+
 
 def _ensure_metrics_table() -> None:
     with get_db_connection() as conn:
@@ -94,6 +97,7 @@ def _build_source_signature(
     raw_data_json: Optional[str],
 ) -> str:
     payload = {
+        "metrics_version": METRICS_SCHEMA_VERSION,
         "experiment_id": experiment_id,
         "created_date": created_date,
         "parquet": _path_signature(parquet_path),
@@ -162,7 +166,7 @@ def _build_experiment_metric_payload(row: Dict[str, Any]) -> Dict[str, Any]:
             continue
 
         try:
-            df = pd.read_json(StringIO(cell_data_json))
+            df = parse_cell_data_json(cell_data_json)
         except ValueError:
             cell_metrics.append(
                 {
@@ -182,20 +186,25 @@ def _build_experiment_metric_payload(row: Dict[str, Any]) -> Dict[str, Any]:
             continue
 
         summary = calculate_cell_summary(df, cell, disc_area, project_type)
-        retention_pct = calculate_retention_percent(df)
-        fade_rate_pct_per_100_cycles = calculate_fade_rate(df)
+        capacity_metrics = calculate_cell_metrics(df)
         cell_metrics.append(
             {
                 "cell_name": cell_name,
+                "cell_id": cell.get("test_number", cell.get("cell_name", "Unknown")),
                 "has_data": True,
-                "retention_pct": retention_pct,
-                "fade_rate_pct_per_100_cycles": fade_rate_pct_per_100_cycles,
+                "excluded": bool(cell.get("excluded", False)),
+                "retention_pct": capacity_metrics.retention_pct,
+                "fade_rate_pct_per_100_cycles": capacity_metrics.fade_rate,
                 "coulombic_efficiency_pct": summary.get("coulombic_efficiency"),
                 "cycle_life_80": summary.get("cycle_life_80"),
                 "first_discharge_mAh_g": summary.get("first_discharge"),
                 "reversible_capacity_mAh_g": summary.get("reversible_capacity"),
                 "areal_capacity_mAh_cm2": summary.get("areal_capacity"),
                 "last_cycle_index": _extract_last_cycle_index(df),
+                "max_cycle": get_max_cycle(df),
+                "initial_capacity": capacity_metrics.initial_capacity,
+                "current_capacity": capacity_metrics.current_capacity,
+                "avg_efficiency": capacity_metrics.avg_efficiency,
                 "cycle_point_count": int(len(df)),
             }
         )
@@ -1395,8 +1395,7 @@ def display_detailed_flags_section(all_flags):
         def get_cell_max_severity(flags):
             if not flags:
                 return 3
-            severity_order = {FlagSeverity.CRITICAL: 0, FlagSeverity.WARNING: 1, FlagSeverity.INFO: 2}
-            return min(severity_order.get(f.severity, 3) for f in flags)
+            return min(f.severity.rank for f in flags)
         
         sorted_cells = sorted(all_flags.items(), key=lambda x: get_cell_max_severity(x[1]))
         
@@ -1416,8 +1415,7 @@ def display_detailed_flags_section(all_flags):
                 continue
             
             # Determine icon based on most severe flag
-            severity_order = {FlagSeverity.CRITICAL: 0, FlagSeverity.WARNING: 1, FlagSeverity.INFO: 2}
-            max_severity = min(filtered_flags, key=lambda f: severity_order[f.severity]).severity
+            max_severity = min(filtered_flags, key=lambda f: f.severity.rank).severity
             icon = max_severity.value
             
             with st.expander(f"{icon} **{cell_name}** — {len(filtered_flags)} issue{'s' if len(filtered_flags) != 1 else ''}", expanded=False):
@@ -3,11 +3,10 @@ from typing import List, Dict, Any, Tuple, Optional
 import io
 import json
 import logging
-import tempfile
+import math
+import numbers
 import os
 import traceback
-from openpyxl import load_workbook
-from openpyxl.chart import LineChart, Reference
 import pandas as pd
 from pptx import Presentation
 from pptx.util import Inches, Pt
@@ -17,6 +16,8 @@ from pptx.enum.shapes import MSO_SHAPE
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 import numpy as np
+import xlsxwriter
+from data_analysis import mean_capacity_ratio_pct, mean_positive_pct
 
 # Set up comprehensive logging
 logging.basicConfig(
@@ -25,6 +26,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Colours and font sizes reused across slide tables
+_HEADER_FILL = RGBColor(68, 114, 196)
+_SLIDE_TABLE_HEADER_FILL = RGBColor(38, 77, 107)  # Dark teal from example
+_STRIPE_FILL = RGBColor(240, 240, 240)
+_WHITE = RGBColor(255, 255, 255)
+_BLACK = RGBColor(0, 0, 0)
+_PT10 = Pt(10)
+_PT11 = Pt(11)
+_PT12 = Pt(12)
+
+def _fmt(value: Any, spec: str = '.1f', suffix: str = '', na: str = "N/A") -> str:
+    """Format a real number (Python or NumPy) with `spec` and `suffix`; None, NaN and non-numbers give `na`."""
+    if isinstance(value, numbers.Real) and not math.isnan(value):
+        return format(value, spec) + suffix
+    return na
+
 def safe_cycle_life_calculation(df_cell: pd.DataFrame, formation_cycles: int = 4) -> Optional[int]:
     """
     Calculate cycle life using the same logic as the main application.
@@ -50,15 +67,15 @@ def safe_cycle_life_calculation(df_cell: pd.DataFrame, formation_cycles: int = 4
             logger.warning(f"Discharge capacity column '{qdis_col}' not found in data")
             return None
             
-        qdis_data = pd.to_numeric(post_formation_data[qdis_col], errors='coerce')
-        qdis_data = qdis_data.dropna()
+        qdis_values = pd.to_numeric(post_formation_data[qdis_col], errors='coerce').to_numpy(dtype=float)
+        valid_idx = np.flatnonzero(~np.isnan(qdis_values))
         
-        if qdis_data.empty:
+        if valid_idx.size == 0:
             logger.warning("No valid discharge capacity data found")
             return None
             
         # Use the first post-formation cycle as reference
-        initial_capacity = qdis_data.iloc[0]
+        initial_capacity = qdis_values[valid_idx[0]]
         if initial_capacity <= 0:
             logger.warning(f"Invalid initial capacity: {initial_capacity}")
             return None
@@ -66,12 +83,11 @@ def safe_cycle_life_calculation(df_cell: pd.DataFrame, formation_cycles: int = 4
         threshold = 0.8 * initial_capacity
         logger.debug(f"Initial capacity: {initial_capacity}, threshold: {threshold}")
         
-        # Find first cycle below threshold
-        below_threshold = qdis_data < threshold
-        if below_threshold.any():
-            first_below_idx = below_threshold.idxmax()
+        # Find first cycle below threshold (NaN compares False, so gaps are skipped)
+        below_idx = np.flatnonzero(qdis_values < threshold)
+        if below_idx.size:
             # Get the actual cycle number from the original dataframe
-            cycle_number = df_cell.iloc[first_below_idx][df_cell.columns[0]]
+            cycle_number = post_formation_data.iloc[:, 0].to_numpy()[below_idx[0]]
             logger.info(f"Cycle life calculated: {int(cycle_number)} cycles")
             return int(cycle_number)
         else:
@@ -94,19 +110,23 @@ def get_cell_metrics(df_cell: pd.DataFrame, formation_cycles: int = 4) -> Dict[s
     try:
         logger.debug(f"Calculating metrics for cell with {len(df_cell)} cycles")
         
+        # Column arrays read once and sliced below
+        qdis_arr = df_cell['Q Dis (mAh/g)'].to_numpy()
+        eff_arr = df_cell['Efficiency (-)'].to_numpy() if 'Efficiency (-)' in df_cell.columns else None
+        
         # 1st Cycle Discharge Capacity (max of first 3 cycles)
-        first_three_qdis = df_cell['Q Dis (mAh/g)'].head(3).tolist()
+        first_three_qdis = qdis_arr[:3].tolist()
         max_qdis = max(first_three_qdis) if first_three_qdis else None
         metrics['max_qdis'] = max_qdis
-        metrics['qdis_str'] = f"{max_qdis:.1f}" if isinstance(max_qdis, (int, float)) else "N/A"
+        metrics['qdis_str'] = _fmt(max_qdis)
         
         # First Cycle Efficiency
-        if 'Efficiency (-)' in df_cell.columns and not df_cell['Efficiency (-)'].empty:
-            first_cycle_eff = df_cell['Efficiency (-)'].iloc[0]
+        if eff_arr is not None and eff_arr.size:
+            first_cycle_eff = eff_arr[0]
             try:
                 eff_pct = float(first_cycle_eff) * 100
                 metrics['eff_pct'] = eff_pct
-                metrics['eff_str'] = f"{eff_pct:.1f}%"
+                metrics['eff_str'] = _fmt(eff_pct, suffix='%')
             except (ValueError, TypeError):
                 metrics['eff_pct'] = None
                 metrics['eff_str'] = "N/A"
@@ -117,49 +137,33 @@ def get_cell_metrics(df_cell: pd.DataFrame, formation_cycles: int = 4) -> Dict[s
         # Cycle Life (80%)
         cycle_life = safe_cycle_life_calculation(df_cell, formation_cycles)
         metrics['cycle_life'] = cycle_life
-        metrics['cycle_life_str'] = f"{cycle_life}" if cycle_life is not None else "N/A"
+        metrics['cycle_life_str'] = _fmt(cycle_life, 'd')
         
         # Reversible Capacity (first cycle after formation)
-        if len(df_cell) > formation_cycles:
-            reversible_capacity = df_cell['Q Dis (mAh/g)'].iloc[formation_cycles]
+        if qdis_arr.size > formation_cycles:
+            reversible_capacity = qdis_arr[formation_cycles]
             metrics['reversible_capacity'] = reversible_capacity
-            metrics['reversible_str'] = f"{reversible_capacity:.1f}" if isinstance(reversible_capacity, (int, float)) else "N/A"
+            metrics['reversible_str'] = _fmt(reversible_capacity)
         else:
             metrics['reversible_capacity'] = None
             metrics['reversible_str'] = "N/A"
         
         # Coulombic Efficiency (average of post-formation cycles)
-        eff_col = 'Efficiency (-)'
-        qdis_col = 'Q Dis (mAh/g)'
         qch_col = 'Q Ch (mAh/g)'
         n_cycles = len(df_cell)
         
         # Coulombic efficiency: prefer Q Dis / Q Ch per cycle; fall back to provided efficiency column
-        post_ce_values = []
+        avg_eff = None
         try:
             start_idx = formation_cycles if n_cycles > formation_cycles else 0
             
-            if qdis_col in df_cell.columns and qch_col in df_cell.columns:
-                qdis_series = pd.to_numeric(df_cell[qdis_col], errors='coerce')
-                qch_series = pd.to_numeric(df_cell[qch_col], errors='coerce')
-                
-                for i in range(start_idx, n_cycles):
-                    qdis = qdis_series.iloc[i]
-                    qch = qch_series.iloc[i]
-                    if pd.notna(qdis) and pd.notna(qch) and qch > 0:
-                        post_ce_values.append((qdis / qch) * 100)
-            
-            elif eff_col in df_cell.columns:
-                eff_series = pd.to_numeric(df_cell[eff_col], errors='coerce')
-                post_ce_values = [val * 100 for val in eff_series.iloc[start_idx:n_cycles] if pd.notna(val) and val > 0]
-            
-            if post_ce_values:
-                avg_eff = float(np.mean(post_ce_values))
-                metrics['coulombic_eff'] = avg_eff
-                metrics['coulombic_str'] = f"{avg_eff:.1f}%"
-            else:
-                metrics['coulombic_eff'] = None
-                metrics['coulombic_str'] = "N/A"
+            if qch_col in df_cell.columns:
+                avg_eff = mean_capacity_ratio_pct(qdis_arr, df_cell[qch_col], start_idx)
+            elif eff_arr is not None:
+                avg_eff = mean_positive_pct(eff_arr, start_idx)
+            
+            metrics['coulombic_eff'] = avg_eff
+            metrics['coulombic_str'] = _fmt(avg_eff, suffix='%')
         except Exception as e:
             logger.warning(f"Error calculating coulombic efficiency: {e}")
             metrics['coulombic_eff'] = None
@@ -284,64 +288,73 @@ def create_retention_plot_from_session_state(
         ax.set_title('Capacity Retention Plot (Error)')
         return fig
 
-def save_figure_to_temp_file(fig: Figure, dpi: int = 300) -> str:
+# Pixel density for plots embedded in slides; enough for projection and print
+SLIDE_IMAGE_PPI = 250
+
+def dpi_for_slide_width(fig: Figure, width_in: float, ppi: int = SLIDE_IMAGE_PPI) -> int:
+    """
+    DPI that renders the figure at about `ppi` pixels per inch once it is scaled
+    to `width_in` inches on the slide.
+    """
+    return max(96, int(width_in * ppi / fig.get_figwidth()))
+
+def save_figure_to_png_stream(fig: Figure, dpi: int = 300) -> io.BytesIO:
     """
-    Save a matplotlib figure to a temporary file and return the path.
+    Render a matplotlib figure to an in-memory PNG, ready for add_picture.
     Handles cleanup and error logging.
     """
-    temp_file = None
     try:
-        logger.debug("Saving figure to temporary file...")
-        
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-        temp_path = temp_file.name
-        temp_file.close()
+        logger.debug("Rendering figure to PNG stream...")
         
         # Save figure with high quality settings
-        fig.savefig(temp_path, format='png', bbox_inches='tight', dpi=dpi, 
-                   facecolor='white', edgecolor='none', pad_inches=0.1)
+        image_stream = io.BytesIO()
+        fig.savefig(image_stream, format='png', bbox_inches='tight', dpi=dpi, 
+                   facecolor='white', edgecolor='none', pad_inches=0.1,
+                   pil_kwargs={'compress_level': 1})
         
         # Explicitly close all matplotlib resources to prevent memory issues
         plt.close(fig)
         plt.close('all')  # Close any remaining figures
         
-        # Verify file was created and has content
-        if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-            logger.info(f"Figure saved successfully to: {temp_path} ({os.path.getsize(temp_path)} bytes)")
-            return temp_path
-        else:
-            raise ValueError("Figure file was not created or is empty")
+        if image_stream.getbuffer().nbytes == 0:
+            raise ValueError("Figure image is empty")
+        logger.info(f"Figure rendered successfully ({image_stream.getbuffer().nbytes} bytes)")
+        image_stream.seek(0)
+        return image_stream
         
     except Exception as e:
-        logger.error(f"Error saving figure to temp file: {e}")
+        logger.error(f"Error rendering figure to PNG: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
-        if temp_file:
-            temp_file.close()
         raise
 
-def add_picture_to_slide_safely(slide, image_path: str, left: float, top: float, width: float, height: float) -> bool:
+def add_picture_to_slide_safely(slide, image, left: float, top: float, width: float, height: float) -> bool:
     """
     Safely add a picture to a slide with comprehensive error handling.
+    `image` is either a file path or a file-like object holding the image bytes.
     """
     try:
-        logger.debug(f"Adding image to slide: {image_path}")
-        
-        # Validate file exists and has content
-        if not os.path.exists(image_path):
-            logger.error(f"Image file does not exist: {image_path}")
-            return False
+        if isinstance(image, str):
+            logger.debug(f"Adding image to slide: {image}")
+            
+            # Validate file exists and has content
+            if not os.path.exists(image):
+                logger.error(f"Image file does not exist: {image}")
+                return False
+            
+            file_size = os.path.getsize(image)
+        else:
+            image.seek(0)
+            file_size = image.getbuffer().nbytes
         
-        file_size = os.path.getsize(image_path)
         if file_size == 0:
-            logger.error(f"Image file is empty: {image_path}")
+            logger.error("Image is empty")
             return False
         
-        logger.debug(f"Image file size: {file_size} bytes")
+        logger.debug(f"Image size: {file_size} bytes")
         
         # Add picture to slide
-        slide.shapes.add_picture(image_path, Inches(left), Inches(top), width=Inches(width), height=Inches(height))
-        logger.info(f"Successfully added image to slide: {image_path}")
+        slide.shapes.add_picture(image, Inches(left), Inches(top), width=Inches(width), height=Inches(height))
+        logger.info("Successfully added image to slide")
         return True
         
     except Exception as e:
@@ -349,18 +362,6 @@ def add_picture_to_slide_safely(slide, image_path: str, left: float, top: float,
         logger.error(f"Traceback: {traceback.format_exc()}")
         return False
 
-def cleanup_temp_files(temp_files: List[str]):
-    """
-    Clean up temporary files with error handling.
-    """
-    for temp_file in temp_files:
-        try:
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
-                logger.debug(f"Cleaned up temp file: {temp_file}")
-        except Exception as e:
-            logger.error(f"Error cleaning up temp file {temp_file}: {e}")
-
 def add_formatted_table_to_slide(slide, table_data, left, top, width, height, header_color=None, avg_row_color=None):
     """
     Add a formatted table to a slide with proper styling.
@@ -383,46 +384,48 @@ def add_formatted_table_to_slide(slide, table_data, left, top, width, height, he
         for col_idx in range(cols):
             table.columns[col_idx].width = Inches(col_width)
         
-        # Populate table with data
+        # Populate table with data. Row styling is resolved once per row and each
+        # run's font is set in a single pass, rather than re-walking the paragraphs
+        # for the header and average-row overrides.
+        last_row = len(table_data) - 1
         for i, row_data in enumerate(table_data):
-            for j, cell_data in enumerate(row_data):
-                if j < cols:  # Safety check
-                    cell = table.cell(i, j)
-                    cell.text = str(cell_data)
-                    
-                    # Set vertical alignment
-                    cell.vertical_anchor = MSO_ANCHOR.MIDDLE
-                    
-                    # Format paragraphs
-                    for para in cell.text_frame.paragraphs:
-                        para.alignment = PP_ALIGN.CENTER
-                        for run in para.runs:
-                            run.font.size = Pt(11)
-                            run.font.name = 'Calibri'
-                    
-                    # Header row styling
-                    if i == 0:
-                        cell.fill.solid()
-                        header_color_rgb = header_color if header_color else RGBColor(68, 114, 196)
-                        cell.fill.fore_color.rgb = header_color_rgb
-                        for para in cell.text_frame.paragraphs:
-                            for run in para.runs:
-                                run.font.color.rgb = RGBColor(255, 255, 255)
-                                run.font.bold = True
-                                run.font.size = Pt(12)
-                    
-                    # Average row styling (if exists and avg_row_color provided)
-                    # Check if this is the last row and contains "Average" or "AVERAGE" in the first cell
-                    elif avg_row_color and i == len(table_data) - 1:
-                        # Check first cell of the row for average indicators
-                        first_cell_text = str(table_data[i][0]).upper() if table_data[i] else ""
-                        if "AVERAGE" in first_cell_text or "PERFORMANCE" in first_cell_text:
-                            cell.fill.solid()
-                            cell.fill.fore_color.rgb = avg_row_color
-                            for para in cell.text_frame.paragraphs:
-                                for run in para.runs:
-                                    run.font.bold = True
-                                    run.font.size = Pt(11)
+            is_header = i == 0
+            # Average row: the last row whose first cell contains "Average" or "Performance"
+            first_cell_text = str(row_data[0]).upper() if row_data else ""
+            is_avg_row = bool(
+                not is_header and avg_row_color and i == last_row and
+                ("AVERAGE" in first_cell_text or "PERFORMANCE" in first_cell_text)
+            )
+            if is_header:
+                fill_rgb = header_color if header_color else _HEADER_FILL
+            elif is_avg_row:
+                fill_rgb = avg_row_color
+            else:
+                fill_rgb = None
+            font_size = _PT12 if is_header else _PT11
+            
+            for j, cell_data in enumerate(row_data[:cols]):  # Safety check on column count
+                cell = table.cell(i, j)
+                cell.text = str(cell_data)
+                
+                # Set vertical alignment
+                cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+                
+                # Format paragraphs
+                for para in cell.text_frame.paragraphs:
+                    para.alignment = PP_ALIGN.CENTER
+                    for run in para.runs:
+                        font = run.font
+                        font.size = font_size
+                        font.name = 'Calibri'
+                        if is_header:
+                            font.color.rgb = _WHITE
+                        if is_header or is_avg_row:
+                            font.bold = True
+                
+                if fill_rgb is not None:
+                    cell.fill.solid()
+                    cell.fill.fore_color.rgb = fill_rgb
         
         return table
     except Exception as e:
@@ -508,7 +511,7 @@ def add_formulation_table_to_slide(slide, formulation_data, left, top, width, he
         # Add table
         table = add_formatted_table_to_slide(
             slide, table_data, left, top, width, table_height,
-            header_color=RGBColor(68, 114, 196)
+            header_color=_HEADER_FILL
         )
         
         logger.info(f"Formulation table added with {rows} rows (including header)")
@@ -583,8 +586,6 @@ def export_powerpoint(
     Enhanced PowerPoint export with a highly dense, professional layout matching the Example Slide.
     All data is neatly aggregated onto a single unified status slide.
     """
-    temp_files = []
-    
     try:
         logger.info("=== Starting PowerPoint Export (Single Slide Dense Layout) ===")
         if not dfs:
@@ -643,7 +644,7 @@ def export_powerpoint(
         try:
             from pptx.enum.shapes import MSO_CONNECTOR
             line = slide.shapes.add_connector(MSO_CONNECTOR.STRAIGHT, Inches(5.0), Inches(1.2), Inches(5.0), Inches(7.0))
-            line.line.color.rgb = RGBColor(0, 0, 0)
+            line.line.color.rgb = _BLACK
             line.line.width = Pt(1.5)
         except ImportError:
             pass
@@ -785,9 +786,8 @@ def export_powerpoint(
                     )
                     
                 if fig is not None:
-                    img_path = save_figure_to_temp_file(fig)
-                    temp_files.append(img_path)
-                    add_picture_to_slide_safely(slide, img_path, right_col_x, plot_y, 4.6, 3.2)
+                    img_stream = save_figure_to_png_stream(fig, dpi=dpi_for_slide_width(fig, 4.6))
+                    add_picture_to_slide_safely(slide, img_stream, right_col_x, plot_y, 4.6, 3.2)
             except Exception as e:
                 logger.error(f"Error generating plot for slide: {e}")
                 
@@ -821,21 +821,22 @@ def export_powerpoint(
         table = add_formatted_table_to_slide(
             slide, table_data, 
             left=right_col_x, top=table_y, width=4.6, height=2.2,
-            header_color=RGBColor(38, 77, 107)  # Dark teal from example
+            header_color=_SLIDE_TABLE_HEADER_FILL
         )
         
         # Style table to match example
         if table:
             for row_idx, row in enumerate(table.rows):
+                font_size = _PT10 if row_idx > 0 else _PT11
+                # Light gray alternating rows
+                striped = row_idx > 0 and row_idx % 2 == 1
                 for col_idx, cell in enumerate(row.cells):
                     for paragraph in cell.text_frame.paragraphs:
                         paragraph.font.name = 'Times New Roman'
-                        paragraph.font.size = Pt(10) if row_idx > 0 else Pt(11)
-                        if row_idx > 0:
-                            # Light gray alternating rows
-                            if row_idx % 2 == 1:
-                                cell.fill.solid()
-                                cell.fill.fore_color.rgb = RGBColor(240, 240, 240)
+                        paragraph.font.size = font_size
+                    if striped:
+                        cell.fill.solid()
+                        cell.fill.fore_color.rgb = _STRIPE_FILL
                                 
         if existing_prs is None:
             if not validate_powerpoint_structure(prs):
@@ -859,8 +860,59 @@ def export_powerpoint(
         logger.error(f"Error: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise
-    finally:
-        cleanup_temp_files(temp_files)
+
+# Same header styling pandas applies in ExcelWriter
+_EXCEL_HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+# Rows converted to Python objects at a time when streaming a sheet
+EXCEL_ROW_CHUNK = 5000
+# Column headers of the Excel Summary sheet
+EXCEL_SUMMARY_HEADERS = ("Cell", "1st Cycle Discharge Capacity (mAh/g)", "First Cycle Efficiency (%)", "Cycle Life (80%)", "Reversible Capacity (mAh/g)", "Coulombic Efficiency (%)")
+# (value key, formatted key, format spec, suffix) from get_cell_metrics for each metric column
+EXCEL_SUMMARY_METRICS = (
+    ('max_qdis', 'qdis_str', '.1f', ''),
+    ('eff_pct', 'eff_str', '.1f', '%'),
+    ('cycle_life', 'cycle_life_str', '.0f', ''),
+    ('reversible_capacity', 'reversible_str', '.1f', ''),
+    ('coulombic_eff', 'coulombic_str', '.1f', '%'),
+)
+
+# Excel limits sheet names to 31 characters and compares them case-insensitively
+EXCEL_SHEET_NAME_MAX = 31
+
+def _unique_sheet_names(cell_names: List[str], reserved: Tuple[str, ...] = ('Summary',)) -> List[str]:
+    """
+    Sheet name for each cell: over-long names fall back to Cell_<n>, and repeats
+    (including the reserved sheets) get a _2, _3, ... suffix within the length limit.
+    """
+    taken = {name.lower() for name in reserved}
+    sheet_names = []
+    for i, cell_name in enumerate(cell_names):
+        base = f'Cell_{i+1}' if len(cell_name) > EXCEL_SHEET_NAME_MAX else cell_name
+        name, n = base, 1
+        while name.lower() in taken:
+            n += 1
+            suffix = f'_{n}'
+            name = base[:EXCEL_SHEET_NAME_MAX - len(suffix)] + suffix
+        taken.add(name.lower())
+        sheet_names.append(name)
+    return sheet_names
+
+def write_frame_to_sheet(workbook, sheet_name: str, df: pd.DataFrame, header_format) -> None:
+    """
+    Stream a DataFrame into a new worksheet row by row, so a constant_memory
+    workbook can flush each row as soon as it is written.
+    """
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+    
+    # Convert one slice at a time so only EXCEL_ROW_CHUNK rows are ever boxed as objects.
+    # Missing values become blank cells and infinities become text, as pandas writes them
+    for start in range(0, len(df), EXCEL_ROW_CHUNK):
+        body = df.iloc[start:start + EXCEL_ROW_CHUNK]
+        body = body.replace([np.inf, -np.inf], ['inf', '-inf']).astype(object)
+        body = body.where(body.notna(), None)
+        for row_idx, row in enumerate(body.itertuples(index=False, name=None), start=start + 1):
+            worksheet.write_row(row_idx, 0, row)
 
 def export_excel(dfs: List[Dict[str, Any]], show_averages: bool, experiment_name: str) -> Tuple[io.BytesIO, str]:
     """
@@ -872,71 +924,42 @@ def export_excel(dfs: List[Dict[str, Any]], show_averages: bool, experiment_name
         # Create Excel workbook
         output = io.BytesIO()
         
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Summary sheet
+        # constant_memory flushes each row to disk once written, so peak memory
+        # stays flat however many cycles the cells have
+        with xlsxwriter.Workbook(output, {'constant_memory': True}) as workbook:
+            header_format = workbook.add_format(_EXCEL_HEADER_FORMAT)
+            
+            # Summary sheet body rows (headers are EXCEL_SUMMARY_HEADERS)
             summary_data = []
-            headers = ["Cell", "1st Cycle Discharge Capacity (mAh/g)", "First Cycle Efficiency (%)", "Cycle Life (80%)", "Reversible Capacity (mAh/g)", "Coulombic Efficiency (%)"]
-            summary_data.append(headers)
             
-            for i, d in enumerate(dfs):
-                df_cell = d['df']
-                cell_name = d.get('testnum', f'Cell {i+1}') or f'Cell {i+1}'
-                
-                # Calculate metrics using the same logic as the app
-                metrics = get_cell_metrics(df_cell, 4)  # Default formation cycles
-                
-                summary_data.append([
-                    cell_name, 
-                    metrics['qdis_str'], 
-                    metrics['eff_str'], 
-                    metrics['cycle_life_str'],
-                    metrics['reversible_str'],
-                    metrics['coulombic_str']
-                ])
-            
-            # Always add Average Performance row when there are multiple cells
+            # Calculate metrics once per cell using the same logic as the app;
+            # the per-cell rows and the average row both read from this list
+            cell_metrics = [get_cell_metrics(d['df'], 4) for d in dfs]  # Default formation cycles
+            # Cell names are shared by the summary rows and the per-cell sheet names
+            cell_names = [d.get('testnum', f'Cell {i+1}') or f'Cell {i+1}' for i, d in enumerate(dfs)]
+            
+            for cell_name, metrics in zip(cell_names, cell_metrics):
+                summary_data.append([cell_name] + [metrics[str_key] for _, str_key, _, _ in EXCEL_SUMMARY_METRICS])
+            
+            # Always add Average Performance row when there are multiple cells,
+            # averaging the same per-cell metrics the rows above were formatted from
             if len(dfs) > 1:
-                # Calculate averages
-                avg_metrics = {
-                    'max_qdis': [], 'eff_pct': [], 'cycle_life': [],
-                    'reversible_capacity': [], 'coulombic_eff': []
-                }
-                
-                for d in dfs:
-                    df_cell = d['df']
-                    metrics = get_cell_metrics(df_cell, 4)
-                    
-                    if metrics['max_qdis'] is not None:
-                        avg_metrics['max_qdis'].append(metrics['max_qdis'])
-                    if metrics['eff_pct'] is not None:
-                        avg_metrics['eff_pct'].append(metrics['eff_pct'])
-                    if metrics['cycle_life'] is not None:
-                        avg_metrics['cycle_life'].append(metrics['cycle_life'])
-                    if metrics['reversible_capacity'] is not None:
-                        avg_metrics['reversible_capacity'].append(metrics['reversible_capacity'])
-                    if metrics['coulombic_eff'] is not None:
-                        avg_metrics['coulombic_eff'].append(metrics['coulombic_eff'])
-                
-                # Calculate final averages
                 avg_row = ["Average Performance"]
-                avg_row.append(f"{np.mean(avg_metrics['max_qdis']):.1f}" if avg_metrics['max_qdis'] else "N/A")
-                avg_row.append(f"{np.mean(avg_metrics['eff_pct']):.1f}%" if avg_metrics['eff_pct'] else "N/A")
-                avg_row.append(f"{np.mean(avg_metrics['cycle_life']):.0f}" if avg_metrics['cycle_life'] else "N/A")
-                avg_row.append(f"{np.mean(avg_metrics['reversible_capacity']):.1f}" if avg_metrics['reversible_capacity'] else "N/A")
-                avg_row.append(f"{np.mean(avg_metrics['coulombic_eff']):.1f}%" if avg_metrics['coulombic_eff'] else "N/A")
+                for value_key, _, spec, suffix in EXCEL_SUMMARY_METRICS:
+                    values = [m[value_key] for m in cell_metrics if m[value_key] is not None]
+                    avg_row.append(_fmt(np.mean(values) if values else None, spec, suffix))
                 
                 summary_data.append(avg_row)
             
-            # Create summary DataFrame
-            summary_df = pd.DataFrame(summary_data[1:], columns=summary_data[0])
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
+            # Summary rows are already plain lists, so write them straight out
+            summary_ws = workbook.add_worksheet('Summary')
+            summary_ws.write_row(0, 0, EXCEL_SUMMARY_HEADERS, header_format)
+            for row_idx, row in enumerate(summary_data, start=1):
+                summary_ws.write_row(row_idx, 0, row)
             
             # Data sheets for each cell
-            for i, d in enumerate(dfs):
-                df = d['df']
-                cell_name = d.get('testnum', f'Cell {i+1}') or f'Cell {i+1}'
-                sheet_name = f'Cell_{i+1}' if len(cell_name) > 31 else cell_name
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+            for d, sheet_name in zip(dfs, _unique_sheet_names(cell_names)):
+                write_frame_to_sheet(workbook, sheet_name, d['df'], header_format)
         
         output.seek(0)
         
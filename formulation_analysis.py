@@ -258,17 +258,18 @@ def create_formulation_comparison_dataframe(experiments_data: List[Tuple], compo
                                     
                                     # Get first discharge capacity (max of first 3 cycles)
                                     if 'Q Dis (mAh/g)' in df.columns:
-                                        first_three = df['Q Dis (mAh/g)'].head(3).tolist()
+                                        qdis_arr = df['Q Dis (mAh/g)'].to_numpy()
+                                        first_three = qdis_arr[:3].tolist()
                                         if first_three:
                                             first_discharges.append(max(first_three))
                                         
                                         # Get first post-formation cycle (reversible capacity)
                                         if len(df) > formation_cycles:
-                                            capacities.append(df['Q Dis (mAh/g)'].iloc[formation_cycles])
+                                            capacities.append(qdis_arr[formation_cycles])
                                     
                                     # Get first cycle efficiency
                                     if 'Efficiency (-)' in df.columns and len(df) > 0:
-                                        first_eff = df['Efficiency (-)'].iloc[0]
+                                        first_eff = df['Efficiency (-)'].to_numpy()[0]
                                         if first_eff is not None:
                                             try:
                                                 first_efficiencies.append(float(first_eff) * 100)
@@ -279,7 +280,7 @@ def create_formulation_comparison_dataframe(experiments_data: List[Tuple], compo
                                     if 'Q Dis (mAh/g)' in df.columns and len(df) > formation_cycles:
                                         post_formation = df.iloc[formation_cycles:]
                                         if not post_formation.empty:
-                                            initial_capacity = post_formation['Q Dis (mAh/g)'].iloc[0]
+                                            initial_capacity = qdis_arr[formation_cycles]
                                             if initial_capacity > 0:
                                                 threshold = 0.8 * initial_capacity
                                                 below_threshold = post_formation[post_formation['Q Dis (mAh/g)'] < threshold]
@@ -311,17 +312,18 @@ def create_formulation_comparison_dataframe(experiments_data: List[Tuple], compo
                             
                             if 'Q Dis (mAh/g)' in df.columns:
                                 # First discharge (max of first 3)
-                                first_three = df['Q Dis (mAh/g)'].head(3).tolist()
+                                qdis_arr = df['Q Dis (mAh/g)'].to_numpy()
+                                first_three = qdis_arr[:3].tolist()
                                 if first_three:
                                     first_discharge = max(first_three)
                                 
                                 # Reversible capacity
                                 if len(df) > formation_cycles:
-                                    reversible_capacity = df['Q Dis (mAh/g)'].iloc[formation_cycles]
+                                    reversible_capacity = qdis_arr[formation_cycles]
                             
                             # First cycle efficiency
                             if 'Efficiency (-)' in df.columns and len(df) > 0:
-                                first_eff = df['Efficiency (-)'].iloc[0]
+                                first_eff = df['Efficiency (-)'].to_numpy()[0]
                                 if first_eff is not None:
                                     try:
                                         first_efficiency = float(first_eff) * 100
@@ -332,7 +334,7 @@ def create_formulation_comparison_dataframe(experiments_data: List[Tuple], compo
                             if 'Q Dis (mAh/g)' in df.columns and len(df) > formation_cycles:
                                 post_formation = df.iloc[formation_cycles:]
                                 if not post_formation.empty:
-                                    initial_capacity = post_formation['Q Dis (mAh/g)'].iloc[0]
+                                    initial_capacity = qdis_arr[formation_cycles]
                                     if initial_capacity > 0:
                                         threshold = 0.8 * initial_capacity
                                         below_threshold = post_formation[post_formation['Q Dis (mAh/g)'] < threshold]
@@ -11,6 +11,8 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 
+from data_analysis import build_cycle_lookup, common_cycle_values
+
 
 REFERENCE_CYCLE_FALLBACK = 4
 REFERENCE_CAPACITY_UPPER_LIMIT = 450.0
@@ -227,8 +229,8 @@ def plot_interactive_capacity(
         group_names = ["Group A", "Group B", "Group C"]
     if custom_colors is None:
         custom_colors = {}
-    if excluded_from_average is None:
-        excluded_from_average = []
+    # Set membership for the per-cell exclusion checks below
+    excluded_from_average = set(excluded_from_average or ())
 
     dfs = _filter_dfs_by_cycle_range(dfs, cycle_filter)
         
@@ -471,10 +473,7 @@ def plot_interactive_capacity(
                 for idx, trimmed_df in enumerate(dfs_trimmed)
             ]
             x_col = dfs_trimmed[0].columns[0]
-            common_cycles = set(dfs_trimmed[0][x_col])
-            for df in dfs_trimmed[1:]:
-                common_cycles = common_cycles & set(df[x_col])
-            common_cycles = sorted(list(common_cycles))
+            common_cycles = common_cycle_values(dfs_trimmed, x_col)
             
             if common_cycles:
                 avg_qdis = []
@@ -483,6 +482,7 @@ def plot_interactive_capacity(
                 avg_ret_qdis = []
                 avg_ret_qchg = []
                 
+                cycle_lookups = [build_cycle_lookup(df, x_col) for df in dfs_trimmed]
                 for cycle in common_cycles:
                     qdis_vals = []
                     qchg_vals = []
@@ -490,12 +490,12 @@ def plot_interactive_capacity(
                     ret_qdis_vals = []
                     ret_qchg_vals = []
                     
-                    for df_idx, df in enumerate(dfs_trimmed):
-                        row = df[df[x_col] == cycle]
-                        if not row.empty:
+                    for df_idx, cycle_lookup in enumerate(cycle_lookups):
+                        row = cycle_lookup.get(cycle)
+                        if row is not None:
                             if 'Q Dis (mAh/g)' in row:
                                 try:
-                                    qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                                    qdis_val = float(row['Q Dis (mAh/g)'])
                                     qdis_vals.append(qdis_val)
                                     ref_capacity = qdis_ref_infos[df_idx].get('reference_capacity')
                                     if ref_capacity:
@@ -503,7 +503,7 @@ def plot_interactive_capacity(
                                 except Exception: pass
                             if 'Q Chg (mAh/g)' in row:
                                 try:
-                                    qchg_val = float(row['Q Chg (mAh/g)'].values[0])
+                                    qchg_val = float(row['Q Chg (mAh/g)'])
                                     qchg_vals.append(qchg_val)
                                     ref_capacity = qchg_ref_infos[df_idx].get('reference_capacity')
                                     if ref_capacity:
@@ -511,7 +511,7 @@ def plot_interactive_capacity(
                                 except Exception: pass
                             if 'Efficiency (-)' in row:
                                 try:
-                                    eff_vals.append(float(row['Efficiency (-)'].values[0]) * 100)
+                                    eff_vals.append(float(row['Efficiency (-)']) * 100)
                                 except Exception: pass
                     
                     avg_qdis.append(sum(qdis_vals)/len(qdis_vals) if qdis_vals else None)
@@ -737,8 +737,8 @@ def plot_interactive_comparison_capacity(
         custom_colors = {}
     if custom_names is None:
         custom_names = {}
-    if excluded_from_average is None:
-        excluded_from_average = []
+    # Set membership for the per-cell exclusion checks below
+    excluded_from_average = set(excluded_from_average or ())
         
     # Apply cycle filtering to all experiments
     # Local import is fine here or rely on the filter logic
@@ -917,23 +917,21 @@ def plot_interactive_comparison_capacity(
                     ]
                     exp_x_col = dfs_trimmed[0].columns[0] if not dfs_trimmed[0].empty else x_col
                 
-                common_cycles = set(dfs_trimmed[0][exp_x_col])
-                for df in dfs_trimmed[1:]:
-                    common_cycles = common_cycles & set(df[exp_x_col])
-                common_cycles = sorted(list(common_cycles))
+                common_cycles = common_cycle_values(dfs_trimmed, exp_x_col)
                 
                 if common_cycles:
                     avg_qdis, avg_qchg, avg_eff = [], [], []
                     avg_ret_qdis, avg_ret_qchg = [], []
+                    cycle_lookups = [build_cycle_lookup(df, exp_x_col) for df in dfs_trimmed]
                     for cycle in common_cycles:
                         qdis_vals, qchg_vals, eff_vals = [], [], []
                         ret_qdis_vals, ret_qchg_vals = [], []
-                        for df_idx, df in enumerate(dfs_trimmed):
-                            row = df[df[exp_x_col] == cycle]
-                            if not row.empty:
+                        for df_idx, cycle_lookup in enumerate(cycle_lookups):
+                            row = cycle_lookup.get(cycle)
+                            if row is not None:
                                 if 'Q Dis (mAh/g)' in row:
                                     try:
-                                        qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                                        qdis_val = float(row['Q Dis (mAh/g)'])
                                         qdis_vals.append(qdis_val)
                                         ref_capacity = qdis_ref_infos[df_idx].get('reference_capacity')
                                         if ref_capacity:
@@ -941,14 +939,14 @@ def plot_interactive_comparison_capacity(
                                     except: pass
                                 if 'Q Chg (mAh/g)' in row:
                                     try:
-                                        qchg_val = float(row['Q Chg (mAh/g)'].values[0])
+                                        qchg_val = float(row['Q Chg (mAh/g)'])
                                         qchg_vals.append(qchg_val)
                                         ref_capacity = qchg_ref_infos[df_idx].get('reference_capacity')
                                         if ref_capacity:
                                             ret_qchg_vals.append((qchg_val / ref_capacity) * 100.0)
                                     except: pass
-                                if 'Efficiency (-)' in row and pd.notnull(row['Efficiency (-)'].values[0]):
-                                    try: eff_vals.append(float(row['Efficiency (-)'].values[0]) * 100)
+                                if 'Efficiency (-)' in row and pd.notnull(row['Efficiency (-)']):
+                                    try: eff_vals.append(float(row['Efficiency (-)']) * 100)
                                     except: pass
                         
                         avg_qdis.append(sum(qdis_vals)/len(qdis_vals) if qdis_vals else None)
@@ -63,16 +63,20 @@ def extract_curve_characteristics(df: pd.DataFrame, formation_cycles: int = 4) -
     # Stability (coefficient of variation)
     stability = (post_formation.std() / post_formation.mean() * 100) if post_formation.mean() > 0 else None
     
-    # Check for sudden drops (failure indicators)
-    capacity_drops = []
-    for i in range(1, len(post_formation)):
-        if post_formation.iloc[i-1] > 0:
-            drop_pct = ((post_formation.iloc[i-1] - post_formation.iloc[i]) / post_formation.iloc[i-1]) * 100
-            if drop_pct > 5:  # >5% drop in one cycle
-                capacity_drops.append({
-                    'cycle': int(post_formation_cycles.iloc[i]) if i < len(post_formation_cycles) else None,
-                    'drop_pct': round(drop_pct, 2)
-                })
+    # Check for sudden drops (failure indicators), comparing each cycle with the previous one
+    q = post_formation.to_numpy(dtype=float)
+    prev_q = q[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop_pcts = (prev_q - q[1:]) / prev_q * 100
+    drop_positions = np.flatnonzero((prev_q > 0) & (drop_pcts > 5)) + 1  # >5% drop in one cycle
+    cycle_values = post_formation_cycles.to_numpy()
+    capacity_drops = [
+        {
+            'cycle': int(cycle_values[i]) if i < cycle_values.size else None,
+            'drop_pct': round(float(drop_pcts[i - 1]), 2)
+        }
+        for i in drop_positions
+    ]
     
     # Formation behavior
     formation_data = qdis.iloc[:formation_cycles] if len(qdis) >= formation_cycles else qdis
@@ -170,9 +174,8 @@ def generate_capacity_plot_image(experiment_data: Dict[str, Any], project_type:
         
         # Save to base64
         buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
+        fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', pil_kwargs={'compress_level': 1})
+        img_base64 = base64.b64encode(buf.getbuffer()).decode('utf-8')
         plt.close(fig)
         
         return img_base64
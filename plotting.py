@@ -3,6 +3,14 @@ import matplotlib.pyplot as plt
 import pandas as pd
 from typing import List, Dict, Any, Optional, Tuple
 from matplotlib.figure import Figure
+from data_analysis import build_cycle_lookup, common_cycle_values
+
+def _reset_figure_axes(fig: Optional[Figure]):
+    """Return (fig, ax) on a fresh figure, or on `fig` after clearing it for reuse."""
+    if fig is None:
+        return plt.subplots()
+    fig.clf()
+    return fig, fig.add_subplot(111)
 
 def plot_capacity_graph(
     dfs: List[Dict[str, Any]],
@@ -28,17 +36,18 @@ def plot_capacity_graph(
     cycle_filter: str = "1-*",
     custom_colors: Optional[Dict[str, str]] = None,
     y_axis_limits: Optional[tuple] = None,
-    excluded_from_average: Optional[List[str]] = None
+    excluded_from_average: Optional[List[str]] = None,
+    fig: Optional[Figure] = None
 ) -> Figure:
-    """Plot the main capacity/efficiency graph and return the matplotlib figure. If remove_markers is True, lines will have no markers. If hide_legend is True, the legend will not be shown. Optionally plot group average curves for Group A, B, and C."""
+    """Plot the main capacity/efficiency graph and return the matplotlib figure. If remove_markers is True, lines will have no markers. If hide_legend is True, the legend will not be shown. Optionally plot group average curves for Group A, B, and C. If fig is given, it is cleared and drawn into instead of allocating a new figure."""
     if avg_line_toggles is None:
         avg_line_toggles = {"Average Q Dis": True, "Average Q Chg": True, "Average Efficiency": True}
     if group_names is None:
         group_names = ["Group A", "Group B", "Group C"]
     if custom_colors is None:
         custom_colors = {}
-    if excluded_from_average is None:
-        excluded_from_average = []
+    # Set membership for the per-cell exclusion checks below
+    excluded_from_average = set(excluded_from_average or ())
         
     # Get matplotlib default color cycle
     default_colors_cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
@@ -72,7 +81,7 @@ def plot_capacity_graph(
     avg_marker_style = '' if remove_markers else 'D'
     eff_marker_style = '' if remove_markers else 's'
     if any_efficiency or avg_eff_on or any_group_eff:
-        fig, ax1 = plt.subplots()
+        fig, ax1 = _reset_figure_axes(fig)
         ax2 = ax1.twinx()
         for i, d in enumerate(dfs):
             try:
@@ -141,38 +150,36 @@ def plot_capacity_graph(
             if len(included_dfs) > 0:
                 # Find common cycles
                 dfs_trimmed = [d['df'][:-1] if remove_last_cycle else d['df'] for d in included_dfs]
-                common_cycles = set(dfs_trimmed[0][x_col])
-                for df in dfs_trimmed[1:]:
-                    common_cycles = common_cycles & set(df[x_col])
-                common_cycles = sorted(list(common_cycles))
+                common_cycles = common_cycle_values(dfs_trimmed, x_col)
                 if common_cycles:
                     avg_qdis = []
                     avg_qchg = []
                     avg_eff = []
+                cycle_lookups = [build_cycle_lookup(df, x_col) for df in dfs_trimmed]
                 for cycle in common_cycles:
                     qdis_vals = []
                     qchg_vals = []
                     eff_vals = []
-                    for df in dfs_trimmed:
-                        row = df[df[x_col] == cycle]
-                        if not row.empty:
+                    for cycle_lookup in cycle_lookups:
+                        row = cycle_lookup.get(cycle)
+                        if row is not None:
                             if 'Q Dis (mAh/g)' in row:
                                 try:
-                                    qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                                    qdis_val = float(row['Q Dis (mAh/g)'])
                                     qdis_vals.append(qdis_val)
                                 except (ValueError, TypeError):
                                     # Skip non-numeric discharge capacity values
                                     pass
                             if 'Q Chg (mAh/g)' in row:
                                 try:
-                                    qchg_val = float(row['Q Chg (mAh/g)'].values[0])
+                                    qchg_val = float(row['Q Chg (mAh/g)'])
                                     qchg_vals.append(qchg_val)
                                 except (ValueError, TypeError):
                                     # Skip non-numeric charge capacity values
                                     pass
-                            if 'Efficiency (-)' in row and not pd.isnull(row['Efficiency (-)'].values[0]):
+                            if 'Efficiency (-)' in row and not pd.isnull(row['Efficiency (-)']):
                                 try:
-                                    eff_val = float(row['Efficiency (-)'].values[0]) * 100
+                                    eff_val = float(row['Efficiency (-)']) * 100
                                     eff_vals.append(eff_val)
                                 except (ValueError, TypeError):
                                     # Skip non-numeric efficiency values
@@ -263,7 +270,7 @@ def plot_capacity_graph(
         
         return fig
     else:
-        fig, ax = plt.subplots()
+        fig, ax = _reset_figure_axes(fig)
         for i, d in enumerate(dfs):
             try:
                 cell_name = d['testnum'] if d['testnum'] else f'Cell {i+1}'
@@ -298,29 +305,27 @@ def plot_capacity_graph(
         # Plot average if requested
         if show_average_performance and len(dfs) > 1:
             dfs_trimmed = [d['df'][:-1] if remove_last_cycle else d['df'] for d in dfs]
-            common_cycles = set(dfs_trimmed[0][x_col])
-            for df in dfs_trimmed[1:]:
-                common_cycles = common_cycles & set(df[x_col])
-            common_cycles = sorted(list(common_cycles))
+            common_cycles = common_cycle_values(dfs_trimmed, x_col)
             if common_cycles:
                 avg_qdis = []
                 avg_qchg = []
+                cycle_lookups = [build_cycle_lookup(df, x_col) for df in dfs_trimmed]
                 for cycle in common_cycles:
                     qdis_vals = []
                     qchg_vals = []
-                    for df in dfs_trimmed:
-                        row = df[df[x_col] == cycle]
-                        if not row.empty:
+                    for cycle_lookup in cycle_lookups:
+                        row = cycle_lookup.get(cycle)
+                        if row is not None:
                             if 'Q Dis (mAh/g)' in row:
                                 try:
-                                    qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                                    qdis_val = float(row['Q Dis (mAh/g)'])
                                     qdis_vals.append(qdis_val)
                                 except (ValueError, TypeError):
                                     # Skip non-numeric discharge capacity values
                                     pass
                             if 'Q Chg (mAh/g)' in row:
                                 try:
-                                    qchg_val = float(row['Q Chg (mAh/g)'].values[0])
+                                    qchg_val = float(row['Q Chg (mAh/g)'])
                                     qchg_vals.append(qchg_val)
                                 except (ValueError, TypeError):
                                     # Skip non-numeric charge capacity values
@@ -504,10 +509,7 @@ def plot_capacity_retention_graph(
     # Plot average retention if requested
     if show_average_performance and len(dfs) > 1:
         dfs_trimmed = [d['df'][:-1] if remove_last_cycle else d['df'] for d in dfs]
-        common_cycles = set(dfs_trimmed[0][x_col])
-        for df in dfs_trimmed[1:]:
-            common_cycles = common_cycles & set(df[x_col])
-        common_cycles = sorted(list(common_cycles))
+        common_cycles = common_cycle_values(dfs_trimmed, x_col)
         
         if common_cycles and reference_cycle in common_cycles:
             # Calculate reference capacities for each cell
@@ -535,23 +537,24 @@ def plot_capacity_retention_graph(
             avg_retention_qdis = []
             avg_retention_qchg = []
             
+            cycle_lookups = [build_cycle_lookup(df, x_col) for df in dfs_trimmed]
             for cycle in common_cycles:
                 retention_qdis_vals = []
                 retention_qchg_vals = []
                 
-                for i, df in enumerate(dfs_trimmed):
-                    row = df[df[x_col] == cycle]
-                    if not row.empty and ref_qdis_vals[i] is not None and ref_qdis_vals[i] > 0:
+                for i, cycle_lookup in enumerate(cycle_lookups):
+                    row = cycle_lookup.get(cycle)
+                    if row is not None and ref_qdis_vals[i] is not None and ref_qdis_vals[i] > 0:
                         try:
-                            qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                            qdis_val = float(row['Q Dis (mAh/g)'])
                             retention = (qdis_val / ref_qdis_vals[i]) * 100
                             retention_qdis_vals.append(retention)
                         except (ValueError, TypeError):
                             pass
                     
-                    if not row.empty and ref_qchg_vals[i] is not None and ref_qchg_vals[i] > 0:
+                    if row is not None and ref_qchg_vals[i] is not None and ref_qchg_vals[i] > 0:
                         try:
-                            qchg_val = float(row['Q Chg (mAh/g)'].values[0])
+                            qchg_val = float(row['Q Chg (mAh/g)'])
                             retention = (qchg_val / ref_qchg_vals[i]) * 100
                             retention_qchg_vals.append(retention)
                         except (ValueError, TypeError):
@@ -769,21 +772,19 @@ def plot_combined_capacity_retention_graph(
     # Plot average capacity if requested
     if show_average_performance and len(dfs) > 1:
         dfs_trimmed = [d['df'][:-1] if remove_last_cycle else d['df'] for d in dfs]
-        common_cycles = set(dfs_trimmed[0][x_col])
-        for df in dfs_trimmed[1:]:
-            common_cycles = common_cycles & set(df[x_col])
-        common_cycles = sorted(list(common_cycles))
+        common_cycles = common_cycle_values(dfs_trimmed, x_col)
         
         if common_cycles:
             avg_qdis = []
+            cycle_lookups = [build_cycle_lookup(df, x_col) for df in dfs_trimmed]
             for cycle in common_cycles:
                 qdis_vals = []
-                for df in dfs_trimmed:
-                    row = df[df[x_col] == cycle]
-                    if not row.empty:
+                for cycle_lookup in cycle_lookups:
+                    row = cycle_lookup.get(cycle)
+                    if row is not None:
                         if 'Q Dis (mAh/g)' in row:
                             try:
-                                qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                                qdis_val = float(row['Q Dis (mAh/g)'])
                                 qdis_vals.append(qdis_val)
                             except (ValueError, TypeError):
                                 pass
@@ -915,8 +916,8 @@ def plot_comparison_capacity_graph(
     if custom_names is None:
         custom_names = {}
     
-    if excluded_from_average is None:
-        excluded_from_average = []
+    # Set membership for the per-cell exclusion checks below
+    excluded_from_average = set(excluded_from_average or ())
         
     # Apply cycle filtering to all experiments
     from ui_components import parse_cycle_filter
@@ -1058,28 +1059,26 @@ def plot_comparison_capacity_graph(
                     exp_x_col = dfs_trimmed[0].columns[0] if not dfs_trimmed[0].empty else x_col
                 
                 # Find common cycles across all cells in this experiment
-                common_cycles = set(dfs_trimmed[0][exp_x_col])
-                for df in dfs_trimmed[1:]:
-                    common_cycles = common_cycles & set(df[exp_x_col])
-                common_cycles = sorted(list(common_cycles))
+                common_cycles = common_cycle_values(dfs_trimmed, exp_x_col)
                 
                 if common_cycles:
                     avg_qdis = []
                     avg_qchg = []
                     avg_eff = []
                     
+                    cycle_lookups = [build_cycle_lookup(df, exp_x_col) for df in dfs_trimmed]
                     for cycle in common_cycles:
                         qdis_vals = []
                         qchg_vals = []
                         eff_vals = []
                         
-                        for df in dfs_trimmed:
-                            row = df[df[exp_x_col] == cycle]
-                            if not row.empty:
+                        for cycle_lookup in cycle_lookups:
+                            row = cycle_lookup.get(cycle)
+                            if row is not None:
                                 # Discharge capacity
                                 if 'Q Dis (mAh/g)' in row:
                                     try:
-                                        qdis_val = float(row['Q Dis (mAh/g)'].values[0])
+                                        qdis_val = float(row['Q Dis (mAh/g)'])
                                         qdis_vals.append(qdis_val)
                                     except (ValueError, TypeError):
                                         pass
@@ -1087,15 +1086,15 @@ def plot_comparison_capacity_graph(
                                 # Charge capacity
                                 if 'Q Chg (mAh/g)' in row:
                                     try:
-                                        qchg_val = float(row['Q Chg (mAh/g)'].values[0])
+                                        qchg_val = float(row['Q Chg (mAh/g)'])
                                         qchg_vals.append(qchg_val)
                                     except (ValueError, TypeError):
                                         pass
                                 
                                 # Efficiency
-                                if 'Efficiency (-)' in row and not pd.isnull(row['Efficiency (-)'].values[0]):
+                                if 'Efficiency (-)' in row and not pd.isnull(row['Efficiency (-)']):
                                     try:
-                                        eff_val = float(row['Efficiency (-)'].values[0]) * 100
+                                        eff_val = float(row['Efficiency (-)']) * 100
                                         eff_vals.append(eff_val)
                                     except (ValueError, TypeError):
                                         pass
@@ -0,0 +1,32 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from plotting import plot_capacity_graph
+
+
+def _cell(name):
+    df = pd.DataFrame({
+        'Cycle': [1, 2, 3],
+        'Q Dis (mAh/g)': [200.0, 195.0, 190.0],
+        'Q Chg (mAh/g)': [210.0, 198.0, 192.0],
+        'Efficiency (-)': [0.95, 0.98, 0.99],
+    })
+    return {'df': df, 'testnum': name}
+
+
+def test_plot_capacity_graph_redraws_into_supplied_figure():
+    fig = Figure()
+    dfs = [_cell('A'), _cell('B')]
+    show_lines = {'A Q Dis': True, 'B Q Dis': True}
+
+    first = plot_capacity_graph(dfs, show_lines, {'A Efficiency': True}, False, True, 'Exp', fig=fig)
+    assert first is fig
+    assert len(fig.axes) == 2  # capacity axis plus efficiency twin
+
+    second = plot_capacity_graph(dfs, show_lines, {}, False, True, 'Exp', fig=fig)
+    assert second is fig
+    assert len(fig.axes) == 1
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cell_flags import (
+    CellFlag,
+    FlagAccumulator,
+    FlagCategory,
+    FlagSeverity,
+    analyze_cell_for_flags,
+    calculate_fade_rate,
+    detect_data_inconsistency,
+    format_flags_for_display,
+    get_flag_summary_stats,
+)
+
+
+def test_fade_rate_matches_least_squares_fit():
+    capacity = np.array([200.0, 198.5, 197.9, 195.2, 194.8, 192.0, 191.1])
+
+    expected = abs(np.polyfit(np.arange(len(capacity)), capacity, 1)[0] / capacity[0]) * 100
+
+    assert calculate_fade_rate(capacity) == pytest.approx(expected)
+    assert calculate_fade_rate(pd.Series(capacity)) == pytest.approx(expected)
+
+
+def test_fade_rate_needs_two_points_and_positive_start():
+    assert calculate_fade_rate([200.0]) is None
+    assert calculate_fade_rate([0.0, -1.0, -2.0]) is None
+
+
+def test_data_inconsistency_counts_negative_and_zero_capacities():
+    df = pd.DataFrame({
+        'Cycle': range(1, 11),
+        'Q Dis (mAh/g)': [200.0, -1.0, 0.0, 0.0, np.nan, 190.0, -3.0, 188.0, 187.0, 186.0],
+    })
+
+    flag = detect_data_inconsistency(df)
+
+    assert flag is not None
+    assert flag.description == (
+        "Data inconsistencies detected: 2 negative discharge capacity values, 2 zero capacity values"
+    )
+
+
+def test_flag_summary_stats_counts_by_severity_type_and_category():
+    df_bad = pd.DataFrame({
+        'Cycle': range(1, 11),
+        'Q Dis (mAh/g)': [200.0, -1.0, 0.0, 0.0, np.nan, 190.0, -3.0, 188.0, 187.0, 186.0],
+        'Efficiency (-)': [0.85, 0.99, 0.99, 0.99, 1.08, 0.99, 0.99, 0.99, 0.99, 0.99],
+    })
+    all_flags = {'A': analyze_cell_for_flags(df_bad, {}), 'B': []}
+
+    stats = get_flag_summary_stats(all_flags)
+
+    assert stats['total_flags'] == len(all_flags['A'])
+    assert stats['critical_count'] + stats['warning_count'] + stats['info_count'] == stats['total_flags']
+    assert stats['flag_type_counts']['Impossible Efficiency'] == 1
+    assert stats['flag_type_counts']['Data Inconsistency'] == 1
+    assert stats['category_counts']['Electrochemistry'] == 1
+    assert stats['cells_with_flags'] == 1
+
+
+def test_flag_accumulator_matches_rescan_after_reassignment():
+    def flag(severity, flag_type):
+        return CellFlag('id', flag_type, severity, FlagCategory.PERFORMANCE, '', 1.0, 'algo')
+
+    accumulator = FlagAccumulator()
+    accumulator['A'] = [flag(FlagSeverity.CRITICAL, 'Cell Failure')]
+    accumulator['B'] = []
+    accumulator.add('B', flag(FlagSeverity.INFO, 'Missing Data'))
+    accumulator.add('B', flag(FlagSeverity.WARNING, 'Missing Data'))
+    accumulator['A'] = [flag(FlagSeverity.WARNING, 'Rapid Capacity Fade')]
+    accumulator['C'] = []
+
+    stats = get_flag_summary_stats(accumulator)
+
+    assert stats == get_flag_summary_stats(dict(accumulator))
+    assert stats['critical_count'] == 0
+    assert stats['flag_type_counts'] == {'Missing Data': 2, 'Rapid Capacity Fade': 1}
+    assert stats['cells_with_flags'] == 2
+
+
+def test_flag_accumulator_counts_follow_every_dict_mutator():
+    def flag(severity, flag_type):
+        return CellFlag('id', flag_type, severity, FlagCategory.PERFORMANCE, '', 1.0, 'algo')
+
+    accumulator = FlagAccumulator()
+    accumulator.update({'A': [flag(FlagSeverity.CRITICAL, 'Cell Failure')], 'B': []}, C=[flag(FlagSeverity.INFO, 'Missing Data')])
+    accumulator |= {'D': [flag(FlagSeverity.WARNING, 'Missing Data')]}
+    accumulator.setdefault('B', [flag(FlagSeverity.INFO, 'Ignored')])
+    accumulator.setdefault('E', [flag(FlagSeverity.WARNING, 'Rapid Capacity Fade')])
+    assert accumulator.summary_stats() == get_flag_summary_stats(dict(accumulator))
+
+    del accumulator['A']
+    assert len(accumulator.pop('C')) == 1
+    assert accumulator.pop('missing', None) is None
+    accumulator.popitem()
+    assert accumulator.summary_stats() == get_flag_summary_stats(dict(accumulator))
+    assert accumulator.summary_stats()['cells_with_flags'] == 1
+
+    accumulator.clear()
+    assert accumulator.summary_stats() == get_flag_summary_stats({})
+
+
+def test_format_flags_for_display_orders_severity_counts():
+    def flag(severity):
+        return CellFlag('id', 'Type', severity, FlagCategory.PERFORMANCE, '', 1.0, 'algo')
+
+    flags = [flag(FlagSeverity.INFO), flag(FlagSeverity.CRITICAL), flag(FlagSeverity.INFO)]
+
+    assert format_flags_for_display(flags) == "🚨 1 ℹ️ 2"
+    assert format_flags_for_display([]) == ""
+
+
+def test_analyze_cell_for_flags_tolerates_non_numeric_inputs():
+    df = pd.DataFrame({
+        'Cycle': range(1, 31),
+        'Q Dis (mAh/g)': ['n/a'] * 30,
+        'Efficiency (-)': ['n/a'] * 30,
+    })
+
+    flags = analyze_cell_for_flags(df, {'first_discharge': 'n/a'}, {'first_discharge_values': [1.0, 2.0, 3.0]})
+
+    assert flags == []
+    assert calculate_fade_rate(['a', 'b']) is None
+
+
+def test_analyze_cell_for_flags_skips_duplicated_columns():
+    values = np.column_stack([np.arange(1, 31), np.linspace(200, 150, 30), np.linspace(200, 150, 30)])
+    df = pd.DataFrame(values, columns=['Cycle', 'Q Dis (mAh/g)', 'Q Dis (mAh/g)'])
+
+    assert analyze_cell_for_flags(df, {}) == []
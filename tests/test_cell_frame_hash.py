@@ -0,0 +1,11 @@
+import pandas as pd
+
+from ui_components import hash_dataframe
+
+
+def test_hash_dataframe_tracks_values_and_column_names():
+    df = pd.DataFrame({'Cycle': [1, 2, 3], 'Q Dis (mAh/g)': [200.0, 198.0, 196.0]})
+
+    assert hash_dataframe(df) == hash_dataframe(df.copy())
+    assert hash_dataframe(df) != hash_dataframe(df.assign(**{'Q Dis (mAh/g)': [200.0, 198.0, 195.0]}))
+    assert hash_dataframe(df) != hash_dataframe(df.rename(columns={'Q Dis (mAh/g)': 'Q Chg (mAh/g)'}))
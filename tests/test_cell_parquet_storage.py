@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+
+import pandas as pd
+
+import database
+
+
+def test_save_experiment_stores_cells_as_parquet(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "cellscope.db"))
+    monkeypatch.setattr(database, "DATA_DIR", tmp_path)
+    database.init_database()
+    database.migrate_database()
+
+    df = pd.DataFrame(
+        {
+            "Cycle": [1, 2, 3],
+            "Q Dis (mAh/g)": [200.0, 198.0, 196.0],
+            "Efficiency (-)": [0.98, 0.99, 0.995],
+        }
+    )
+    cells = [{"cell_name": "FC5 i", "loading": 16.8, "active_material": 92.0, "data_json": df.to_json()}]
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type) VALUES (1, 'admin', 'Project', 'Full Cell')"
+        )
+        conn.commit()
+
+    experiment_id = database.save_experiment(
+        project_id=1,
+        experiment_name="FC5",
+        experiment_date=date(2026, 1, 20),
+        disc_diameter_mm=15,
+        group_assignments=None,
+        group_names=None,
+        cells_data=cells,
+    )
+
+    # The caller's cells keep their in-memory data.
+    assert cells[0]["data_json"] == df.to_json()
+
+    with database.get_db_connection() as conn:
+        row = conn.execute("SELECT data_json FROM cell_experiments WHERE cell_name = 'FC5'").fetchone()
+    stored_cell = json.loads(row[0])["cells"][0]
+    assert stored_cell["data_json"] is None
+    assert stored_cell["parquet_path"]
+    assert stored_cell["max_cycle"] == 3
+
+    loaded = database.load_cell_dataframe(stored_cell)
+    pd.testing.assert_frame_equal(loaded, df, check_dtype=False)
+
+    # Cells without a parquet file fall back to their inline data_json.
+    recalculated = df.assign(**{"Q Dis (mAh/g)": df["Q Dis (mAh/g)"] * 2})
+    pd.testing.assert_frame_equal(
+        database.load_cell_dataframe({"data_json": recalculated.to_json()}),
+        recalculated,
+        check_dtype=False,
+    )
+
+    _, _, hydrated_json = database.get_hydrated_experiment_payload(experiment_id)
+    hydrated_cell = json.loads(hydrated_json)["cells"][0]
+    pd.testing.assert_frame_equal(database.load_cell_dataframe({"data_json": hydrated_cell["data_json"]}), df, check_dtype=False)
+
+    # Payloads loaded for load_cell_dataframe keep the parquet reference instead of inlining it.
+    _, _, reference_json = database.get_hydrated_experiment_payload(experiment_id, inline_cells=False)
+    assert json.loads(reference_json)["cells"][0] == stored_cell
+
+
+def test_project_experiments_are_hydrated_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "cellscope.db"))
+    monkeypatch.setattr(database, "DATA_DIR", tmp_path)
+    database.init_database()
+    database.migrate_database()
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type) VALUES (1, 'admin', 'Project', 'Full Cell')"
+        )
+        conn.commit()
+
+    frames = {}
+    for index, name in enumerate(["FC1", "FC2", "FC3"]):
+        df = pd.DataFrame({"Cycle": [1, 2], "Q Dis (mAh/g)": [200.0 - index, 199.0 - index]})
+        frames[name] = df
+        database.save_experiment(
+            project_id=1,
+            experiment_name=name,
+            experiment_date=date(2026, 1, 20 + index),
+            disc_diameter_mm=15,
+            group_assignments=None,
+            group_names=None,
+            cells_data=[{"cell_name": f"{name} i", "loading": 16.8, "active_material": 92.0, "data_json": df.to_json()}],
+        )
+
+    rows = database.get_all_project_experiments_data(1)
+    with database.get_db_connection() as conn:
+        expected_order = [row[0] for row in conn.execute(
+            "SELECT cell_name FROM cell_experiments WHERE project_id = 1 ORDER BY created_date DESC"
+        )]
+
+    assert [row[1] for row in rows] == expected_order
+    for row in rows:
+        assert len(row) == 17
+        cell = json.loads(row[11])["cells"][0]
+        pd.testing.assert_frame_equal(
+            database.load_cell_dataframe({"data_json": cell["data_json"]}), frames[row[1]], check_dtype=False
+        )
+
+
+def test_update_experiment_reuses_unchanged_parquet_and_removes_replaced_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "cellscope.db"))
+    data_dir = tmp_path / "experiments"
+    data_dir.mkdir()
+    monkeypatch.setattr(database, "DATA_DIR", data_dir)
+    database.init_database()
+    database.migrate_database()
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type) VALUES (1, 'admin', 'Project', 'Full Cell')"
+        )
+        conn.commit()
+
+    frames = [
+        pd.DataFrame({"Cycle": range(1, 21), "Q Dis (mAh/g)": [200.0 - i - 0.5 * c for c in range(20)]})
+        for i in range(2)
+    ]
+    experiment_id = database.save_experiment(
+        project_id=1,
+        experiment_name="FC6",
+        experiment_date=date(2026, 1, 20),
+        disc_diameter_mm=15,
+        group_assignments=None,
+        group_names=None,
+        cells_data=[{"cell_name": f"FC6 {i}", "data_json": df.to_json()} for i, df in enumerate(frames)],
+    )
+
+    def update(cells):
+        return database.update_experiment(
+            experiment_id=experiment_id,
+            project_id=1,
+            experiment_name="FC6",
+            experiment_date=date(2026, 1, 20),
+            disc_diameter_mm=15,
+            group_assignments=None,
+            group_names=None,
+            cells_data=cells,
+        )
+
+    def stored_cells():
+        _, _, payload = database.get_hydrated_experiment_payload(experiment_id, inline_cells=False)
+        return json.loads(payload)["cells"]
+
+    original_files = sorted(data_dir.iterdir())
+    assert len(original_files) == 2
+    second_cell_path = stored_cells()[1]["parquet_path"]
+
+    # An unchanged save keeps both files.
+    update(stored_cells())
+    assert sorted(data_dir.iterdir()) == original_files
+
+    # Replacing one cell's data writes one new file and removes the file it replaces.
+    cells = stored_cells()
+    recalculated = frames[0].assign(**{"Q Dis (mAh/g)": frames[0]["Q Dis (mAh/g)"] * 2})
+    cells[0] = {**{k: v for k, v in cells[0].items() if k != "parquet_path"}, "data_json": recalculated.to_json()}
+    saved = update(cells)
+
+    files = sorted(data_dir.iterdir())
+    assert len(files) == 2
+    assert saved[1]["parquet_path"] == second_cell_path
+    assert saved[0]["parquet_path"] not in {str(path) for path in original_files}
+    assert stored_cells() == saved
+    assert all(cell["data_json"] is None for cell in saved)
+    pd.testing.assert_frame_equal(database.load_cell_dataframe(saved[0]), recalculated, check_dtype=False)
+
+
+def test_project_experiments_keep_parquet_references(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "cellscope.db"))
+    monkeypatch.setattr(database, "DATA_DIR", tmp_path)
+    database.init_database()
+    database.migrate_database()
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type) VALUES (1, 'admin', 'Project', 'Full Cell')"
+        )
+        conn.commit()
+
+    multi = pd.DataFrame({"Cycle": range(1, 21), "Q Dis (mAh/g)": [200.0 - 0.5 * c for c in range(20)]})
+    legacy = pd.DataFrame({"Cycle": range(1, 21), "Q Dis (mAh/g)": [150.0 - 0.5 * c for c in range(20)]})
+    database.save_experiment(
+        project_id=1,
+        experiment_name="FC7",
+        experiment_date=date(2026, 1, 20),
+        disc_diameter_mm=15,
+        group_assignments=None,
+        group_names=None,
+        cells_data=[{"cell_name": "FC7 i", "data_json": multi.to_json()}],
+    )
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO cell_experiments (project_id, cell_name, data_json, parquet_path) VALUES (1, 'Legacy', NULL, ?)",
+            (database._save_df_to_parquet(legacy, prefix="cell"),),
+        )
+        conn.commit()
+
+    rows = {row[1]: row for row in database.get_all_project_experiments_data(1, inline_cells=False)}
+
+    cell = json.loads(rows["FC7"][11])["cells"][0]
+    assert cell["data_json"] is None and cell["parquet_path"]
+    pd.testing.assert_frame_equal(database.load_cell_dataframe(cell), multi, check_dtype=False)
+
+    legacy_json = rows["Legacy"][11]
+    source = database.legacy_cell_source(legacy_json, json.loads(legacy_json))
+    assert "data_json" not in source
+    pd.testing.assert_frame_equal(database.load_cell_dataframe(source), legacy, check_dtype=False)
+
+    # Inline legacy payloads are still read from their JSON.
+    inline_json = legacy.to_json()
+    source = database.legacy_cell_source(inline_json, json.loads(inline_json))
+    pd.testing.assert_frame_equal(database.load_cell_dataframe(source), legacy, check_dtype=False)
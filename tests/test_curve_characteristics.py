@@ -0,0 +1,28 @@
+import pandas as pd
+
+from llm_summary import extract_curve_characteristics
+
+
+def test_capacity_drops_flag_cycles_losing_more_than_five_percent():
+    df = pd.DataFrame({
+        'Cycle': [1, 2, 3, 4, 5, 6, 7],
+        'Q Dis (mAh/g)': [150.0, 160.0, 200.0, 198.0, 180.0, 179.0, 160.0],
+    })
+
+    result = extract_curve_characteristics(df, formation_cycles=2)
+
+    assert result['capacity_drops'] == [
+        {'cycle': 5, 'drop_pct': 9.09},
+        {'cycle': 7, 'drop_pct': 10.61},
+    ]
+
+
+def test_capacity_drops_skip_non_positive_previous_cycle():
+    df = pd.DataFrame({
+        'Cycle': [1, 2, 3, 4, 5],
+        'Q Dis (mAh/g)': [100.0, 0.0, 50.0, 40.0, 40.0],
+    })
+
+    result = extract_curve_characteristics(df, formation_cycles=1)
+
+    assert result['capacity_drops'] == [{'cycle': 4, 'drop_pct': 20.0}]
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from data_analysis import build_cycle_lookup, common_cycle_values
+
+
+def test_common_cycle_values_returns_sorted_shared_cycles():
+    dfs = [
+        pd.DataFrame({'Cycle': [3, 1, 2, 4], 'Q Dis (mAh/g)': [1.0, 2.0, 3.0, 4.0]}),
+        pd.DataFrame({'Cycle': [1, 2, 4, 5], 'Q Dis (mAh/g)': [1.0, 2.0, 3.0, 4.0]}),
+        pd.DataFrame({'Cycle': [4, 2, 2, 6], 'Q Dis (mAh/g)': [1.0, 2.0, 3.0, 4.0]}),
+    ]
+
+    common = common_cycle_values(dfs, 'Cycle')
+
+    assert common == [2, 4]
+    assert isinstance(common, list)
+
+
+def test_common_cycle_values_single_frame_is_sorted_and_unique():
+    df = pd.DataFrame({'Cycle': [3.0, 1.0, 2.0, 2.0, float('nan')]})
+
+    assert common_cycle_values([df], 'Cycle') == [1.0, 2.0, 3.0]
+
+
+def test_common_cycle_values_empty_when_nothing_shared():
+    dfs = [
+        pd.DataFrame({'Cycle': [1, 2]}),
+        pd.DataFrame({'Cycle': [3, 4]}),
+    ]
+
+    assert common_cycle_values(dfs, 'Cycle') == []
+
+
+def test_build_cycle_lookup_keeps_first_row_per_cycle():
+    df = pd.DataFrame({
+        'Cycle': [1, 2, 2],
+        'Q Dis (mAh/g)': [200.0, 198.0, 150.0],
+        'Efficiency (-)': [0.98, 0.99, 0.5],
+    })
+
+    lookup = build_cycle_lookup(df, 'Cycle')
+
+    assert lookup[2] == {'Q Dis (mAh/g)': 198.0, 'Efficiency (-)': 0.99}
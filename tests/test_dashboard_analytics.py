@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dashboard_analytics
+import database
+import derived_metrics_service
+from data_analysis import calculate_cell_summary
+from dashboard_analytics import (
+    calculate_avg_efficiency,
+    calculate_cell_metrics,
+    calculate_fade_rate,
+    calculate_retention_percent,
+    get_capacity_values,
+    get_global_statistics,
+    get_project_summaries,
+    get_top_performers,
+    parse_cell_data_json,
+)
+
+
+def _cell_df(n_cycles=120):
+    cycles = np.arange(1, n_cycles + 1)
+    return pd.DataFrame(
+        {
+            "Cycle": cycles,
+            "Q Dis (mAh/g)": 200.0 - 0.05 * cycles,
+            "Efficiency (-)": np.full(n_cycles, 99.5),
+        }
+    )
+
+
+def _cell(name, df=None, **fields):
+    df = _cell_df() if df is None else df
+    return {"cell_name": name, "test_number": name, "data_json": df.to_json(), **fields}
+
+
+@pytest.fixture
+def dashboard_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "cellscope.db"))
+    database.init_database()
+    database.migrate_database()
+
+
+def _insert_project(project_id=1, name="P1", project_type="Full Cell", last_modified=None):
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type, last_modified) "
+            "VALUES (?, 'admin', ?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+            (project_id, name, project_type, last_modified),
+        )
+        conn.commit()
+
+
+def _insert_experiment(exp_id, cells, project_id=1, created_date=None):
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO cell_experiments (id, project_id, cell_name, data_json, created_date) "
+            "VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+            (exp_id, project_id, f"Exp {exp_id}", json.dumps({"cells": cells}), created_date),
+        )
+        conn.commit()
+
+
+def test_cell_json_frame_matches_read_json_metrics():
+    df = _cell_df()
+    df.loc[3, "Q Dis (mAh/g)"] = np.nan
+    df["Notes"] = None
+    payload = df.to_json()
+
+    parsed = parse_cell_data_json(payload)
+    reference = pd.read_json(StringIO(payload))
+
+    assert parsed["Notes"].dtype == float
+    assert parsed.index.equals(reference.index)
+    assert calculate_retention_percent(parsed) == calculate_retention_percent(reference)
+    assert calculate_fade_rate(parsed) == calculate_fade_rate(reference)
+    assert calculate_avg_efficiency(parsed) == calculate_avg_efficiency(reference)
+
+    fading = _cell_df().assign(**{"Q Dis (mAh/g)": lambda d: 200.0 - 0.5 * d["Cycle"]}).to_json()
+    cell_data = {"test_number": "A", "loading": 10.0, "active_material": 90.0, "formation_cycles": 4}
+    summary = calculate_cell_summary(parse_cell_data_json(fading), cell_data, 1.0)
+    assert summary["cycle_life_80"] is not None
+    assert summary == calculate_cell_summary(pd.read_json(StringIO(fading)), cell_data, 1.0)
+
+
+def test_top_performers_reads_cell_payloads(dashboard_db):
+    _insert_project()
+    _insert_experiment(10, [_cell("A"), _cell("B", _cell_df(50)), _cell("C", excluded=True)])
+
+    top = get_top_performers("admin", min_cycles=100)
+
+    assert top["cell_id"].tolist() == ["A"]
+    assert top["cycles_tested"].iloc[0] == 120
+    assert top["retention_pct"].iloc[0] == pytest.approx(calculate_retention_percent(_cell_df()))
+
+
+def test_dashboard_reuses_cached_cell_metrics(dashboard_db, monkeypatch):
+    _insert_project()
+    _insert_experiment(10, [_cell("A")])
+
+    first = get_global_statistics("admin")
+
+    def fail_parse(_):
+        raise AssertionError("cell payload parsed again")
+
+    monkeypatch.setattr(derived_metrics_service, "parse_cell_data_json", fail_parse)
+
+    assert get_global_statistics("admin") == first
+    summary = get_project_summaries("admin")[0]
+    assert summary["cell_count"] == 1
+    assert summary["latest_cycle"] == 120
+    assert summary["best_cell_id"] == "A"
+
+
+def test_fade_rate_matches_linregress_and_skips_flat_cycles():
+    from scipy.stats import linregress
+
+    df = _cell_df()
+    df.loc[[0, 7], "Q Dis (mAh/g)"] = [0.0, np.nan]
+    valid = df[df["Q Dis (mAh/g)"] > 0]
+    retention = valid["Q Dis (mAh/g)"] / valid["Q Dis (mAh/g)"].iloc[0] * 100
+
+    expected = round(-linregress(valid["Cycle"], retention).slope * 100, 3)
+
+    assert calculate_fade_rate(df) == pytest.approx(expected)
+    assert calculate_fade_rate(df.assign(Cycle=5)) is None
+
+
+def test_project_summaries_include_empty_projects_and_respect_filter(dashboard_db):
+    _insert_project(1, "P1", last_modified="2026-01-02")
+    _insert_project(2, "P2", "Anode", last_modified="2026-01-03")
+    _insert_experiment(10, [_cell("A")])
+    _insert_experiment(11, [_cell("A")])
+
+    summaries = get_project_summaries("admin")
+
+    assert [(s["project_name"], s["cell_count"]) for s in summaries] == [("P2", 0), ("P1", 2)]
+    assert summaries[0]["best_cell_id"] == "N/A"
+    assert [s["project_id"] for s in get_project_summaries("admin", {"project_ids": [1]})] == [1]
+
+
+def test_parsed_cell_frames_are_cached_as_independent_copies():
+    payload = _cell_df().to_json()
+
+    first = parse_cell_data_json(payload)
+    first["Q Dis (mAh/g)"] = 0.0
+
+    assert parse_cell_data_json(payload)["Q Dis (mAh/g)"].iloc[0] == pytest.approx(199.95)
+
+
+def test_top_performers_keeps_best_rows_per_metric(dashboard_db):
+    cells = []
+    for i, fade in enumerate([0.02, 0.08, 0.01, 0.05, 0.03]):
+        df = _cell_df()
+        df["Q Dis (mAh/g)"] = 200.0 - fade * df["Cycle"]
+        df["Efficiency (-)"] = 99.0 + 0.1 * i
+        cells.append(_cell(f"C{i}", df))
+    _insert_project()
+    _insert_experiment(10, cells)
+
+    everything = get_top_performers("admin", metric="none", top_n=10)
+    assert everything["cell_id"].tolist() == ["C0", "C1", "C2", "C3", "C4"]
+
+    for metric, column, ascending in [
+        ("retention", "retention_pct", False),
+        ("fade_rate", "fade_rate", True),
+        ("efficiency", "avg_efficiency", False),
+    ]:
+        expected = everything.sort_values(column, ascending=ascending, kind="stable").head(3)
+        top = get_top_performers("admin", metric=metric, top_n=3)
+        assert top["cell_id"].tolist() == expected["cell_id"].tolist()
+
+
+def test_cells_with_cycle_data_filters_on_recorded_max_cycle(dashboard_db, monkeypatch):
+    cells = [
+        {"cell_name": "short", "max_cycle": 50, "data_json": _cell_df(50).to_json()},
+        {"cell_name": "long", "max_cycle": 120, "data_json": _cell_df().to_json()},
+        {"cell_name": "legacy", "data_json": _cell_df(30).to_json()},
+    ]
+    _insert_project()
+    _insert_experiment(10, cells)
+
+    parsed = []
+    monkeypatch.setattr(
+        dashboard_analytics, "parse_cell_data_json", lambda payload: parsed.append(payload) or pd.read_json(StringIO(payload))
+    )
+
+    result = dashboard_analytics.get_cells_with_cycle_data("admin", min_cycles=100)
+
+    assert [cell["cell_id"] for cell in result] == ["long"]
+    assert parsed == [cells[2]["data_json"]]
+
+
+def test_cell_metrics_match_individual_helpers():
+    df = _cell_df()
+    df.loc[[2, 40], "Q Dis (mAh/g)"] = [0.0, np.nan]
+
+    metrics = calculate_cell_metrics(df)
+
+    assert metrics.retention_pct == calculate_retention_percent(df)
+    assert metrics.fade_rate == calculate_fade_rate(df)
+    assert (metrics.initial_capacity, metrics.current_capacity) == get_capacity_values(df)
+    assert metrics.avg_efficiency == calculate_avg_efficiency(df)
+    assert calculate_cell_metrics(df[["Cycle"]]).retention_pct is None
+
+
+def test_project_summaries_filter_experiments_by_whole_day_range(dashboard_db):
+    _insert_project(1, "P1")
+    _insert_project(2, "P2", "Anode")
+    for exp_id, project_id, created in [
+        (10, 1, "2026-01-04 23:59:59"),
+        (11, 1, "2026-01-05 08:00:00"),
+        (12, 1, "2026-01-10 17:30:00"),
+        (13, 1, "2026-01-11 00:00:00"),
+        (14, 2, "2026-02-01 12:00:00"),
+    ]:
+        _insert_experiment(exp_id, [_cell("A")], project_id, created)
+
+    filters = {"date_range": (date(2026, 1, 5), date(2026, 1, 10))}
+    summaries = {s["project_name"]: s["cell_count"] for s in get_project_summaries("admin", filters)}
+
+    assert summaries == {"P1": 2, "P2": 0}
+    assert get_global_statistics("admin", filters)["total_cells"] == 2
+
+
+def test_failed_experiment_metrics_are_logged_and_skipped(dashboard_db, monkeypatch, caplog):
+    _insert_project()
+    _insert_experiment(10, [_cell("A")])
+
+    def fail(experiment_id):
+        raise RuntimeError("corrupt payload")
+
+    monkeypatch.setattr(derived_metrics_service, "get_or_refresh_experiment_derived_metrics", fail)
+
+    with caplog.at_level("ERROR", logger="dashboard_analytics"):
+        assert get_top_performers("admin", metric="none").empty
+
+    assert "experiment 10" in caplog.text
+    assert "corrupt payload" in caplog.text
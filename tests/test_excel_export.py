@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from export import _fmt, export_excel, get_cell_metrics
+
+
+def _cell(testnum, qdis):
+    n = len(qdis)
+    return {
+        'testnum': testnum,
+        'df': pd.DataFrame({
+            'Cycle': list(range(1, n + 1)),
+            'Q Dis (mAh/g)': qdis,
+            'Q Chg (mAh/g)': [q + 5.0 for q in qdis],
+            'Efficiency (-)': [0.95] * n,
+        }),
+    }
+
+
+def test_export_excel_writes_summary_and_cell_sheets():
+    qdis = [200.0, 195.0, 190.0, 185.0, 180.0, 175.0]
+    dfs = [_cell('A1', qdis), _cell(None, qdis)]
+
+    output, file_name = export_excel(dfs, True, 'Exp')
+
+    assert file_name == 'Exp Cell Comparison Data.xlsx'
+    sheets = pd.read_excel(output, sheet_name=None)
+    assert list(sheets) == ['Summary', 'A1', 'Cell 2']
+    assert sheets['Summary']['Cell'].tolist() == ['A1', 'Cell 2', 'Average Performance']
+    pd.testing.assert_frame_equal(sheets['A1'], dfs[0]['df'], check_dtype=False)
+
+
+def test_export_excel_gives_repeated_cell_names_unique_sheets():
+    qdis = [200.0, 195.0, 190.0]
+    dfs = [_cell('A', qdis), _cell('a', qdis), _cell('Summary', qdis), _cell('X' * 40, qdis)]
+
+    output, _ = export_excel(dfs, False, 'Exp')
+
+    sheets = pd.read_excel(output, sheet_name=None)
+    assert list(sheets) == ['Summary', 'A', 'a_2', 'Summary_2', 'Cell_4']
+    assert sheets['Summary']['Cell'].tolist() == ['A', 'a', 'Summary', 'X' * 40, 'Average Performance']
+
+
+def test_export_excel_leaves_missing_values_blank():
+    cell = _cell('A1', [200.0, np.nan, 190.0])
+
+    output, _ = export_excel([cell], False, '')
+
+    sheet = pd.read_excel(output, sheet_name='A1')
+    assert sheet['Q Dis (mAh/g)'].isna().tolist() == [False, True, False]
+
+
+def test_export_excel_streams_long_sheets_in_chunks(monkeypatch):
+    import export
+
+    monkeypatch.setattr(export, 'EXCEL_ROW_CHUNK', 4)
+    cell = _cell('A1', [200.0 - i for i in range(10)])
+
+    output, _ = export_excel([cell], False, '')
+
+    sheet = pd.read_excel(output, sheet_name='A1')
+    pd.testing.assert_frame_equal(sheet, cell['df'], check_dtype=False)
+
+
+def test_get_cell_metrics_formats_numpy_integer_capacities():
+    df = pd.DataFrame({
+        'Cycle': [1, 2, 3, 4, 5, 6],
+        'Q Dis (mAh/g)': np.array([200, 195, 190, 185, 180, 175], dtype=np.int64),
+        'Efficiency (-)': [0.9, np.nan, 0.99, 0.99, 0.99, 0.99],
+    })
+
+    metrics = get_cell_metrics(df, formation_cycles=4)
+
+    assert metrics['qdis_str'] == "200.0"
+    assert metrics['reversible_str'] == "180.0"
+    assert metrics['eff_str'] == "90.0%"
+    assert _fmt(np.nan) == "N/A"
+    assert _fmt(None, suffix='%') == "N/A"
@@ -0,0 +1,33 @@
+import pytest
+
+from cell_flags import FlagSeverity, detect_anomalous_first_discharge, get_experiment_context
+
+
+def test_experiment_context_precomputes_first_discharge_stats():
+    cells = [{'first_discharge': v} for v in (150.0, 152.0, 148.0, 151.0)] + [{'first_discharge': None}]
+
+    context = get_experiment_context(cells)
+
+    assert context['first_discharge_values'] == [150.0, 152.0, 148.0, 151.0]
+    assert context['first_discharge_count'] == 4
+    assert context['first_discharge_mean'] == pytest.approx(150.25)
+    assert context['first_discharge_std'] == pytest.approx(1.479019945774904)
+
+
+def test_anomalous_first_discharge_matches_raw_values_context():
+    values = [150.0, 151.0, 149.0, 150.5, 149.5, 150.0, 151.0, 149.0, 150.0, 150.0]
+    cells = [{'first_discharge': v} for v in values]
+    outlier = {'first_discharge': 200.0}
+
+    precomputed = detect_anomalous_first_discharge(outlier, get_experiment_context(cells))
+    legacy = detect_anomalous_first_discharge(outlier, {'first_discharge_values': values})
+
+    assert precomputed is not None
+    assert precomputed.severity == FlagSeverity.CRITICAL
+    assert precomputed == legacy
+
+
+def test_anomalous_first_discharge_needs_three_cells():
+    context = get_experiment_context([{'first_discharge': 150.0}, {'first_discharge': 300.0}])
+
+    assert detect_anomalous_first_discharge({'first_discharge': 500.0}, context) is None
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from data_analysis import _calculate_post_formation_ce, mean_capacity_ratio_pct, mean_positive_pct
+
+
+def test_mean_capacity_ratio_skips_missing_and_non_positive_charge():
+    qdis = pd.Series([100.0, 99.0, None, 98.0, 97.0])
+    qch = pd.Series([110.0, 100.0, 100.0, 0.0, 98.0])
+
+    result = mean_capacity_ratio_pct(qdis, qch, start_idx=1)
+
+    assert result == pytest.approx((99.0 / 100.0 + 97.0 / 98.0) / 2 * 100)
+
+
+def test_mean_positive_pct_ignores_non_numeric_and_non_positive_values():
+    values = pd.Series([0.8, 0.99, 'n/a', -1.0, 0.97])
+
+    assert mean_positive_pct(values, start_idx=1) == pytest.approx(98.0)
+    assert mean_positive_pct(pd.Series([None, 0.0])) is None
+
+
+def test_post_formation_ce_averages_efficiency_after_formation():
+    df = pd.DataFrame({
+        'Cycle': [1, 2, 3, 4, 5],
+        'Efficiency (-)': [0.70, 0.85, 0.995, 0.5, 0.997],
+    })
+
+    assert _calculate_post_formation_ce(df, formation_cycles=2) == pytest.approx((99.5 + 50.0 + 99.7) / 3)
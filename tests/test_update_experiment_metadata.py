@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+
+import database
+
+
+def test_update_experiment_metadata_preserves_cells(tmp_path, monkeypatch):
+    db_path = tmp_path / "cellscope.db"
+    monkeypatch.setattr(database, "DATABASE_PATH", str(db_path))
+    database.init_database()
+    database.migrate_database()
+
+    experiment_payload = {
+        "experiment_date": "2026-01-20",
+        "disc_diameter_mm": 15,
+        "group_names": ["Group A", "Group B", "Group C"],
+        "cells": [
+            {
+                "cell_name": "FC5 i",
+                "loading": 16.8,
+                "active_material": 92.0,
+                "parquet_path": "data/experiments/cell_multi_example.parquet",
+            }
+        ],
+        "ontology": {"display_batch_name": "N10"},
+    }
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type) VALUES (1, 'admin', 'Project', 'Full Cell')"
+        )
+        conn.execute(
+            "INSERT INTO cell_experiments (id, project_id, cell_name, data_json) VALUES (?, ?, ?, ?)",
+            (10, 1, "FC5", json.dumps(experiment_payload)),
+        )
+        conn.commit()
+
+    database.update_experiment_metadata(
+        experiment_id=10,
+        project_id=1,
+        experiment_date=date(2026, 2, 1),
+        disc_diameter_mm=15,
+        group_assignments=["Group A"],
+        group_names=["Group A", "Group B", "Group C"],
+        experiment_notes="Rerun with fresh electrolyte",
+    )
+
+    with database.get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT data_json, experiment_notes FROM cell_experiments WHERE id = 10"
+        ).fetchone()
+
+    stored = json.loads(row[0])
+    assert row[1] == "Rerun with fresh electrolyte"
+    assert stored["experiment_date"] == "2026-02-01"
+    assert stored["group_assignments"] == ["Group A"]
+    assert stored["cells"] == experiment_payload["cells"]
+    assert stored["ontology"] == {"display_batch_name": "N10"}
+
+
+def test_update_experiment_metadata_keeps_inline_cell_payloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "cellscope.db"))
+    database.init_database()
+    database.migrate_database()
+
+    cell_json = '{"Cycle":{"0":1,"1":2},"Q Dis (mAh\\/g)":{"0":200.125,"1":199.5}}'
+    inline_payload = {"experiment_date": "2026-01-20", "cells": [{"cell_name": "FC5 i", "data_json": cell_json}]}
+    nan_payload = {"experiment_date": "2026-01-20", "cells": [{"cell_name": "FC6 i", "loading": float("nan")}]}
+
+    with database.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO projects (id, user_id, name, project_type) VALUES (1, 'admin', 'Project', 'Full Cell')"
+        )
+        conn.executemany(
+            "INSERT INTO cell_experiments (id, project_id, cell_name, data_json) VALUES (?, 1, ?, ?)",
+            [(10, "FC5", json.dumps(inline_payload)), (11, "FC6", json.dumps(nan_payload))],
+        )
+        conn.commit()
+
+    for experiment_id in (10, 11):
+        database.update_experiment_metadata(
+            experiment_id=experiment_id,
+            project_id=1,
+            experiment_date=None,
+            disc_diameter_mm=15,
+            group_assignments=None,
+            group_names=["Group A"],
+            cell_format_data={"cell_format": "Coin"},
+        )
+
+    with database.get_db_connection() as conn:
+        rows = dict(conn.execute("SELECT id, data_json FROM cell_experiments").fetchall())
+
+    stored = json.loads(rows[10])
+    assert stored["cells"][0]["data_json"] == cell_json
+    assert stored["experiment_date"] is None
+    assert stored["group_names"] == ["Group A"]
+    assert stored["cell_format"] == "Coin"
+
+    # Payloads SQLite cannot parse are still updated.
+    stored = json.loads(rows[11])
+    assert stored["cell_format"] == "Coin"
+    assert stored["cells"][0]["cell_name"] == "FC6 i"
+
+
+def test_cells_match_stored_ignores_fields_filled_with_form_defaults():
+    stored = {
+        "cell_name": "FC5 i",
+        "loading": 16.8,
+        "active_material": 92.0,
+        "formation_cycles": 4,
+        "electrolyte": "1M LiPF6 EC:DMC",
+        "data_json": '{"Cycle":{"0":1}}',
+    }
+    # What the top-bar Save builds from session state for an untouched cell
+    updated = {
+        **stored,
+        "test_number": "FC5 i",
+        "substrate": "Copper",
+        "separator": "25um PP",
+        "cutoff_voltage_lower": None,
+        "cutoff_voltage_upper": None,
+        "formulation": [],
+        "excluded": False,
+        "porosity": None,
+        "file_name": None,
+        "cycler": None,
+        "channel": None,
+        "cycler_channel": None,
+        "tracking_placeholder": False,
+    }
+
+    assert database.cells_match_stored([updated], [stored])
+    assert not database.cells_match_stored([{**updated, "excluded": True}], [stored])
+    assert not database.cells_match_stored([{**updated, "loading": 17.0}], [stored])
+    assert not database.cells_match_stored([updated], [stored, stored])
@@ -1,10 +1,12 @@
 # ui_components.py
 import streamlit as st
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import uuid
 import numpy as np
 import math
+from collections import defaultdict
+from data_analysis import calculate_capacity_fade_rate, mean_capacity_ratio_pct, mean_positive_pct
 
 def int_to_roman(num: int) -> str:
     """Convert an integer to lowercase roman numeral."""
@@ -641,17 +643,32 @@ def get_substrate_options():
         'Cx-Cu'
     ]
 
+def hash_dataframe(df):
+    """Content hash of a cell DataFrame for st.cache_data keys: column names plus every row and index value."""
+    return tuple(df.columns), pd.util.hash_pandas_object(df, index=True).values.tobytes()
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_dataframe}, max_entries=256)
 def calculate_cell_metrics(df_cell, formation_cycles, disc_area_cm2):
-    """Centralized metric calculation to avoid duplication"""
+    """Centralized metric calculation to avoid duplication.
+
+    Cached on the cell's data so summary tables don't rescan every cell on each rerun.
+    """
     metrics = {}
     
+    # Column membership and arrays resolved once and reused below
+    cols = df_cell.columns
+    eff_col = 'Efficiency (-)'
+    has_eff = eff_col in cols
+    qdis_arr = df_cell['Q Dis (mAh/g)'].to_numpy()
+    eff_arr = df_cell[eff_col].to_numpy() if has_eff else None
+    
     # 1st Cycle Discharge Capacity
-    first_three_qdis = df_cell['Q Dis (mAh/g)'].head(3).tolist()
+    first_three_qdis = qdis_arr[:3].tolist()
     metrics['max_qdis'] = max(first_three_qdis) if first_three_qdis else None
     
     # First Cycle Efficiency
-    if 'Efficiency (-)' in df_cell.columns and not df_cell['Efficiency (-)'].empty:
-        first_cycle_eff = df_cell['Efficiency (-)'].iloc[0]
+    if eff_arr is not None and eff_arr.size:
+        first_cycle_eff = eff_arr[0]
         try:
             metrics['first_cycle_eff'] = float(first_cycle_eff) * 100
         except (ValueError, TypeError):
@@ -661,7 +678,8 @@ def calculate_cell_metrics(df_cell, formation_cycles, disc_area_cm2):
     
     # Cycle Life (expensive calculation - do once)
     qdis_series = get_qdis_series(df_cell)
-    cycle_index_series = df_cell[df_cell.columns[0]].iloc[qdis_series.index]
+    cycle_index_arr = df_cell[cols[0]].to_numpy()
+    cycle_index_series = cycle_index_arr[qdis_series.index.to_numpy()]
     metrics['cycle_life_80'] = calculate_cycle_life_80(qdis_series, cycle_index_series)
     
     # Initial Areal Capacity
@@ -669,15 +687,14 @@ def calculate_cell_metrics(df_cell, formation_cycles, disc_area_cm2):
     metrics['areal_capacity'] = areal_capacity
     
     # Reversible Capacity
-    if len(df_cell) > formation_cycles:
-        metrics['reversible_capacity'] = df_cell['Q Dis (mAh/g)'].iloc[formation_cycles]
+    if qdis_arr.size > formation_cycles:
+        metrics['reversible_capacity'] = qdis_arr[formation_cycles]
     else:
         metrics['reversible_capacity'] = None
     
     # Coulombic Efficiency (post-formation)
-    eff_col = 'Efficiency (-)'
     n_cycles = len(df_cell)
-    ceff_values = []
+    coulombic_eff = None
     
     try:
         start_idx = formation_cycles if n_cycles > formation_cycles else 0
@@ -689,24 +706,14 @@ def calculate_cell_metrics(df_cell, formation_cycles, disc_area_cm2):
         ]
 
         for discharge_col, charge_col in charge_discharge_pairs:
-            if discharge_col in df_cell.columns and charge_col in df_cell.columns:
-                qdis_series = pd.to_numeric(df_cell[discharge_col], errors='coerce')
-                qch_series = pd.to_numeric(df_cell[charge_col], errors='coerce')
-                ceff_values = [
-                    (float(qd) / float(qc)) * 100
-                    for qd, qc in zip(qdis_series.iloc[start_idx:n_cycles], qch_series.iloc[start_idx:n_cycles])
-                    if pd.notna(qd) and pd.notna(qc) and float(qc) > 0
-                ]
+            if discharge_col in cols and charge_col in cols:
+                coulombic_eff = mean_capacity_ratio_pct(df_cell[discharge_col], df_cell[charge_col], start_idx)
                 break
 
-        if not ceff_values and eff_col in df_cell.columns:
-            eff_series = pd.to_numeric(df_cell[eff_col], errors='coerce')
-            ceff_values = [val * 100 for val in eff_series.iloc[start_idx:n_cycles] if pd.notna(val) and val > 0]
+        if coulombic_eff is None and has_eff:
+            coulombic_eff = mean_positive_pct(eff_arr, start_idx)
         
-        if ceff_values:
-            metrics['coulombic_eff'] = sum(ceff_values) / len(ceff_values)
-        else:
-            metrics['coulombic_eff'] = None
+        metrics['coulombic_eff'] = coulombic_eff
     except Exception as e:
         metrics['coulombic_eff'] = None
 
@@ -714,7 +721,6 @@ def calculate_cell_metrics(df_cell, formation_cycles, disc_area_cm2):
     metrics['fade_rate_per_cycle'] = None
     metrics['fade_rate_per_100'] = None
     try:
-        from data_analysis import calculate_capacity_fade_rate
         fade_result = calculate_capacity_fade_rate(df_cell, formation_cycles=formation_cycles)
         if fade_result is not None:
             metrics['fade_rate_per_cycle'] = fade_result.get('fade_rate_per_cycle')
@@ -1941,7 +1947,7 @@ def render_formulation_table(key_suffix, project_id=None, get_components_func=No
             import json
             
             # Get all experiments from the project
-            experiments = get_all_project_experiments_data(project_id)
+            experiments = get_all_project_experiments_data(project_id, inline_cells=False)
             
             # Filter experiments that have formulations
             experiments_with_formulations = []
@@ -2052,12 +2058,13 @@ def calculate_cycle_life_80(qdis_series, cycle_index_series):
     else:
         return None
     threshold = 0.8 * initial_qdis
+    cycle_values = np.asarray(cycle_index_series)
     below_threshold = qdis_series <= threshold
     if below_threshold.any():
         first_below_idx = below_threshold.idxmin()
-        return int(cycle_index_series.iloc[first_below_idx])
+        return int(cycle_values[first_below_idx])
     else:
-        return int(cycle_index_series.iloc[-1])
+        return int(cycle_values[-1])
 
 # --- Helper for robust areal capacity calculation ---
 def get_initial_areal_capacity(df_cell, disc_area_cm2):
@@ -2067,10 +2074,13 @@ def get_initial_areal_capacity(df_cell, disc_area_cm2):
     n = len(df_cell)
     if qdis_col not in df_cell.columns or n == 0:
         return None, None, None, None
+    # Read the columns once; the lookups below are plain array indexing
+    qdis = df_cell[qdis_col].to_numpy()
+    eff = df_cell[eff_col].to_numpy() if eff_col in df_cell.columns else None
     # Get values for cycles 1, 3, 4
-    val1 = abs(df_cell[qdis_col].iloc[0]) if n >= 1 and not pd.isnull(df_cell[qdis_col].iloc[0]) else None
-    val3 = abs(df_cell[qdis_col].iloc[2]) if n >= 3 and not pd.isnull(df_cell[qdis_col].iloc[2]) else None
-    val4 = abs(df_cell[qdis_col].iloc[3]) if n >= 4 and not pd.isnull(df_cell[qdis_col].iloc[3]) else None
+    val1 = abs(qdis[0]) if n >= 1 and not pd.isnull(qdis[0]) else None
+    val3 = abs(qdis[2]) if n >= 3 and not pd.isnull(qdis[2]) else None
+    val4 = abs(qdis[3]) if n >= 4 and not pd.isnull(qdis[3]) else None
     # Choose best initial
     if n >= 4 and val3 is not None and val4 is not None:
         chosen_val = max(val3, val4)
@@ -2085,7 +2095,7 @@ def get_initial_areal_capacity(df_cell, disc_area_cm2):
         chosen_val = val3
         chosen_cycle = 3
     else:
-        last_val = df_cell[qdis_col].iloc[-1]
+        last_val = qdis[-1]
         chosen_val = abs(last_val) if not pd.isnull(last_val) else None
         chosen_cycle = n
     areal_capacity = chosen_val / disc_area_cm2 if chosen_val is not None else None
@@ -2098,8 +2108,8 @@ def get_initial_areal_capacity(df_cell, disc_area_cm2):
             warn = True
     # Check efficiency for chosen cycle
     eff_val = None
-    if eff_col in df_cell.columns and n >= chosen_cycle:
-        eff_val = df_cell[eff_col].iloc[chosen_cycle-1] if not pd.isnull(df_cell[eff_col].iloc[chosen_cycle-1]) else None
+    if eff is not None and n >= chosen_cycle:
+        eff_val = eff[chosen_cycle-1] if not pd.isnull(eff[chosen_cycle-1]) else None
         try:
             if eff_val is not None and float(eff_val) < 0.8:
                 warn = True
@@ -2107,6 +2117,14 @@ def get_initial_areal_capacity(df_cell, disc_area_cm2):
             pass  # Ignore non-numeric efficiency values
     return areal_capacity, chosen_cycle, diff_pct, eff_val
 
+def _nanmean_columns(rows) -> List[Optional[float]]:
+    """Column means of a 2-D table, skipping None/NaN entries; None for columns with no data."""
+    values = np.array(rows, dtype=float).reshape(len(rows), -1)
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    sums = np.where(valid, values, 0.0).sum(axis=0)
+    return [float(s / c) if c else None for s, c in zip(sums, counts)]
+
 def display_summary_stats(dfs: List[Dict[str, Any]], disc_area_cm2: float, show_average_col: bool = True, group_assignments: List[str] = None, group_names: List[str] = None):
     """Display summary statistics as a table in Streamlit."""
     import pandas as pd
@@ -2139,28 +2157,28 @@ def display_summary_stats(dfs: List[Dict[str, Any]], disc_area_cm2: float, show_
         summary_dict[param_names[5]].append(metrics['areal_capacity'])
         summary_dict[param_names[6]].append(metrics['fade_rate_per_cycle'])
         summary_dict[param_names[7]].append(metrics['fade_rate_per_100'])
+    # Metric keys in the same order as param_names
+    param_keys = ['reversible_capacity', 'coulombic_eff', 'max_qdis', 'first_cycle_eff', 'cycle_life_80', 'areal_capacity', 'fade_rate_per_cycle', 'fade_rate_per_100']
     # Add group summary rows if grouping is enabled
     group_names_final = []
     if group_assignments is not None and group_names is not None:
+        # Bucket cell indices by group in one pass instead of rescanning per group
+        indices_by_group = defaultdict(list)
+        for i, g in enumerate(group_assignments):
+            indices_by_group[g].append(i)
         for group_idx, group_name in enumerate(group_names):
-            group_indices = [i for i, g in enumerate(group_assignments) if g == group_name]
+            group_indices = indices_by_group.get(group_name, [])
             if len(group_indices) > 1:
-                group_metrics = [cell_metrics[i] for i in group_indices]
-                # Calculate group averages
-                avg_values = {}
-                for param_key in ['max_qdis', 'first_cycle_eff', 'cycle_life_80', 'areal_capacity', 'reversible_capacity', 'coulombic_eff', 'fade_rate_per_cycle', 'fade_rate_per_100']:
-                    values = [m[param_key] for m in group_metrics if m[param_key] is not None]
-                    avg_values[param_key] = sum(values) / len(values) if values else None
+                # Calculate group averages (one row per cell, one column per parameter)
+                group_avgs = _nanmean_columns([[cell_metrics[i][k] for k in param_keys] for i in group_indices])
                 # Add to summary
-                for i, param in enumerate(param_names):
-                    param_keys = ['reversible_capacity', 'coulombic_eff', 'max_qdis', 'first_cycle_eff', 'cycle_life_80', 'areal_capacity', 'fade_rate_per_cycle', 'fade_rate_per_100']
-                    summary_dict[param].append(avg_values[param_keys[i]])
+                for param, avg in zip(param_names, group_avgs):
+                    summary_dict[param].append(avg)
                 group_names_final.append(group_name + " (Group Avg)")
     # Compute overall averages
     if show_average_col and len(dfs) > 1:
-        for param in param_names:
-            vals = [v for v in summary_dict[param] if v is not None]
-            avg = sum(vals) / len(vals) if vals else None
+        overall_avgs = _nanmean_columns(list(zip(*(summary_dict[param] for param in param_names))))
+        for param, avg in zip(param_names, overall_avgs):
             summary_dict[param].append(avg)
         col_labels = cell_names + group_names_final + ["Average"]
     else:
@@ -2239,16 +2257,10 @@ def display_averages(dfs: List[Dict[str, Any]], show_averages: bool, disc_area_c
                 all_metrics.append(metrics)
             
             # Calculate averages
-            def safe_average(values):
-                valid_values = [v for v in values if v is not None]
-                return sum(valid_values) / len(valid_values) if valid_values else None
-            
-            avg_qdis = safe_average([m['max_qdis'] for m in all_metrics])
-            avg_eff = safe_average([m['first_cycle_eff'] for m in all_metrics])
-            avg_cycle_life = safe_average([m['cycle_life_80'] for m in all_metrics])
-            avg_areal = safe_average([m['areal_capacity'] for m in all_metrics])
-            avg_reversible = safe_average([m['reversible_capacity'] for m in all_metrics])
-            avg_ceff = safe_average([m['coulombic_eff'] for m in all_metrics])
+            avg_keys = ['max_qdis', 'first_cycle_eff', 'cycle_life_80', 'areal_capacity', 'reversible_capacity', 'coulombic_eff']
+            avg_qdis, avg_eff, avg_cycle_life, avg_areal, avg_reversible, avg_ceff = _nanmean_columns(
+                [[m[k] for k in avg_keys] for m in all_metrics]
+            )
             
             # Display results
             if avg_qdis is not None: